@@ -0,0 +1,134 @@
+"""Seans analizi için ortak JSON şeması, sonuç yapısı ve doğrulayan ayrıştırıcı
+
+Analiz structured outputs (response_format=json_schema) ile istenir; model
+yalnızca şemaya uyan JSON üretebilir. Çıktı token'ı azalsın diye alan adları
+tek harflidir, uygulama içinde ALANLAR ile okunaklı adlara çevrilir.
+"""
+import json
+
+RUH_HALLERI = ["sakin", "endişeli", "anksiyeteli", "stresli", "depresif", "panik"]
+ACILIYETLER = ["dusuk", "orta", "yuksek"]
+
+# Kısa alan adı -> sonuç anahtarı
+ALANLAR = {
+    "t": "klinik_tani",
+    "s": "stres_seviyesi",
+    "r": "ruh_hali",
+    "a": "aciliyet",
+    "p": "tedavi_plani",
+    "o": "oneriler",
+    "d": "degerlendirme",
+    "n": "teshis_onerileri"
+}
+
+ANALIZ_SEMASI = {
+    "type": "object",
+    "properties": {
+        "t": {"type": "string", "description": "Klinik tanı (kısa)"},
+        "s": {"type": "integer", "description": "Stres seviyesi, 0-10 arası"},
+        "r": {"type": "string", "enum": RUH_HALLERI, "description": "Ruh hali"},
+        "a": {"type": "string", "enum": ACILIYETLER, "description": "Aciliyet"},
+        "p": {"type": "string", "description": "Önerilen tedavi yaklaşımı (tek cümle)"},
+        "o": {"type": "array", "items": {"type": "string"}, "description": "3-5 kısa pratik öneri"},
+        "d": {"type": "string", "description": "80-120 kelime profesyonel değerlendirme"},
+        "n": {"type": "string", "description": "Dikkat edilmesi gerekenler, yoksa boş"}
+    },
+    "required": list(ALANLAR),
+    "additionalProperties": False
+}
+
+# chat.completions.create(response_format=...) için
+ANALIZ_YANIT_BICIMI = {
+    "type": "json_schema",
+    "json_schema": {"name": "seans_analizi", "strict": True, "schema": ANALIZ_SEMASI}
+}
+
+ANALIZ_SISTEM_PROMPTU = """Sen deneyimli bir klinik psikologsun. Verilen klinik seansı analiz et.
+Cevabı verilen JSON şemasına uygun ver; alanları kısa ve öz doldur."""
+
+
+class AnalizHatasi(ValueError):
+    """Model çıktısı şemaya uymuyor"""
+
+
+def analiz_sonucu(klinik_tani="", stres_seviyesi=5, ruh_hali="sakin", aciliyet="orta",
+                  tedavi_plani="", oneriler=(), degerlendirme="", teshis_onerileri=""):
+    """Her iki modülün kullandığı analiz sonucu (JSON'a yazılabilir sözlük)"""
+    return {
+        "klinik_tani": klinik_tani,
+        "stres_seviyesi": stres_seviyesi,
+        "ruh_hali": ruh_hali,
+        "aciliyet": aciliyet,
+        "tedavi_plani": tedavi_plani,
+        "oneriler": list(oneriler),
+        "degerlendirme": degerlendirme,
+        "teshis_onerileri": teshis_onerileri
+    }
+
+
+def _metin(veri, alan):
+    deger = veri[alan]
+    if not isinstance(deger, str):
+        raise AnalizHatasi(f"'{alan}' metin olmalı")
+    return deger.strip()
+
+
+def _secenek(veri, alan, secenekler):
+    deger = _metin(veri, alan).lower()
+    if deger not in secenekler:
+        raise AnalizHatasi(f"'{alan}' geçersiz: {deger}")
+    return deger
+
+
+def analiz_coz(icerik):
+    """Model çıktısını (JSON metni veya sözlük) doğrula ve analiz sonucuna çevir
+
+    Şemaya uymayan çıktıda AnalizHatasi fırlatır; varsayılan değerle sessizce
+    doldurmak yerine hatayı çağırana bırakır.
+    """
+    if isinstance(icerik, str):
+        try:
+            veri = json.loads(icerik)
+        except ValueError as e:
+            raise AnalizHatasi(f"Geçersiz JSON: {e}") from e
+    else:
+        veri = icerik
+    if not isinstance(veri, dict):
+        raise AnalizHatasi("Analiz bir JSON nesnesi olmalı")
+
+    eksik = [alan for alan in ALANLAR if alan not in veri]
+    if eksik:
+        raise AnalizHatasi(f"Eksik alanlar: {', '.join(eksik)}")
+
+    stres = veri["s"]
+    if isinstance(stres, bool) or not isinstance(stres, (int, float)):
+        raise AnalizHatasi("'s' sayı olmalı")
+
+    oneriler = veri["o"]
+    if not isinstance(oneriler, list) or not all(isinstance(o, str) for o in oneriler):
+        raise AnalizHatasi("'o' metin listesi olmalı")
+    oneriler = [o.strip().lstrip("-•").strip() for o in oneriler]
+    oneriler = [o for o in oneriler if o]
+    if not oneriler:
+        raise AnalizHatasi("'o' boş")
+
+    return analiz_sonucu(
+        klinik_tani=_metin(veri, "t"),
+        stres_seviyesi=max(0, min(10, int(round(stres)))),
+        ruh_hali=_secenek(veri, "r", RUH_HALLERI),
+        aciliyet=_secenek(veri, "a", ACILIYETLER),
+        tedavi_plani=_metin(veri, "p"),
+        oneriler=oneriler,
+        degerlendirme=_metin(veri, "d"),
+        teshis_onerileri=_metin(veri, "n")
+    )
+
+
+def yanit_icerigi(response):
+    """Chat completion cevabından analiz JSON'unu al (model reddettiyse hata)"""
+    mesaj = response.choices[0].message
+    if getattr(mesaj, "refusal", None):
+        raise AnalizHatasi(f"Model analizi reddetti: {mesaj.refusal}")
+    if not mesaj.content:
+        raise AnalizHatasi("Boş analiz cevabı")
+    return mesaj.content
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+
+from analiz_sonucu import ANALIZ_YANIT_BICIMI, analiz_coz, yanit_icerigi
+from olcum import cagri_olc
+from openai_istemci import async_openai_istemci_al, arka_planda_calistir
+from zamanlayici import ACIL, ARKA_PLAN, aciliyet_onceligi, aktif_oncelik
+
+# Sabit talimatlar sistem mesajında tutulur (sağlayıcı tarafı önek önbelleği için)
+ARA_ANALIZ_SISTEM_PROMPTU = """Devam eden bir klinik seansın ara değerlendirmesini güncelliyorsun.
+Önceki değerlendirmeyi (JSON) yeni konuşmalarla birleştir ve güncel analizi
+verilen JSON şemasına uygun ver; alanları kısa ve öz doldur."""
+
+
+class ArtimliSeansAnalizi:
+    """Seans boyunca her turdan sonra arka planda güncellenen ara klinik değerlendirme
+
+    Her güncelleme sadece önceki değerlendirmeyi ve yeni turları gönderir; seans
+    bittiğinde sadece işlenmemiş son turlar kalır.
+    """
+
+    def __init__(self, problem_bilgisi):
+        self.problem_bilgisi = problem_bilgisi
+        # Son doğrulanmış analizin JSON metni (sonraki güncellemeye bağlam) ve sonucu
+        self.ara_analiz = ""
+        self.sonuc = None
+        self.islenen_tur = 0
+        self._gorev = None
+        self._kilit = threading.Lock()
+
+    def guncelle(self, konusma_gecmisi):
+        """Yeni turlar için arka planda güncelleme başlat (hemen döner)"""
+        turlar = list(konusma_gecmisi)
+        with self._kilit:
+            # Güncellemeler sırayla uygulanır, her biri bir öncekini bekler
+            self._gorev = arka_planda_calistir(self._guncelle_async(self._gorev, turlar))
+        return self._gorev
+
+    def durum(self):
+        """Kontrol noktasına yazılacak durum (tamamlanmış son güncelleme)"""
+        return {"ara_analiz": self.ara_analiz, "sonuc": self.sonuc, "islenen_tur": self.islenen_tur}
+
+    def durumu_yukle(self, durum):
+        self.ara_analiz = durum.get("ara_analiz", "")
+        self.sonuc = durum.get("sonuc")
+        self.islenen_tur = durum.get("islenen_tur", 0)
+
+    def sonuclandir(self, konusma_gecmisi, zaman_asimi=30):
+        """Kalan turları işle ve analiz sonucunu döndür (başarısızsa None)"""
+        gorev = self.guncelle(konusma_gecmisi)
+        try:
+            gorev.result(timeout=zaman_asimi)
+        except Exception as e:
+            print(f"❌ Artımlı analiz hatası: {e}")
+        return self.sonuc if self.islenen_tur == len(konusma_gecmisi) else None
+
+    async def _guncelle_async(self, onceki_gorev, turlar):
+        if onceki_gorev is not None:
+            try:
+                await asyncio.wrap_future(onceki_gorev)
+            except Exception:
+                pass
+
+        yeni_turlar = turlar[self.islenen_tur:]
+        if not yeni_turlar:
+            return
+
+        istemci = async_openai_istemci_al()
+        if not istemci:
+            return
+
+        # Acil olmayan seanslarda ara analiz, canlı cevapların arkasında bekler
+        aktif_oncelik.set(ACIL if aciliyet_onceligi(self.problem_bilgisi['aciliyet']) == ACIL else ARKA_PLAN)
+        # Aşama: güncellemeyi tetikleyen son tur (konusma_sirasi, 0'dan başlar)
+        with cagri_olc("ara_analiz", "gpt-4o-mini", len(turlar) - 1) as cagri:
+            response = await istemci.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": ARA_ANALIZ_SISTEM_PROMPTU},
+                    {"role": "user", "content": self.prompt_hazirla(yeni_turlar)}
+                ],
+                max_tokens=400,
+                temperature=0.3,
+                response_format=ANALIZ_YANIT_BICIMI
+            )
+            cagri.kullanim(response.usage)
+
+        # Şemaya uymayan çıktı önceki analizi bozmaz; turlar bir sonraki güncellemede tekrar işlenir
+        icerik = yanit_icerigi(response)
+        self.sonuc = analiz_coz(icerik)
+        self.ara_analiz = icerik.strip()
+        self.islenen_tur = len(turlar)
+
+    def prompt_hazirla(self, yeni_turlar):
+        konusmalar = ""
+        for k in yeni_turlar:
+            konusmalar += f"Hasta: {k['kullanici']}\nPsikolog: {k['ai']}\n\n"
+
+        return f"""Problem: {self.problem_bilgisi['metin']}
+Aciliyet: {self.problem_bilgisi['aciliyet']}
+
+Önceki ara değerlendirme:
+{self.ara_analiz or "Henüz yok"}
+
+Yeni konuşmalar:
+{konusmalar}"""
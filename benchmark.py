@@ -0,0 +1,311 @@
+"""main.py ve utils_anxiety.py fonksiyonları için gecikme/verim ölçümü
+
+Yerel sahte OpenAI sunucusu (sahte_openai.py) başlatılır, her fonksiyon
+eşzamanlı olarak tekrar tekrar çağrılır ve p50/p95/p99 ile verim raporlanır.
+
+--baslangic ile bunun yerine modüllerin soğuk açılış (import) süresi
+`python -X importtime` ile ayrı süreçlerde ölçülür; açılışta tembel yüklenmesi
+gereken bir paket (openai, numpy, ...; utils_anxiety için streamlit de) import
+edilmişse çıkış kodu 1 olur.
+
+Kullanım:
+    python benchmark.py --tekrar 50 --eszamanli 8 --json sonuc.json
+    python benchmark.py --karsilastir onceki.json --esik 1.2   # p95 %20'den fazla kötüleşirse çıkış kodu 1
+    python benchmark.py --baslangic --json baslangic.json
+"""
+import argparse
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from analiz_sonucu import analiz_coz
+from sahte_openai import ORNEK_ANALIZ, ORNEK_CEVAP, SahteAyarlar, sunucu_baslat
+
+# Açılışta import edilmemesi gereken ağır paketler (bkz. tembel.py)
+TEMBEL_PAKETLER = ["openai", "httpx", "numpy", "pandas", "pygame"]
+# Ölçülen modül -> açılışta ayrıca import edilmemesi gereken paketler
+BASLANGIC_MODULLERI = {
+    "main": [],
+    # CLI araçları (toplu_analiz, ses_onbellek --on-isit, benchmark) Streamlit'i yüklememeli
+    "utils_anxiety": ["streamlit"],
+}
+
+PROBLEM_BILGISI = {
+    "metin": "İş yerinde sürekli gerginim, geceleri uyuyamıyorum.",
+    "terapi_gecmisi": "Daha önce terapi almadım",
+    "aciliyet": "Orta, yardım almak istiyorum"
+}
+KONUSMA_GECMISI = [
+    {
+        "kullanici": f"{i}. turda işteki toplantılardan ve yöneticimden bahsediyorum.",
+        "ai": "Bu toplantılarda bedeninizde neler hissediyorsunuz?",
+        "zaman": "2024-01-01T10:00:00"
+    }
+    for i in range(6)
+]
+
+
+def ornek_wav(saniye, hiz=16000):
+    """Konuşma benzeri bloklar ve aralarda duraklamalar içeren WAV"""
+    ornekler = np.zeros(int(saniye * hiz), dtype=np.float32)
+    for bas in np.arange(0, saniye, 4.0):
+        b, s = int(bas * hiz), int(min(bas + 3.0, saniye) * hiz)
+        ornekler[b:s] = 6000 * np.sin(np.arange(s - b) * 2 * np.pi * 220 / hiz)
+    tampon = io.BytesIO()
+    with wave.open(tampon, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(hiz)
+        w.writeframes(ornekler.astype("<i2").tobytes())
+    return tampon.getvalue()
+
+
+def ilk_parcaya_kadar(uretec):
+    """Üreteci tüketip (ilk parça süresi) döndür"""
+    baslangic = time.perf_counter()
+    ilk = None
+    for _ in uretec:
+        if ilk is None:
+            ilk = time.perf_counter() - baslangic
+    return ilk
+
+
+def cumleleri_numarala(akis, i):
+    """Akıştaki her cümleye çağrı numarasını ekle
+
+    Sahte sunucu hep aynı cevabı döndürür; numarasız cümleler ilk çağrıdan sonra
+    TTS önbelleğinden gelir ve ölçüm sentez hattını değil önbelleği ölçer.
+    """
+    for parca in akis:
+        yield re.sub(r"([.!?])", rf" {i}\1", parca)
+
+
+def olcumleri_hazirla(main, utils, secim=None):
+    """(ad, fonk) listesi; fonk(i) bir çağrı yapar, akışlı ise ilk parça süresini döndürür"""
+    kisa_ses = ornek_wav(6)
+    uzun_ses = ornek_wav(45)
+
+    olcumler = [
+        ("main.ai_psikolog_cevap_uret", lambda i: main.ai_psikolog_cevap_uret(
+            f"Bugün yine çok gerginim ({i})", PROBLEM_BILGISI, KONUSMA_GECMISI, 3)),
+        ("main.ai_psikolog_cevap_akisi", lambda i: ilk_parcaya_kadar(main.ai_psikolog_cevap_akisi(
+            f"Bugün yine çok gerginim ({i})", PROBLEM_BILGISI, KONUSMA_GECMISI, 3))),
+        ("main.seans_analizi_yap", lambda i: main.seans_analizi_yap(PROBLEM_BILGISI, KONUSMA_GECMISI)),
+        ("analiz_coz", lambda i: analiz_coz(ORNEK_ANALIZ)),
+        ("utils.ai_psikolog_cevap_uret", lambda i: utils.ai_psikolog_cevap_uret(
+            f"Bugün yine çok gerginim ({i})", PROBLEM_BILGISI, KONUSMA_GECMISI, 3)),
+        ("utils.ai_psikolog_cevap_akisi", lambda i: ilk_parcaya_kadar(utils.ai_psikolog_cevap_akisi(
+            f"Bugün yine çok gerginim ({i})", PROBLEM_BILGISI, KONUSMA_GECMISI, 3))),
+        ("utils.seans_analizi_yap", lambda i: utils.seans_analizi_yap(PROBLEM_BILGISI, KONUSMA_GECMISI)),
+        # Önbelleğe takılmaması için her çağrıda farklı metin
+        ("utils.metinden_stres_analizi", lambda i: utils.metinden_stres_analizi(
+            f"Kalbim çok hızlı atıyor, nefes alamıyorum ({i})", mod="llm")),
+        ("utils.metinden_stres_analizi[yerel]", lambda i: utils.metinden_stres_analizi(
+            f"Kalbim çok hızlı atıyor, nefes alamıyorum ({i})", mod="yerel")),
+        ("utils.tur_isle", lambda i: utils.tur_isle(
+            f"Bugün yine çok gerginim ({i})", PROBLEM_BILGISI, KONUSMA_GECMISI, 3)),
+        ("utils.sesi_metne_cevir_openai[6sn]", lambda i: utils.sesi_metne_cevir_openai(kisa_ses)),
+        ("utils.sesi_metne_cevir_openai[45sn]", lambda i: utils.sesi_metne_cevir_openai(uzun_ses)),
+        ("utils.metinden_sese_openai", lambda i: utils.metinden_sese_openai(f"{ORNEK_CEVAP} ({i})")),
+        ("utils.cumle_cumle_seslendir", lambda i: ilk_parcaya_kadar(utils.cumle_cumle_seslendir(cumleleri_numarala(
+            utils.ai_psikolog_cevap_akisi(f"Bugün yine çok gerginim ({i})", PROBLEM_BILGISI, KONUSMA_GECMISI, 3), i)))),
+    ]
+    if secim:
+        olcumler = [(ad, fonk) for ad, fonk in olcumler if any(s in ad for s in secim)]
+    return olcumler
+
+
+def olc(fonk, tekrar, eszamanli):
+    """fonk'u tekrar kez, eszamanli işçiyle çalıştır; gecikme istatistiklerini döndür"""
+    def bir_cagri(i):
+        baslangic = time.perf_counter()
+        ilk_parca = fonk(i)
+        return time.perf_counter() - baslangic, ilk_parca if isinstance(ilk_parca, float) else None
+
+    # Isınma (bağlantı havuzu, lazy init)
+    bir_cagri(-1)
+
+    baslangic = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=eszamanli) as havuz:
+        sonuclar = list(havuz.map(bir_cagri, range(tekrar)))
+    toplam_sure = time.perf_counter() - baslangic
+
+    sureler = np.array([s for s, _ in sonuclar]) * 1000
+    ilk_parcalar = np.array([p for _, p in sonuclar if p is not None]) * 1000
+    sonuc = {
+        "tekrar": tekrar,
+        "eszamanli": eszamanli,
+        "p50_ms": float(np.percentile(sureler, 50)),
+        "p95_ms": float(np.percentile(sureler, 95)),
+        "p99_ms": float(np.percentile(sureler, 99)),
+        "verim_sn": tekrar / toplam_sure
+    }
+    if len(ilk_parcalar):
+        sonuc["ilk_parca_p50_ms"] = float(np.percentile(ilk_parcalar, 50))
+        sonuc["ilk_parca_p95_ms"] = float(np.percentile(ilk_parcalar, 95))
+    return sonuc
+
+
+def importtime_coz(cikti):
+    """-X importtime çıktısını [(modül, kendi_ms, toplam_ms, derinlik)] listesine çevir"""
+    satirlar = []
+    for satir in cikti.splitlines():
+        if not satir.startswith("import time:") or "self [us]" in satir:
+            continue
+        kendi, toplam, ad = satir[len("import time:"):].split("|", 2)
+        derinlik = (len(ad) - len(ad.lstrip()) - 1) // 2
+        satirlar.append((ad.strip(), int(kendi) / 1000, int(toplam) / 1000, derinlik))
+    return satirlar
+
+
+def baslangic_olc(modul, tekrar, yasaklar=()):
+    """Modülü her seferinde yeni bir Python sürecinde import edip açılış süresini ölç"""
+    klasor = os.path.dirname(os.path.abspath(__file__))
+    sureler = []
+    for _ in range(tekrar):
+        cikti = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {modul}"],
+            cwd=klasor, capture_output=True, text=True
+        )
+        if cikti.returncode != 0:
+            raise RuntimeError(f"{modul} import edilemedi:\n{cikti.stderr[-2000:]}")
+        satirlar = importtime_coz(cikti.stderr)
+        sureler.append(next(toplam for ad, _, toplam, _ in reversed(satirlar) if ad == modul))
+
+    yuklenenler = {ad for ad, _, _, _ in satirlar}
+    sureler = np.array(sureler)
+    return {
+        "tekrar": tekrar,
+        "eszamanli": 1,
+        "p50_ms": float(np.percentile(sureler, 50)),
+        "p95_ms": float(np.percentile(sureler, 95)),
+        "p99_ms": float(np.percentile(sureler, 99)),
+        "verim_sn": 1000 / float(np.mean(sureler)),
+        "yasak_yuklenenler": [p for p in TEMBEL_PAKETLER + list(yasaklar) if p in yuklenenler],
+        # Son ölçümde doğrudan import edilenlerin en ağırları
+        "en_agir": [
+            [ad, round(toplam, 1)]
+            for ad, _, toplam, derinlik in sorted(satirlar, key=lambda s: -s[2])
+            if derinlik == 1
+        ][:10]
+    }
+
+
+def baslangic_raporu(sonuclar):
+    """En ağır importları yazdır, açılışta yüklenmemesi gerekirken yüklenen paketleri döndür"""
+    hatalar = []
+    for ad, s in sonuclar.items():
+        print(f"\n{ad} — en ağır doğrudan importlar (ms):")
+        for modul, sure in s["en_agir"]:
+            print(f"  {modul:<30} {sure:>8.1f}")
+        if s["yasak_yuklenenler"]:
+            hatalar.append((ad, s["yasak_yuklenenler"]))
+    return hatalar
+
+
+def rapor_yazdir(sonuclar):
+    print(f"\n{'Fonksiyon':<40} {'p50':>9} {'p95':>9} {'p99':>9} {'ilk p50':>9} {'çağrı/sn':>9}")
+    print("-" * 90)
+    for ad, s in sonuclar.items():
+        ilk = f"{s['ilk_parca_p50_ms']:.0f}" if "ilk_parca_p50_ms" in s else "-"
+        print(f"{ad:<40} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {ilk:>9} {s['verim_sn']:>9.1f}")
+
+
+def karsilastir(sonuclar, onceki_dosya, esik):
+    """p95'i önceki ölçüme göre esik katından fazla kötüleşen fonksiyonları döndür"""
+    with open(onceki_dosya, "r", encoding="utf-8") as f:
+        onceki = json.load(f)["sonuclar"]
+    gerilemeler = []
+    for ad, s in sonuclar.items():
+        if ad in onceki and s["p95_ms"] > onceki[ad]["p95_ms"] * esik:
+            gerilemeler.append((ad, onceki[ad]["p95_ms"], s["p95_ms"]))
+    return gerilemeler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte OpenAI sunucusuyla gecikme ölçümü")
+    parser.add_argument("--tekrar", type=int, default=30)
+    parser.add_argument("--eszamanli", type=int, default=4)
+    parser.add_argument("--gecikme-ms", type=float, default=150, help="Sunucu ilk yanıt gecikmesi")
+    parser.add_argument("--token-hizi", type=float, default=80.0, help="Saniyede çıktı token'ı")
+    parser.add_argument("--hata-orani", type=float, default=0.0, help="429/500 dönen istek oranı")
+    parser.add_argument("--zamanlayici", action="store_true", help="Gerçek model limitleriyle zamanlayıcıyı da ölç")
+    parser.add_argument("--sadece", nargs="*", help="Adında bu ifadeler geçen ölçümler")
+    parser.add_argument("--json", default=None, help="Sonuçların yazılacağı dosya")
+    parser.add_argument("--karsilastir", default=None, help="Önceki sonuç dosyası")
+    parser.add_argument("--esik", type=float, default=1.2, help="İzin verilen p95 kötüleşme katı")
+    parser.add_argument("--baslangic", action="store_true", help="Sadece modül açılış (import) süresini ölç")
+    parser.add_argument("--baslangic-tekrar", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.baslangic:
+        sonuclar = {}
+        for modul, yasaklar in BASLANGIC_MODULLERI.items():
+            print(f"⏱️ import {modul}...", file=sys.stderr)
+            sonuclar[f"baslangic.{modul}"] = baslangic_olc(modul, args.baslangic_tekrar, yasaklar)
+        rapor_yazdir(sonuclar)
+        hatalar = baslangic_raporu(sonuclar)
+        for ad, paketler in hatalar:
+            print(f"❌ {ad}: açılışta yüklenmemesi gereken paketler import edildi: {', '.join(paketler)}")
+        return sonuclari_bitir(sonuclar, args, {"baslangic_tekrar": args.baslangic_tekrar}) or int(bool(hatalar))
+
+    ayarlar = SahteAyarlar(args.gecikme_ms, args.token_hizi, args.hata_orani)
+    sunucu, adres = sunucu_baslat(ayarlar)
+
+    # Modüller yapılandırmayı import anında okuduğu için ortam önce ayarlanır
+    os.environ["OPENAI_BASE_URL"] = adres
+    os.environ["OPENAI_API_KEY"] = "sahte-anahtar"
+    os.environ.setdefault("TTS_ONBELLEK_KLASORU", tempfile.mkdtemp(prefix="tts_benchmark_"))
+    if not args.zamanlayici:
+        os.environ["OPENAI_MODEL_LIMITLERI"] = json.dumps({"*": [0, 0]})
+
+    import main as ana_modul
+    import utils_anxiety
+
+    if not (ana_modul.openai_baslat() and utils_anxiety.openai_baslat()):
+        print("❌ OpenAI istemcisi başlatılamadı")
+        return 1
+
+    sonuclar = {}
+    for ad, fonk in olcumleri_hazirla(ana_modul, utils_anxiety, args.sadece):
+        print(f"⏱️ {ad}...", file=sys.stderr)
+        sonuclar[ad] = olc(fonk, args.tekrar, args.eszamanli)
+    sunucu.shutdown()
+
+    rapor_yazdir(sonuclar)
+    print(f"\nSahte sunucu: {ayarlar.istek_sayisi} istek, {ayarlar.hata_sayisi} enjekte hata")
+
+    return sonuclari_bitir(sonuclar, args, {
+        "gecikme_ms": args.gecikme_ms,
+        "token_hizi": args.token_hizi,
+        "hata_orani": args.hata_orani
+    })
+
+
+def sonuclari_bitir(sonuclar, args, ayarlar):
+    """Sonuçları JSON'a yaz, istenmişse önceki ölçümle karşılaştır; çıkış kodunu döndür"""
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"ayarlar": ayarlar, "sonuclar": sonuclar}, f, ensure_ascii=False, indent=2)
+
+    if args.karsilastir:
+        gerilemeler = karsilastir(sonuclar, args.karsilastir, args.esik)
+        for ad, onceki, simdi in gerilemeler:
+            print(f"❌ {ad}: p95 {onceki:.1f} ms -> {simdi:.1f} ms")
+        if gerilemeler:
+            return 1
+        print("✅ Performans gerilemesi yok")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""AI-Psycho Professional yapılandırma ayarları"""
+import json
+import os
+
+# Depolama
+DEPOLAMA_TURU = os.getenv("DEPOLAMA_TURU", "sqlite")
+VERITABANI_YOLU = os.getenv("VERITABANI_YOLU", "ai_psycho.db")
+DOSYA_DEPO_KOKU = os.getenv("DOSYA_DEPO_KOKU", "kullanici_verileri")
+
+# Devam eden seansların süreçler/replikalar arası paylaşılan kontrol noktaları
+# ("sqlite": VERITABANI_YOLU içinde tablo, "dosya": klasörde kullanıcı başına JSON, "kapali")
+SEANS_DURUMU_TURU = os.getenv("SEANS_DURUMU_TURU", "sqlite")
+SEANS_DURUMU_KLASORU = os.getenv("SEANS_DURUMU_KLASORU", "seans_durumlari")
+SEANS_DURUMU_TTL = float(os.getenv("SEANS_DURUMU_TTL", str(2 * 3600)))
+
+# OpenAI bağlantı havuzu
+OPENAI_HAVUZ_BOYUTU = int(os.getenv("OPENAI_HAVUZ_BOYUTU", "20"))
+OPENAI_KEEPALIVE_BAGLANTI = int(os.getenv("OPENAI_KEEPALIVE_BAGLANTI", "10"))
+OPENAI_KEEPALIVE_SURESI = float(os.getenv("OPENAI_KEEPALIVE_SURESI", "60"))
+OPENAI_ZAMAN_ASIMI = float(os.getenv("OPENAI_ZAMAN_ASIMI", "30"))
+OPENAI_BAGLANTI_ZAMAN_ASIMI = float(os.getenv("OPENAI_BAGLANTI_ZAMAN_ASIMI", "5"))
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "1") == "1"
+
+# İstek zamanlayıcısı: model başına [dakikada istek, dakikada token] (0 = sınırsız, "*" = diğer modeller)
+OPENAI_MODEL_LIMITLERI = json.loads(os.getenv("OPENAI_MODEL_LIMITLERI", json.dumps({
+    "gpt-4o-mini": [500, 200000],
+    "tts-1": [50, 0],
+    "whisper-1": [50, 0],
+    "*": [500, 0]
+})))
+ZAMANLAYICI_MAX_KUYRUK = int(os.getenv("ZAMANLAYICI_MAX_KUYRUK", "200"))
+ZAMANLAYICI_MAX_BEKLEME = float(os.getenv("ZAMANLAYICI_MAX_BEKLEME", "60"))
+# Tek tekrar deneme katmanı: 429 / 5xx / bağlantı hatasında transport en fazla bu kadar dener
+# (OpenAI SDK istemcileri max_retries=0 ile kurulur)
+ZAMANLAYICI_DENEME = int(os.getenv("ZAMANLAYICI_DENEME", "3"))
+
+# Stres analizi önbelleği
+STRES_ONBELLEK_BOYUTU = int(os.getenv("STRES_ONBELLEK_BOYUTU", "2048"))
+STRES_ONBELLEK_TTL = float(os.getenv("STRES_ONBELLEK_TTL", str(24 * 3600)))
+STRES_ONBELLEK_DOSYASI = os.getenv("STRES_ONBELLEK_DOSYASI") or None
+
+# Stres analizi modu: "llm", "yerel" veya "yerel_oncelikli"
+STRES_ANALIZ_MODU = os.getenv("STRES_ANALIZ_MODU", "llm")
+YEREL_GUVEN_ESIGI = float(os.getenv("YEREL_GUVEN_ESIGI", "3.0"))
+
+# Konuşma bağlamı (kayan özet)
+SON_TUR_SAYISI = int(os.getenv("SON_TUR_SAYISI", "3"))
+BAGLAM_TOKEN_BUTCESI = int(os.getenv("BAGLAM_TOKEN_BUTCESI", "600"))
+ANALIZ_TOKEN_BUTCESI = int(os.getenv("ANALIZ_TOKEN_BUTCESI", "1500"))
+
+# TTS ses önbelleği
+TTS_ONBELLEK_KLASORU = os.getenv("TTS_ONBELLEK_KLASORU", "ses_onbellegi")
+TTS_ONBELLEK_MAX_MB = float(os.getenv("TTS_ONBELLEK_MAX_MB", "200"))
+TTS_SICAK_MAX_MB = float(os.getenv("TTS_SICAK_MAX_MB", "20"))
+TTS_PARALEL_ISTEK = int(os.getenv("TTS_PARALEL_ISTEK", "3"))
+TTS_PARCA_BAYT = int(os.getenv("TTS_PARCA_BAYT", "4096"))
+TTS_EN_KISA_CUMLE = int(os.getenv("TTS_EN_KISA_CUMLE", "12"))
+
+# Ses ön işleme (Whisper öncesi)
+SES_ON_ISLEME = os.getenv("SES_ON_ISLEME", "1") == "1"
+SES_HEDEF_HIZ = int(os.getenv("SES_HEDEF_HIZ", "16000"))
+SESSIZLIK_ESIGI = float(os.getenv("SESSIZLIK_ESIGI", "500"))
+SESSIZLIK_PAYI_MS = int(os.getenv("SESSIZLIK_PAYI_MS", "200"))
+
+# Uzun kayıtların duraklardan bölünüp paralel çevrilmesi
+SES_PARCALAMA_ESIGI_SN = float(os.getenv("SES_PARCALAMA_ESIGI_SN", "20"))
+SES_PARCA_MAX_SN = float(os.getenv("SES_PARCA_MAX_SN", "15"))
+SES_PARCA_SESSIZLIK_MS = int(os.getenv("SES_PARCA_SESSIZLIK_MS", "400"))
+SES_TRANSKRIPSIYON_ISCI = int(os.getenv("SES_TRANSKRIPSIYON_ISCI", "4"))
+
+# Çağrı ölçümleri: Prometheus /metrics portu (0 = kapalı) ve/veya periyodik JSON dökümü
+METRIK_PORTU = int(os.getenv("METRIK_PORTU", "0"))
+METRIK_JSON_DOSYASI = os.getenv("METRIK_JSON_DOSYASI") or None
+METRIK_JSON_ARALIGI = float(os.getenv("METRIK_JSON_ARALIGI", "60"))
+
+# Profil sayfası stres trendi
+TREND_KAYAN_PENCERE = int(os.getenv("TREND_KAYAN_PENCERE", "5"))
+TREND_DEGISIM_PENCERESI = int(os.getenv("TREND_DEGISIM_PENCERESI", "3"))
+TREND_DEGISIM_ESIGI = float(os.getenv("TREND_DEGISIM_ESIGI", "2.0"))
+# Bu kadar seanstan fazlası grafikte haftalık ortalamaya indirgenir
+TREND_MAX_NOKTA = int(os.getenv("TREND_MAX_NOKTA", "1500"))
+TREND_ONBELLEK_BOYUTU = int(os.getenv("TREND_ONBELLEK_BOYUTU", "256"))
+
+# Seans ekranı: geri sayım parçası (st.fragment) kaç saniyede bir kendini yeniler
+SEANS_SAYAC_ARALIGI = float(os.getenv("SEANS_SAYAC_ARALIGI", "1"))
@@ -0,0 +1,626 @@
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: süreçler arası kilit yok, sadece thread kilidi kullanılır
+    fcntl = None
+
+from config import DEPOLAMA_TURU, VERITABANI_YOLU, DOSYA_DEPO_KOKU
+
+BASLIK_PROBLEM_UZUNLUGU = 100
+
+
+class KullaniciDeposu(ABC):
+    """Kullanıcı depolama arayüzü"""
+
+    @abstractmethod
+    def kullanici_getir(self, kullanici_adi):
+        """Kullanıcı kaydını getir (seanslar hariç)"""
+
+    @abstractmethod
+    def kullanici_olustur(self, kullanici_adi, veri):
+        """Yeni kullanıcı oluştur; kullanıcı adı alınmışsa hiçbir şey yazmadan False döndür"""
+
+    @abstractmethod
+    def kullanici_kaydet(self, kullanici_adi, veri):
+        """Kullanıcı profilini güncelle (şifre hash'i değiştirilmez)"""
+
+    @abstractmethod
+    def seans_ekle(self, kullanici_adi, seans):
+        """Kullanıcıya yeni seans ekle"""
+
+    @abstractmethod
+    def seans_sayisi(self, kullanici_adi):
+        """Kullanıcının kayıtlı seans sayısı"""
+
+    @abstractmethod
+    def seanslari_getir(self, kullanici_adi, limit=None):
+        """Kullanıcının seanslarını eskiden yeniye getir"""
+
+    @abstractmethod
+    def seans_basliklari_getir(self, kullanici_adi, baslangic=0, adet=10):
+        """Seans başlıklarını (bkz. seans_basligi) yeniden eskiye, sayfa sayfa getir"""
+
+    @abstractmethod
+    def seans_getir(self, kullanici_adi, baslik):
+        """seans_basliklari_getir'in döndürdüğü başlığa ait tam seansı getir"""
+
+
+def seans_basligi(tarih, problem, analiz, tur_sayisi):
+    """Profil listesi için seansın küçük özeti (tam rapor yüklenmeden gösterilir)"""
+    return {
+        "tarih": tarih,
+        "problem": problem.get("metin", "")[:BASLIK_PROBLEM_UZUNLUGU],
+        "klinik_tani": analiz.get("klinik_tani", ""),
+        "stres_seviyesi": analiz.get("stres_seviyesi"),
+        "ruh_hali": analiz.get("ruh_hali", ""),
+        "aciliyet": problem.get("aciliyet", ""),
+        "tur_sayisi": tur_sayisi
+    }
+
+
+class SQLiteDepo(KullaniciDeposu):
+    """SQLite (WAL) tabanlı kullanıcı deposu"""
+
+    SEMA = """
+    CREATE TABLE IF NOT EXISTS kullanicilar (
+        kullanici_adi TEXT PRIMARY KEY,
+        sifre_hash TEXT NOT NULL,
+        kayit_tarihi TEXT NOT NULL,
+        profil TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS seanslar (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kullanici_adi TEXT NOT NULL REFERENCES kullanicilar(kullanici_adi),
+        tarih TEXT NOT NULL,
+        problem TEXT NOT NULL,
+        analiz TEXT NOT NULL,
+        sure INTEGER NOT NULL,
+        olcum TEXT,
+        baslik TEXT
+    );
+    CREATE INDEX IF NOT EXISTS ix_seanslar_kullanici ON seanslar(kullanici_adi, id);
+    CREATE TABLE IF NOT EXISTS turlar (
+        seans_id INTEGER NOT NULL REFERENCES seanslar(id),
+        sira INTEGER NOT NULL,
+        kullanici TEXT NOT NULL,
+        ai TEXT NOT NULL,
+        zaman TEXT,
+        stres TEXT,
+        PRIMARY KEY (seans_id, sira)
+    );
+    """
+
+    def __init__(self, yol=VERITABANI_YOLU):
+        self.yol = yol
+        self._yerel = threading.local()
+        baglanti = self._baglanti()
+        baglanti.execute("PRAGMA journal_mode=WAL")
+        baglanti.executescript(self.SEMA)
+        self._sema_guncelle(baglanti)
+
+    def _sema_guncelle(self, baglanti):
+        # Eski veritabanlarına sonradan eklenen sütunlar
+        turlar_sutunlari = {satir[1] for satir in baglanti.execute("PRAGMA table_info(turlar)")}
+        if "stres" not in turlar_sutunlari:
+            baglanti.execute("ALTER TABLE turlar ADD COLUMN stres TEXT")
+        seanslar_sutunlari = {satir[1] for satir in baglanti.execute("PRAGMA table_info(seanslar)")}
+        if "olcum" not in seanslar_sutunlari:
+            baglanti.execute("ALTER TABLE seanslar ADD COLUMN olcum TEXT")
+        if "baslik" not in seanslar_sutunlari:
+            baglanti.execute("ALTER TABLE seanslar ADD COLUMN baslik TEXT")
+            # Mevcut seansların başlıkları bir kez hesaplanır
+            satirlar = baglanti.execute(
+                """SELECT s.id, s.tarih, s.problem, s.analiz,
+                          (SELECT COUNT(*) FROM turlar t WHERE t.seans_id = s.id)
+                   FROM seanslar s"""
+            ).fetchall()
+            with baglanti:
+                baglanti.executemany(
+                    "UPDATE seanslar SET baslik = ? WHERE id = ?",
+                    [
+                        (json.dumps(seans_basligi(tarih, json.loads(problem), json.loads(analiz), tur_sayisi),
+                                    ensure_ascii=False), seans_id)
+                        for seans_id, tarih, problem, analiz, tur_sayisi in satirlar
+                    ]
+                )
+
+    def _baglanti(self):
+        # sqlite bağlantıları thread'ler arasında paylaşılmaz
+        baglanti = getattr(self._yerel, "baglanti", None)
+        if baglanti is None:
+            baglanti = sqlite3.connect(self.yol, timeout=30)
+            baglanti.execute("PRAGMA synchronous=NORMAL")
+            baglanti.execute("PRAGMA foreign_keys=ON")
+            self._yerel.baglanti = baglanti
+        return baglanti
+
+    def kullanici_getir(self, kullanici_adi):
+        satir = self._baglanti().execute(
+            "SELECT sifre_hash, kayit_tarihi, profil FROM kullanicilar WHERE kullanici_adi = ?",
+            (kullanici_adi,)
+        ).fetchone()
+        if not satir:
+            return None
+        return {
+            "kullanici_adi": kullanici_adi,
+            "sifre_hash": satir[0],
+            "kayit_tarihi": satir[1],
+            "profil": json.loads(satir[2])
+        }
+
+    def kullanici_olustur(self, kullanici_adi, veri):
+        try:
+            with self._baglanti() as baglanti:
+                baglanti.execute(
+                    """INSERT INTO kullanicilar (kullanici_adi, sifre_hash, kayit_tarihi, profil)
+                       VALUES (?, ?, ?, ?)""",
+                    (
+                        kullanici_adi,
+                        veri["sifre_hash"],
+                        veri["kayit_tarihi"],
+                        json.dumps(veri["profil"], ensure_ascii=False)
+                    )
+                )
+        except sqlite3.IntegrityError:
+            # Aynı adla eşzamanlı kayıt: ilk yazan kazanır
+            return False
+        return True
+
+    def kullanici_kaydet(self, kullanici_adi, veri):
+        with self._baglanti() as baglanti:
+            baglanti.execute(
+                """INSERT INTO kullanicilar (kullanici_adi, sifre_hash, kayit_tarihi, profil)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(kullanici_adi) DO UPDATE SET profil = excluded.profil""",
+                (
+                    kullanici_adi,
+                    veri["sifre_hash"],
+                    veri["kayit_tarihi"],
+                    json.dumps(veri["profil"], ensure_ascii=False)
+                )
+            )
+        return True
+
+    def seans_ekle(self, kullanici_adi, seans):
+        with self._baglanti() as baglanti:
+            imlec = baglanti.execute(
+                """INSERT INTO seanslar (kullanici_adi, tarih, problem, analiz, sure, olcum, baslik)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    kullanici_adi,
+                    seans["tarih"],
+                    json.dumps(seans["problem"], ensure_ascii=False),
+                    json.dumps(seans["analiz"], ensure_ascii=False),
+                    seans.get("sure", 0),
+                    json.dumps(seans["olcum"], ensure_ascii=False) if seans.get("olcum") else None,
+                    json.dumps(seans_basligi(
+                        seans["tarih"], seans["problem"], seans["analiz"], len(seans.get("konusmalar", []))
+                    ), ensure_ascii=False)
+                )
+            )
+            seans_id = imlec.lastrowid
+            baglanti.executemany(
+                "INSERT INTO turlar (seans_id, sira, kullanici, ai, zaman, stres) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        seans_id, sira, k["kullanici"], k["ai"], k.get("zaman"),
+                        json.dumps(k["stres"], ensure_ascii=False) if k.get("stres") else None
+                    )
+                    for sira, k in enumerate(seans.get("konusmalar", []))
+                ]
+            )
+        return seans_id
+
+    def seans_sayisi(self, kullanici_adi):
+        return self._baglanti().execute(
+            "SELECT COUNT(*) FROM seanslar WHERE kullanici_adi = ?", (kullanici_adi,)
+        ).fetchone()[0]
+
+    def seanslari_getir(self, kullanici_adi, limit=None):
+        baglanti = self._baglanti()
+        sorgu = "SELECT id, tarih, problem, analiz, sure, olcum FROM seanslar WHERE kullanici_adi = ? ORDER BY id DESC"
+        parametreler = (kullanici_adi,)
+        if limit is not None:
+            sorgu += " LIMIT ?"
+            parametreler += (limit,)
+        satirlar = baglanti.execute(sorgu, parametreler).fetchall()
+        return [self._seans_olustur(baglanti, satir) for satir in reversed(satirlar)]
+
+    def _seans_olustur(self, baglanti, satir):
+        seans_id, tarih, problem, analiz, sure, olcum = satir
+        konusmalar = []
+        for kullanici, ai, zaman, stres in baglanti.execute(
+            "SELECT kullanici, ai, zaman, stres FROM turlar WHERE seans_id = ? ORDER BY sira",
+            (seans_id,)
+        ):
+            konusma = {"kullanici": kullanici, "ai": ai, "zaman": zaman}
+            if stres:
+                konusma["stres"] = json.loads(stres)
+            konusmalar.append(konusma)
+        seans = {
+            "tarih": tarih,
+            "problem": json.loads(problem),
+            "konusmalar": konusmalar,
+            "analiz": json.loads(analiz),
+            "sure": sure
+        }
+        if olcum:
+            seans["olcum"] = json.loads(olcum)
+        return seans
+
+    def seans_basliklari_getir(self, kullanici_adi, baslangic=0, adet=10):
+        # (kullanici_adi, id) indeksi üzerinden; turlar ve analiz metinleri okunmaz
+        satirlar = self._baglanti().execute(
+            "SELECT id, baslik FROM seanslar WHERE kullanici_adi = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (kullanici_adi, adet, baslangic)
+        ).fetchall()
+        return [{**json.loads(baslik), "seans_no": seans_id} for seans_id, baslik in satirlar]
+
+    def seans_getir(self, kullanici_adi, baslik):
+        baglanti = self._baglanti()
+        satir = baglanti.execute(
+            "SELECT id, tarih, problem, analiz, sure, olcum FROM seanslar WHERE id = ? AND kullanici_adi = ?",
+            (baslik["seans_no"], kullanici_adi)
+        ).fetchone()
+        return self._seans_olustur(baglanti, satir) if satir else None
+
+
+def atomik_yaz(dosya_yolu, icerik):
+    """Dosyayı geçici dosya + rename ile atomik olarak yaz"""
+    klasor = os.path.dirname(dosya_yolu)
+    fd, gecici_yol = tempfile.mkstemp(dir=klasor, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(icerik)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(gecici_yol, dosya_yolu)
+    except BaseException:
+        try:
+            os.remove(gecici_yol)
+        except OSError:
+            pass
+        raise
+
+
+def yarim_satiri_kes(f, blok=8192):
+    """Sona ekleme sırasında çökmeden kalan yarım son satırı sil, yeni dosya sonunu döndür
+
+    f ikili (binary) ve yazılabilir açılmış olmalı. Yarım satır hiç onaylanmamış
+    bir kayıttır; üzerine yeni satır eklenirse iki kayıt birden okunamaz olur.
+    """
+    son = f.seek(0, os.SEEK_END)
+    if son == 0:
+        return 0
+    f.seek(son - 1)
+    if f.read(1) == b"\n":
+        return son
+    konum = son
+    while konum > 0:
+        okunacak = min(blok, konum)
+        konum -= okunacak
+        f.seek(konum)
+        satir_sonu = f.read(okunacak).rfind(b"\n")
+        if satir_sonu >= 0:
+            konum += satir_sonu + 1
+            break
+    f.truncate(konum)
+    return konum
+
+
+def sondan_satirlar(dosya_yolu, atla, adet, blok=8192):
+    """Dosyanın sonundan geriye okuyarak son `atla` satırdan önceki `adet` satırı yeniden eskiye döndür
+
+    Sadece gereken kadar blok okunur; ilk sayfa dosya boyutundan bağımsızdır.
+    """
+    gereken = atla + adet
+    with open(dosya_yolu, "rb") as f:
+        konum = f.seek(0, os.SEEK_END)
+        tampon = b""
+        # Baştaki yarım satır atılacağı için gerekenden bir fazla satır sonu aranır
+        while konum > 0 and tampon.count(b"\n") <= gereken:
+            okunacak = min(blok, konum)
+            konum -= okunacak
+            f.seek(konum)
+            tampon = f.read(okunacak) + tampon
+    satirlar = tampon.split(b"\n")
+    if konum > 0:
+        satirlar = satirlar[1:]
+    satirlar = [s for s in satirlar if s.strip()]
+    satirlar.reverse()
+    return satirlar[atla:gereken]
+
+
+class DosyaDepo(KullaniciDeposu):
+    """Hash ile parçalanmış klasörlerde dosya tabanlı kullanıcı deposu
+
+    Her kullanıcı <kok>/<ab>/<cd>/<sha256>/ altında tutulur:
+    - profil.json: küçük başlık dosyası (atomik olarak yeniden yazılır); seans
+      sayısı seanslar.jsonl'in o anki boyutuyla birlikte tutulur, boyut
+      uyuşmazsa (yazım yarıda kaldıysa) sayı okunabilen satırlardan yeniden çıkarılır
+    - seanslar.jsonl: seans başına bir satır (sadece sona eklenir)
+    - basliklar.jsonl: seans başına başlık + seanslar.jsonl içindeki bayt konumu
+      (profil sayfası tam seansları okumadan dosyanın sonundan sayfalanır)
+
+    Yazan her işlem kullanıcı klasörünü flock ile kilitler; uygulama ve toplu
+    yeniden analiz gibi ayrı süreçler aynı kullanıcıya sırayla yazar.
+    """
+
+    def __init__(self, kok=DOSYA_DEPO_KOKU):
+        self.kok = kok
+        self._kilit = threading.Lock()
+        os.makedirs(kok, exist_ok=True)
+
+    def kullanici_klasoru(self, kullanici_adi):
+        ozet = hashlib.sha256(kullanici_adi.encode("utf-8")).hexdigest()
+        return os.path.join(self.kok, ozet[:2], ozet[2:4], ozet)
+
+    @contextlib.contextmanager
+    def _kilitli(self, kullanici_adi):
+        """Kullanıcı için thread kilidi + (varsa) klasör üzerinde süreçler arası flock"""
+        with self._kilit:
+            if fcntl is None:
+                yield
+                return
+            klasor = self.kullanici_klasoru(kullanici_adi)
+            os.makedirs(klasor, exist_ok=True)
+            fd = os.open(klasor, os.O_RDONLY)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _baslik_oku(self, kullanici_adi):
+        dosya_yolu = os.path.join(self.kullanici_klasoru(kullanici_adi), "profil.json")
+        if os.path.exists(dosya_yolu):
+            with open(dosya_yolu, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return self._eski_dosyayi_tasi(kullanici_adi)
+
+    def _baslik_yaz(self, kullanici_adi, baslik):
+        klasor = self.kullanici_klasoru(kullanici_adi)
+        os.makedirs(klasor, exist_ok=True)
+        atomik_yaz(os.path.join(klasor, "profil.json"), json.dumps(baslik, ensure_ascii=False))
+
+    def _eski_dosyayi_tasi(self, kullanici_adi):
+        # Eski düz yapıdaki <kok>/<kullanici>.json dosyasını yeni yapıya aktar
+        eski_yol = os.path.join(self.kok, f"{kullanici_adi}.json")
+        if not os.path.exists(eski_yol):
+            return None
+        with open(eski_yol, "r", encoding="utf-8") as f:
+            veri = json.load(f)
+        for seans in veri.get("seanslar", []):
+            self._seans_satiri_ekle(kullanici_adi, seans)
+        baslik = {"kullanici": {k: v for k, v in veri.items() if k != "seanslar"}}
+        self._sayaci_guncelle(kullanici_adi, baslik, len(veri.get("seanslar", [])))
+        self._baslik_yaz(kullanici_adi, baslik)
+        os.remove(eski_yol)
+        return baslik
+
+    def _seans_satiri_ekle(self, kullanici_adi, seans):
+        """Seansı sona ekle, satırın bayt konumunu döndür"""
+        klasor = self.kullanici_klasoru(kullanici_adi)
+        os.makedirs(klasor, exist_ok=True)
+        return self._satir_ekle(os.path.join(klasor, "seanslar.jsonl"), seans)
+
+    def _satir_ekle(self, dosya_yolu, kayit):
+        with open(dosya_yolu, "a+b") as f:
+            konum = yarim_satiri_kes(f)
+            f.write((json.dumps(kayit, ensure_ascii=False) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        return konum
+
+    @staticmethod
+    def _dosya_basligi(seans_no, konum, seans):
+        return {
+            **seans_basligi(seans["tarih"], seans["problem"], seans["analiz"], len(seans.get("konusmalar", []))),
+            "seans_no": seans_no,
+            "konum": konum
+        }
+
+    def _seans_dosyasi_boyutu(self, kullanici_adi):
+        try:
+            return os.path.getsize(os.path.join(self.kullanici_klasoru(kullanici_adi), "seanslar.jsonl"))
+        except OSError:
+            return 0
+
+    def _sayaci_guncelle(self, kullanici_adi, baslik, seans_sayisi):
+        baslik["seans_sayisi"] = seans_sayisi
+        baslik["seans_boyutu"] = self._seans_dosyasi_boyutu(kullanici_adi)
+
+    def _seans_sayisini_dogrula(self, kullanici_adi, baslik):
+        """Başlıktaki sayı dosyayla uyuşmuyorsa okunabilen satırlardan yeniden say (kilit tutulurken)
+
+        Son yazım yarıda kaldıysa (çökme) dosya boyutu başlıktakiyle uyuşmaz:
+        yarım satır kesilir, basliklar.jsonl ve sayı seanslardan yeniden üretilir.
+        """
+        if baslik.get("seans_boyutu") == self._seans_dosyasi_boyutu(kullanici_adi):
+            return baslik["seans_sayisi"]
+        seans_yolu = os.path.join(self.kullanici_klasoru(kullanici_adi), "seanslar.jsonl")
+        if os.path.exists(seans_yolu):
+            with open(seans_yolu, "r+b") as f:
+                yarim_satiri_kes(f)
+        self._sayaci_guncelle(kullanici_adi, baslik, self._basliklari_yeniden_olustur(kullanici_adi))
+        self._baslik_yaz(kullanici_adi, baslik)
+        return baslik["seans_sayisi"]
+
+    def _basliklari_yeniden_olustur(self, kullanici_adi):
+        """basliklar.jsonl'i seanslar.jsonl'den baştan üret, okunabilen seans sayısını döndür"""
+        klasor = self.kullanici_klasoru(kullanici_adi)
+        os.makedirs(klasor, exist_ok=True)
+        seans_yolu = os.path.join(klasor, "seanslar.jsonl")
+        satirlar = []
+        if os.path.exists(seans_yolu):
+            with open(seans_yolu, "rb") as f:
+                konum = 0
+                for satir in f:
+                    try:
+                        seans = json.loads(satir)
+                    except json.JSONDecodeError:
+                        konum += len(satir)
+                        continue
+                    baslik = self._dosya_basligi(len(satirlar), konum, seans)
+                    satirlar.append(json.dumps(baslik, ensure_ascii=False) + "\n")
+                    konum += len(satir)
+        atomik_yaz(os.path.join(klasor, "basliklar.jsonl"), "".join(satirlar))
+        return len(satirlar)
+
+    def kullanici_getir(self, kullanici_adi):
+        baslik = self._baslik_oku(kullanici_adi)
+        return baslik["kullanici"] if baslik else None
+
+    def kullanici_olustur(self, kullanici_adi, veri):
+        with self._kilitli(kullanici_adi):
+            if self._baslik_oku(kullanici_adi) is not None:
+                return False
+            klasor = self.kullanici_klasoru(kullanici_adi)
+            os.makedirs(klasor, exist_ok=True)
+            baslik = {"kullanici": {k: v for k, v in veri.items() if k != "seanslar"}}
+            self._sayaci_guncelle(kullanici_adi, baslik, 0)
+            fd, gecici_yol = tempfile.mkstemp(dir=klasor, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(baslik, f, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # os.link hedef varsa başarısız olur: başka süreç aynı adı aynı anda alamaz
+                os.link(gecici_yol, os.path.join(klasor, "profil.json"))
+            except FileExistsError:
+                return False
+            finally:
+                os.remove(gecici_yol)
+        return True
+
+    def kullanici_kaydet(self, kullanici_adi, veri):
+        with self._kilitli(kullanici_adi):
+            baslik = self._baslik_oku(kullanici_adi) or {"kullanici": {}, "seans_sayisi": 0, "seans_boyutu": 0}
+            kullanici = {k: v for k, v in veri.items() if k != "seanslar"}
+            if "sifre_hash" in baslik["kullanici"]:
+                kullanici["sifre_hash"] = baslik["kullanici"]["sifre_hash"]
+            baslik["kullanici"] = kullanici
+            self._baslik_yaz(kullanici_adi, baslik)
+        return True
+
+    def seans_sayisi(self, kullanici_adi):
+        """Okunabilen seans sayısı (dosya boyutu tutuyorsa başlık dosyasından)"""
+        with self._kilitli(kullanici_adi):
+            baslik = self._baslik_oku(kullanici_adi)
+            return self._seans_sayisini_dogrula(kullanici_adi, baslik) if baslik else 0
+
+    def seans_ekle(self, kullanici_adi, seans):
+        with self._kilitli(kullanici_adi):
+            baslik = self._baslik_oku(kullanici_adi) or {"kullanici": {}, "seans_sayisi": 0, "seans_boyutu": 0}
+            seans_no = self._seans_sayisini_dogrula(kullanici_adi, baslik)
+            konum = self._seans_satiri_ekle(kullanici_adi, seans)
+            basliklar_yolu = os.path.join(self.kullanici_klasoru(kullanici_adi), "basliklar.jsonl")
+            if seans_no and not os.path.exists(basliklar_yolu):
+                self._basliklari_yeniden_olustur(kullanici_adi)
+            else:
+                self._satir_ekle(basliklar_yolu, self._dosya_basligi(seans_no, konum, seans))
+            self._sayaci_guncelle(kullanici_adi, baslik, seans_no + 1)
+            self._baslik_yaz(kullanici_adi, baslik)
+        return seans_no
+
+    def seanslari_yeniden_yaz(self, kullanici_adi, seanslar):
+        """Seans dosyasını atomik olarak baştan yaz"""
+        with self._kilitli(kullanici_adi):
+            self._seanslari_yaz(kullanici_adi, seanslar)
+
+    def seanslari_guncelle(self, kullanici_adi, guncelle):
+        """Seansları oku, guncelle(seanslar) ile yerinde değiştir ve yeniden yaz (toplu yeniden analiz için)
+
+        Okuma ve yazma aynı kilit altında yapılır; arada başka süreçten eklenen
+        seans kaybolmaz. guncelle'nin dönüş değeri döndürülür.
+        """
+        with self._kilitli(kullanici_adi):
+            seanslar = self.seanslari_getir(kullanici_adi)
+            sonuc = guncelle(seanslar)
+            self._seanslari_yaz(kullanici_adi, seanslar)
+        return sonuc
+
+    def _seanslari_yaz(self, kullanici_adi, seanslar):
+        klasor = self.kullanici_klasoru(kullanici_adi)
+        os.makedirs(klasor, exist_ok=True)
+        icerik = "".join(json.dumps(seans, ensure_ascii=False) + "\n" for seans in seanslar)
+        atomik_yaz(os.path.join(klasor, "seanslar.jsonl"), icerik)
+        # Bayt konumları değişti
+        seans_sayisi = self._basliklari_yeniden_olustur(kullanici_adi)
+        baslik = self._baslik_oku(kullanici_adi) or {"kullanici": {}}
+        self._sayaci_guncelle(kullanici_adi, baslik, seans_sayisi)
+        self._baslik_yaz(kullanici_adi, baslik)
+
+    def kullanicilari_listele(self):
+        """Depodaki tüm kullanıcı adlarını sırayla üret"""
+        for kok_klasor, _, dosyalar in os.walk(self.kok):
+            if "profil.json" in dosyalar:
+                with open(os.path.join(kok_klasor, "profil.json"), "r", encoding="utf-8") as f:
+                    kullanici = json.load(f).get("kullanici", {})
+                if kullanici.get("kullanici_adi"):
+                    yield kullanici["kullanici_adi"]
+
+    def seanslari_getir(self, kullanici_adi, limit=None):
+        dosya_yolu = os.path.join(self.kullanici_klasoru(kullanici_adi), "seanslar.jsonl")
+        if not os.path.exists(dosya_yolu):
+            return []
+        seanslar = []
+        with open(dosya_yolu, "r", encoding="utf-8") as f:
+            for satir in f:
+                try:
+                    seanslar.append(json.loads(satir))
+                except json.JSONDecodeError:
+                    # Yarıda kalmış son satır (çökme sırasında yazılmış) atlanır
+                    continue
+        if limit is not None:
+            seanslar = seanslar[-limit:]
+        return seanslar
+
+    def seans_basliklari_getir(self, kullanici_adi, baslangic=0, adet=10):
+        klasor = self.kullanici_klasoru(kullanici_adi)
+        dosya_yolu = os.path.join(klasor, "basliklar.jsonl")
+        if not os.path.exists(dosya_yolu):
+            if not os.path.exists(os.path.join(klasor, "seanslar.jsonl")):
+                return []
+            with self._kilitli(kullanici_adi):
+                self._basliklari_yeniden_olustur(kullanici_adi)
+        basliklar = []
+        for satir in sondan_satirlar(dosya_yolu, baslangic, adet):
+            try:
+                basliklar.append(json.loads(satir))
+            except json.JSONDecodeError:
+                continue
+        return basliklar
+
+    def seans_getir(self, kullanici_adi, baslik):
+        dosya_yolu = os.path.join(self.kullanici_klasoru(kullanici_adi), "seanslar.jsonl")
+        try:
+            with open(dosya_yolu, "rb") as f:
+                f.seek(baslik["konum"])
+                return json.loads(f.readline())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+
+# Kullanılabilir depolama türleri
+DEPO_TURLERI = {
+    "sqlite": SQLiteDepo,
+    "dosya": DosyaDepo,
+}
+
+
+def depo_olustur(tur=None, **ayarlar):
+    """Yapılandırılmış depolama türünden depo oluştur"""
+    tur = tur or DEPOLAMA_TURU
+    if tur not in DEPO_TURLERI:
+        raise ValueError(f"Bilinmeyen depolama türü: {tur}")
+    return DEPO_TURLERI[tur](**ayarlar)
@@ -1,14 +1,27 @@
 import streamlit as st
-import json
-import os
 from datetime import datetime
 import time
 import hashlib
+import functools
+import importlib.util
+import random
+import uuid
 
-# OpenAI import
-try:
-    from openai import OpenAI
-except ImportError:
+from analiz_sonucu import ANALIZ_SISTEM_PROMPTU, ANALIZ_YANIT_BICIMI, analiz_coz, analiz_sonucu, yanit_icerigi
+from artimli_analiz import ArtimliSeansAnalizi
+from config import ANALIZ_TOKEN_BUTCESI, SEANS_SAYAC_ARALIGI
+from depolama import depo_olustur, seans_basligi
+import olcum
+from olcum import cagri_olc
+from ozetleyici import KayanOzet
+from seans_durumu import durum_deposu_olustur
+from stres_trendi import ACILIYET_SECENEKLERI, ruh_hali_grafigi, stres_grafigi, grafik_tablosu, trend_onbellegi
+from utils_anxiety import stres_analizini_baslat, tur_kaydina_stres_ekle
+from zamanlayici import aciliyet_onceligi, oncelik
+
+# OpenAI paketi ilk istemci oluşturulurken yüklenir; burada sadece kurulu mu bakılır
+from openai_istemci import api_anahtari_bul, openai_istemci_al
+if importlib.util.find_spec("openai") is None:
     st.error("OpenAI paketi yüklenemedi. Requirements.txt kontrol edin.")
     st.stop()
 
@@ -16,63 +29,81 @@ except ImportError:
 openai_client = None
 
 def openai_baslat():
-    """OpenAI client'ı başlat"""
+    """Paylaşılan OpenAI client'ı al"""
     global openai_client
     
-    # API key alma - Streamlit Cloud uyumlu
-    api_key = None
-    
-    # 1. Streamlit secrets'tan dene
     try:
-        api_key = st.secrets["OPENAI_API_KEY"]
-    except:
-        pass
+        openai_client = openai_istemci_al()
+    except Exception as e:
+        st.error(f"OpenAI client hatası: {e}")
+        return False
     
-    # 2. Environment variable'dan dene
-    if not api_key:
-        api_key = os.getenv("OPENAI_API_KEY")
+    if openai_client:
+        return True
     
-    if api_key:
-        try:
-            openai_client = OpenAI(api_key=api_key)
-            return True
-        except Exception as e:
-            st.error(f"OpenAI client hatası: {e}")
-            return False
-    else:
-        st.error("❌ OpenAI API anahtarı bulunamadı! Lütfen Streamlit Cloud Secrets'da OPENAI_API_KEY ayarlayın.")
+    st.error("❌ OpenAI API anahtarı bulunamadı! Lütfen Streamlit Cloud Secrets'da OPENAI_API_KEY ayarlayın.")
     return False
 
-def ai_psikolog_cevap_uret(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi):
-    """AI psikolog cevap üretici"""
-    try:
-        if not openai_client:
-            return "Size destek olmak için buradayım. Bu durumu birlikte ele alabiliriz."
-        
-        # Prompt hazırla
-        if konusma_sirasi == 0:
-            sistem_prompt = "Sen deneyimli bir klinik psikolog olarak hastayı karşılıyorsun. Empati kur ve güven ver."
-        elif konusma_sirasi <= 2:
-            sistem_prompt = "Daha detaylı değerlendirme yap. Semptomları ve tetikleyici faktörleri araştır."
-        else:
-            sistem_prompt = "Kapsamlı değerlendirme yap ve tedavi önerileri sun."
-        
-        prompt = f"""{sistem_prompt}
+# Sabit talimatlar sistem mesajının başında tutulur; değişken hasta verisi en sonda
+# gelir ki aşama başına aynı önek sağlayıcı tarafında önbelleğe alınabilsin
+CEVAP_SISTEM_ONEKI = """Sen Dr. Marcus Reed protokolüyle çalışan deneyimli bir klinik psikologsun.
+Hastanın sorununu, terapi geçmişini, aciliyetini ve önceki konuşmaları dikkate al.
+Profesyonel, empatik ve terapötik cevap ver (60-80 kelime)."""
 
-Hasta sorunu: {problem_bilgisi['metin'][:200]}
+ASAMA_TALIMATLARI = [
+    "Hastayı karşılıyorsun. Empati kur ve güven ver.",
+    "Daha detaylı değerlendirme yap. Semptomları ve tetikleyici faktörleri araştır.",
+    "Kapsamlı değerlendirme yap ve tedavi önerileri sun."
+]
+
+def asama_no(konusma_sirasi):
+    """Konuşma sırasından seans aşaması (0: ilk, 1: orta, 2: son)"""
+    if konusma_sirasi == 0:
+        return 0
+    elif konusma_sirasi <= 2:
+        return 1
+    return 2
+
+@functools.lru_cache(maxsize=None)
+def cevap_sistem_promptu(asama):
+    """Aşama başına bir kez oluşturulan sabit sistem mesajı"""
+    return f"{CEVAP_SISTEM_ONEKI}\n\nAŞAMA: {ASAMA_TALIMATLARI[asama]}"
+
+def cevap_mesajlari_hazirla(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet=None):
+    """Psikolog cevabı için mesajları hazırla (sabit sistem öneki + değişken içerik)"""
+    # Eski turların özeti + son turlar, sabit token bütçesiyle
+    baglam = (ozet or KayanOzet()).baglam(konusma_gecmisi, danisan_etiketi="Hasta")
+    
+    icerik = f"""Hasta sorunu: {problem_bilgisi['metin'][:200]}
 Terapi geçmişi: {problem_bilgisi['terapi_gecmisi']}
 Aciliyet: {problem_bilgisi['aciliyet']}
 
+Önceki konuşmalar:
+{baglam}
+
 Hasta: "{kullanici_metni}"
+"""
+    
+    return [
+        {"role": "system", "content": cevap_sistem_promptu(asama_no(konusma_sirasi))},
+        {"role": "user", "content": icerik.strip()}
+    ]
 
-Profesyonel, empatik ve terapötik cevap ver (60-80 kelime):"""
+def ai_psikolog_cevap_uret(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet=None):
+    """AI psikolog cevap üretici"""
+    try:
+        if not openai_client:
+            return "Size destek olmak için buradayım. Bu durumu birlikte ele alabiliriz."
         
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=200,
-            temperature=0.7
-        )
+        with cagri_olc("cevap", "gpt-4o-mini", konusma_sirasi) as cagri:
+            with oncelik(aciliyet_onceligi(problem_bilgisi['aciliyet'])):
+                response = openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=cevap_mesajlari_hazirla(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet),
+                    max_tokens=200,
+                    temperature=0.7
+                )
+            cagri.kullanim(response.usage)
         
         return response.choices[0].message.content.strip()
         
@@ -80,117 +111,122 @@ Profesyonel, empatik ve terapötik cevap ver (60-80 kelime):"""
         st.error(f"AI cevap hatası: {e}")
         return "Anlıyorum. Bu durumu daha detaylı ele alalım. Neler hissediyorsunuz?"
 
-def seans_analizi_yap(problem_bilgisi, konusma_gecmisi):
-    """Seans analizi"""
+def ai_psikolog_cevap_akisi(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet=None):
+    """AI psikolog cevabını token token üret (generator)"""
+    uretildi = False
+    try:
+        if not openai_client:
+            yield "Size destek olmak için buradayım. Bu durumu birlikte ele alabiliriz."
+            return
+        
+        with cagri_olc("cevap", "gpt-4o-mini", konusma_sirasi) as cagri:
+            with oncelik(aciliyet_onceligi(problem_bilgisi['aciliyet'])):
+                stream = openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=cevap_mesajlari_hazirla(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet),
+                    max_tokens=200,
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+            
+            for chunk in stream:
+                # Kullanım bilgisi son, boş choices'lu parçada gelir
+                if chunk.usage:
+                    cagri.kullanim(chunk.usage)
+                if not chunk.choices:
+                    continue
+                parca = chunk.choices[0].delta.content
+                if parca:
+                    cagri.ilk_parca()
+                    uretildi = True
+                    yield parca
+        
+    except Exception as e:
+        st.error(f"AI cevap hatası: {e}")
+        # Yarım kalan cevabın üzerine yedek metin eklenmez
+        if not uretildi:
+            yield "Anlıyorum. Bu durumu daha detaylı ele alalım. Neler hissediyorsunuz?"
+
+def seans_analizi_yap(problem_bilgisi, konusma_gecmisi, artimli_analiz=None, ozet=None):
+    """Seans analizi (artımlı analiz varsa sadece son turlar işlenir)"""
     try:
         if not openai_client:
             return basit_analiz_sonucu()
         
-        # Konuşmaları birleştir
-        konusmalar = ""
-        for k in konusma_gecmisi:
-            konusmalar += f"Hasta: {k['kullanici']}\nPsikolog: {k['ai']}\n\n"
+        if artimli_analiz is not None:
+            analiz = artimli_analiz.sonuclandir(konusma_gecmisi)
+            if analiz:
+                return analiz
         
-        analiz_prompt = f"""Bu klinik seansı analiz et:
-
-Problem: {problem_bilgisi['metin']}
+        # Konuşmalar: eski turların özeti + son turlar, sabit token bütçesiyle
+        konusmalar = (ozet or KayanOzet(son_tur_sayisi=5)).baglam(
+            konusma_gecmisi, token_butcesi=ANALIZ_TOKEN_BUTCESI, danisan_etiketi="Hasta"
+        )
+        
+        analiz_prompt = f"""Problem: {problem_bilgisi['metin']}
 Aciliyet: {problem_bilgisi['aciliyet']}
 
 Konuşmalar:
-{konusmalar}
-
-Şu formatta analiz yap:
-TANI: [Klinik tanı]
-STRES: [0-10 arası]
-DURUM: [stable/anxious/depressed]
-TEDAVI: [Önerilen yaklaşım]
-ONERILER: [3-4 madde]"""
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": analiz_prompt}],
-            max_tokens=400,
-            temperature=0.3
-        )
-        
-        return parse_analiz(response.choices[0].message.content)
+{konusmalar}"""
+        
+        with cagri_olc("seans_analizi", "gpt-4o-mini", len(konusma_gecmisi)) as cagri:
+            with oncelik(aciliyet_onceligi(problem_bilgisi['aciliyet'])):
+                response = openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": ANALIZ_SISTEM_PROMPTU},
+                        {"role": "user", "content": analiz_prompt}
+                    ],
+                    max_tokens=400,
+                    temperature=0.3,
+                    response_format=ANALIZ_YANIT_BICIMI
+                )
+            cagri.kullanim(response.usage)
+        
+        return analiz_coz(yanit_icerigi(response))
         
     except Exception as e:
         st.error(f"Analiz hatası: {e}")
         return basit_analiz_sonucu()
 
-def parse_analiz(analiz_metni):
-    """Analiz metnini parse et"""
-    sonuc = {
-        "klinik_tani": "",
-        "stres_seviyesi": 5,
-        "ruh_hali": "stable",
-        "tedavi_plani": "",
-        "oneriler": [],
-        "degerlendirme": analiz_metni
-    }
-    
-    lines = analiz_metni.split('\n')
-    for line in lines:
-        line = line.strip()
-        if line.startswith('TANI:'):
-            sonuc["klinik_tani"] = line.replace('TANI:', '').strip()
-        elif line.startswith('STRES:'):
-            try:
-                sonuc["stres_seviyesi"] = int(line.replace('STRES:', '').strip())
-            except:
-                pass
-        elif line.startswith('DURUM:'):
-            sonuc["ruh_hali"] = line.replace('DURUM:', '').strip()
-        elif line.startswith('TEDAVI:'):
-            sonuc["tedavi_plani"] = line.replace('TEDAVI:', '').strip()
-        elif line.startswith('-'):
-            sonuc["oneriler"].append(line[1:].strip())
-    
-    # Varsayılan değerler
-    if not sonuc["klinik_tani"]:
-        sonuc["klinik_tani"] = "Adjustment Disorder (309.9)"
-    if not sonuc["oneriler"]:
-        sonuc["oneriler"] = [
-            "Günlük stres yönetimi teknikleri",
-            "Düzenli egzersiz ve uyku",
-            "Profesyonel destek almayı değerlendirin"
-        ]
-    
-    return sonuc
-
 def basit_analiz_sonucu():
     """Basit analiz sonucu"""
-    return {
-        "klinik_tani": "Genel Adaptasyon Zorluğu",
-        "stres_seviyesi": 5,
-        "ruh_hali": "stable",
-        "tedavi_plani": "Supportif terapi ve stres yönetimi",
-        "oneriler": [
+    return analiz_sonucu(
+        klinik_tani="Genel Adaptasyon Zorluğu",
+        tedavi_plani="Supportif terapi ve stres yönetimi",
+        oneriler=[
             "Günlük nefes egzersizleri",
             "Düzenli uyku düzeni",
             "Sosyal destek sistemini güçlendirin"
         ],
-        "degerlendirme": "Klinik değerlendirme tamamlandı. Genel adaptasyon zorluğu gözlendi."
-    }
+        degerlendirme="Klinik değerlendirme tamamlandı. Genel adaptasyon zorluğu gözlendi."
+    )
+
+# Profil sayfasında sayfa başına rapor
+RAPOR_SAYFA_BOYUTU = 5
 
 # Kullanıcı yönetimi
 def sifre_hash(sifre):
     """Şifreyi hashle"""
     return hashlib.sha256(sifre.encode()).hexdigest()
 
+@st.cache_resource
+def depo_al():
+    """Süreç genelinde paylaşılan kullanıcı deposu"""
+    return depo_olustur()
+
 def kullanici_veri_yukle(kullanici_adi):
     """Kullanıcı verisi yükle"""
-    if "kullanici_verileri" not in st.session_state:
-        st.session_state.kullanici_verileri = {}
-    return st.session_state.kullanici_verileri.get(kullanici_adi, None)
+    kullanici_data = depo_al().kullanici_getir(kullanici_adi)
+    if kullanici_data:
+        # Sayı profilde biriktirilmez, her zaman depodaki seanslardan alınır
+        kullanici_data["profil"]["toplam_seans"] = depo_al().seans_sayisi(kullanici_adi)
+    return kullanici_data
 
 def kullanici_veri_kaydet(kullanici_adi, veri):
     """Kullanıcı verisi kaydet"""
-    if "kullanici_verileri" not in st.session_state:
-        st.session_state.kullanici_verileri = {}
-    st.session_state.kullanici_verileri[kullanici_adi] = veri
-    return True
+    return depo_al().kullanici_kaydet(kullanici_adi, veri)
 
 def kullanici_kayit():
     """Kullanıcı kaydı"""
@@ -214,19 +250,17 @@ def kullanici_kayit():
                 st.error("Şifreler eşleşmiyor!")
                 return
             
-            if kullanici_veri_yukle(kullanici_adi):
-                st.error("Bu kullanıcı adı zaten alınmış!")
-                return
-            
             kullanici_data = {
                 "kullanici_adi": kullanici_adi,
                 "sifre_hash": sifre_hash(sifre),
                 "kayit_tarihi": datetime.now().isoformat(),
-                "seanslar": [],
                 "profil": {"toplam_seans": 0, "son_giris": None}
             }
             
-            kullanici_veri_kaydet(kullanici_adi, kullanici_data)
+            # Ad kontrolü ve yazım tek adımda: eşzamanlı kayıt mevcut hesabın üzerine yazamaz
+            if not depo_al().kullanici_olustur(kullanici_adi, kullanici_data):
+                st.error("Bu kullanıcı adı zaten alınmış!")
+                return
             st.success("✅ Hesap başarıyla oluşturuldu!")
             st.rerun()
 
@@ -258,6 +292,9 @@ def kullanici_giris():
             kullanici_data["profil"]["son_giris"] = datetime.now().isoformat()
             kullanici_veri_kaydet(kullanici_adi, kullanici_data)
             
+            # Başka bir replikada/süreçte yarım kalan seans varsa oradan devam edilir
+            seans_durumunu_yukle()
+            
             st.success("✅ Giriş başarılı!")
             st.rerun()
 
@@ -287,7 +324,7 @@ def problem_tanımlama():
         
         aciliyet = st.selectbox(
             "⚡ Bu durumun günlük yaşamınızı etkileme derecesi:",
-            ["Hafif rahatsızlık", "Orta düzey etki", "Ciddi şekilde etkiliyor", "Dayanılmaz, acil yardım lazım"]
+            ACILIYET_SECENEKLERI
         )
         
         problem_kaydet = st.form_submit_button("🚀 Klinik Değerlendirmeye Başla", type="primary")
@@ -305,25 +342,44 @@ def problem_tanımlama():
             }
             
             st.session_state.seans_asamasi = "seans_baslangic"
+            seans_durumunu_kaydet()
             st.success("🎯 Başlangıç değerlendirmesi tamamlandı!")
             time.sleep(1)
             st.rerun()
 
 def seans_yonetim():
-    """Seans yönetimi"""
+    """Seans yönetimi
+
+    Sayaç, konuşma formu ve geçmiş ayrı parçalar (st.fragment) olarak çizilir:
+    sayaç tüm sayfayı yeniden çalıştırmadan saniyede bir güncellenir, mesaj
+    gönderimi yalnızca konuşma panelini yeniden çalıştırır. Tüm sayfa sadece
+    aşama geçişinde ve seans bittiğinde yeniden çalışır.
+    """
     # Session state başlangıç
     if "seans_baslangic_zamani" not in st.session_state:
         st.session_state.seans_baslangic_zamani = datetime.now()
+        st.session_state.seans_id = uuid.uuid4().hex
         st.session_state.seans_konusmalari = []
         st.session_state.kullanici_konusma_sirasi = True
         st.session_state.konusma_sayisi = 0
+        st.session_state.artimli_analiz = ArtimliSeansAnalizi(st.session_state.mevcut_problem)
+        st.session_state.kayan_ozet = KayanOzet()
+        seans_durumunu_kaydet()
     
+    seans_sayaci()
+    konusma_paneli()
+    konusma_gecmisi_paneli()
+
+@st.fragment(run_every=SEANS_SAYAC_ARALIGI)
+def seans_sayaci():
+    """Geri sayım ve ilerleme (kendi kendine yenilenir)"""
     # Süre hesaplama
     gecen_sure = (datetime.now() - st.session_state.seans_baslangic_zamani).total_seconds()
     kalan_sure = max(0, 300 - gecen_sure)
     
     if kalan_sure <= 0 or st.session_state.konusma_sayisi >= 5:
         st.session_state.seans_asamasi = "seans_analiz"
+        seans_durumunu_kaydet()
         st.rerun()
     
     dakika = int(kalan_sure // 60)
@@ -341,45 +397,66 @@ def seans_yonetim():
     
     progress = min((st.session_state.konusma_sayisi + 1) / 5, 1.0)
     st.progress(progress, f"Değerlendirme Aşaması: {st.session_state.konusma_sayisi + 1}/5")
-    
+
+@st.fragment
+def konusma_paneli():
+    """Mevcut aşamanın formu ve Dr. Marcus Reed'in cevabı"""
     if st.session_state.kullanici_konusma_sirasi:
-        st.markdown("### ✍️ Yanıtınızı Yazın")
-        with st.form(f"konusma_formu_{st.session_state.konusma_sayisi}"):
-            kullanici_mesaji = st.text_area(
-                "💭 Düşüncelerinizi paylaşın:",
-                placeholder="Bu konuda ne düşünüyorsunuz?",
-                height=120
-            )
-            konusma_gonder = st.form_submit_button("📤 Gönder")
-            
-            if konusma_gonder and kullanici_mesaji.strip():
-                if len(kullanici_mesaji.strip()) < 10:
-                    st.error("Lütfen daha detaylı bir yanıt verin")
-                    return
+        form_alani = st.empty()
+        with form_alani.container():
+            st.markdown("### ✍️ Yanıtınızı Yazın")
+            with st.form(f"konusma_formu_{st.session_state.konusma_sayisi}"):
+                kullanici_mesaji = st.text_area(
+                    "💭 Düşüncelerinizi paylaşın:",
+                    placeholder="Bu konuda ne düşünüyorsunuz?",
+                    height=120
+                )
+                konusma_gonder = st.form_submit_button("📤 Gönder")
                 
-                st.session_state.mevcut_kullanici_konusma = kullanici_mesaji
-                st.session_state.kullanici_konusma_sirasi = False
-                st.rerun()
-    else:
-        st.markdown("### 🤖 Dr. Marcus Reed Değerlendirme Yapıyor")
-        
-        if "ai_cevap_uretti" not in st.session_state:
-            with st.spinner("🧠 Klinik analiz hazırlanıyor..."):
-                ai_cevap_uret()
-            st.session_state.ai_cevap_uretti = True
-        
-        if st.button("➡️ Bir Sonraki Aşama", use_container_width=True, type="primary"):
-            st.session_state.kullanici_konusma_sirasi = True
-            st.session_state.konusma_sayisi += 1
-            if "ai_cevap_uretti" in st.session_state:
-                del st.session_state.ai_cevap_uretti
-            st.rerun()
-    
-    # Konuşma geçmişi
-    if st.session_state.seans_konusmalari:
+                if konusma_gonder and kullanici_mesaji.strip():
+                    if len(kullanici_mesaji.strip()) < 10:
+                        st.error("Lütfen daha detaylı bir yanıt verin")
+                        return
+                    
+                    st.session_state.mevcut_kullanici_konusma = kullanici_mesaji
+                    st.session_state.kullanici_konusma_sirasi = False
+                    seans_durumunu_kaydet()
+        
+        if st.session_state.kullanici_konusma_sirasi:
+            return
+        # Yeniden çalıştırma yok: form silinir, cevap aynı çalıştırmada bu panelde akar
+        form_alani.empty()
+    
+    st.markdown("### 🤖 Dr. Marcus Reed Değerlendirme Yapıyor")
+    
+    if "ai_cevap_uretti" not in st.session_state:
+        # Parça (fragment) olarak yeniden çalışınca main()'deki seans bağlamı yoktur
+        with olcum.seans_baglami(st.session_state.seans_id, st.session_state.konusma_sayisi):
+            ai_cevap_uret()
+        st.session_state.ai_cevap_uretti = True
+        seans_durumunu_kaydet()
+    elif len(st.session_state.seans_konusmalari) > st.session_state.konusma_sayisi:
+        # Panel yeniden çizildiğinde bu aşamanın cevabı kaybolmasın
+        st.success("🧠 **DR. MARCUS REED'DEN PROFESYONEL GÖRÜŞ:**")
+        st.markdown(f"*{st.session_state.seans_konusmalari[-1]['ai']}*")
+    
+    if st.button("➡️ Bir Sonraki Aşama", use_container_width=True, type="primary"):
+        st.session_state.kullanici_konusma_sirasi = True
+        st.session_state.konusma_sayisi += 1
+        if "ai_cevap_uretti" in st.session_state:
+            del st.session_state.ai_cevap_uretti
+        seans_durumunu_kaydet()
+        # Aşama değişimi geçmişi ve ilerlemeyi de etkiler
+        st.rerun()
+
+@st.fragment
+def konusma_gecmisi_paneli():
+    """Tamamlanan aşamalar (sadece aşama geçişlerinde değişir)"""
+    tamamlanan = st.session_state.seans_konusmalari[:st.session_state.konusma_sayisi]
+    if tamamlanan:
         st.markdown("### 📋 Değerlendirme Süreci")
-        for i, konusma in enumerate(reversed(st.session_state.seans_konusmalari[-2:])):
-            with st.expander(f"🔍 Aşama {len(st.session_state.seans_konusmalari)-i}", expanded=(i == 0)):
+        for i, konusma in enumerate(reversed(tamamlanan[-2:])):
+            with st.expander(f"🔍 Aşama {len(tamamlanan)-i}", expanded=(i == 0)):
                 st.markdown(f"**👤 Siz:** {konusma['kullanici']}")
                 st.markdown(f"**🧠 Dr. Marcus Reed:** {konusma['ai']}")
 
@@ -393,21 +470,41 @@ def ai_cevap_uret():
     problem_bilgisi = st.session_state.mevcut_problem
     konusma_gecmisi = st.session_state.seans_konusmalari
     
-    ai_cevabi = ai_psikolog_cevap_uret(
+    # Stres analizi cevapla eşzamanlı çalışır, tur süresi ikisinin toplamı olmaz
+    stres_gorevi = stres_analizini_baslat(kullanici_metni, aciliyet=problem_bilgisi['aciliyet'])
+    
+    st.success("🧠 **DR. MARCUS REED'DEN PROFESYONEL GÖRÜŞ:**")
+    cevap_alani = st.empty()
+    cevap_alani.markdown("🧠 *Klinik analiz hazırlanıyor...*")
+    
+    # Cevap geldikçe parça parça göster
+    ai_cevabi = ""
+    for parca in ai_psikolog_cevap_akisi(
         kullanici_metni,
         problem_bilgisi,
         konusma_gecmisi,
-        st.session_state.konusma_sayisi
-    )
+        st.session_state.konusma_sayisi,
+        st.session_state.get("kayan_ozet")
+    ):
+        ai_cevabi += parca
+        cevap_alani.markdown(f"*{ai_cevabi}* ▌")
     
-    st.success("🧠 **DR. MARCUS REED'DEN PROFESYONEL GÖRÜŞ:**")
-    st.markdown(f"*{ai_cevabi}*")
+    ai_cevabi = ai_cevabi.strip()
+    cevap_alani.markdown(f"*{ai_cevabi}*")
     
-    st.session_state.seans_konusmalari.append({
+    tur_kaydi = {
         "kullanici": kullanici_metni,
         "ai": ai_cevabi,
         "zaman": datetime.now().isoformat()
-    })
+    }
+    st.session_state.seans_konusmalari.append(tur_kaydi)
+    tur_kaydina_stres_ekle(stres_gorevi, tur_kaydi)
+    
+    # Ara değerlendirme arka planda güncellenir, rapor sayfası beklemez
+    if "artimli_analiz" in st.session_state:
+        st.session_state.artimli_analiz.guncelle(st.session_state.seans_konusmalari)
+    if "kayan_ozet" in st.session_state:
+        st.session_state.kayan_ozet.arka_planda_guncelle(st.session_state.seans_konusmalari)
     
     del st.session_state.mevcut_kullanici_konusma
 
@@ -418,12 +515,14 @@ def seans_analiz_goster():
     
     if "seans_analizi" not in st.session_state:
         with st.spinner("🧠 Kapsamlı klinik analiz yapılıyor..."):
-            time.sleep(3)
             analiz = seans_analizi_yap(
                 st.session_state.mevcut_problem,
-                st.session_state.seans_konusmalari
+                st.session_state.seans_konusmalari,
+                st.session_state.get("artimli_analiz"),
+                st.session_state.get("kayan_ozet")
             )
             st.session_state.seans_analizi = analiz
+            seans_durumunu_kaydet()
     
     analiz = st.session_state.seans_analizi
     
@@ -449,7 +548,12 @@ def seans_analiz_goster():
         stres_renk = "🟢" if analiz["stres_seviyesi"] <= 3 else "🟡" if analiz["stres_seviyesi"] <= 6 else "🔴"
         st.metric("Stres Seviyesi", f"{stres_renk} {analiz['stres_seviyesi']}/10")
         
-        ruh_hali_emoji = {"anxious": "😰", "depressed": "😔", "stable": "😐"}
+        ruh_hali_emoji = {
+            "sakin": "😌", "endişeli": "😟", "anksiyeteli": "😰",
+            "stresli": "😣", "depresif": "😔", "panik": "😱",
+            # Eski kayıtlar
+            "anxious": "😰", "depressed": "😔", "stable": "😐"
+        }
         emoji = ruh_hali_emoji.get(analiz["ruh_hali"], "🧠")
         st.metric("Mental Durum", f"{emoji} {analiz['ruh_hali'].title()}")
         
@@ -481,23 +585,83 @@ def seans_kaydet():
         "problem": st.session_state.mevcut_problem,
         "konusmalar": st.session_state.seans_konusmalari,
         "analiz": st.session_state.seans_analizi,
-        "sure": 300
+        "sure": 300,
+        # Seans boyunca yapılan API çağrılarının süre/token toplamları
+        "olcum": olcum.seans_ozeti(st.session_state.get("seans_id"))
     }
     
-    kullanici_data["seanslar"].append(yeni_seans)
-    kullanici_data["profil"]["toplam_seans"] += 1
-    
-    kullanici_veri_kaydet(st.session_state.kullanici_adi, kullanici_data)
+    # Sadece yeni seans satırı eklenir, geçmiş yeniden yazılmaz
+    depo_al().seans_ekle(st.session_state.kullanici_adi, yeni_seans)
+    trend_onbellegi.seans_eklendi(st.session_state.kullanici_adi, seans_basligi(
+        yeni_seans["tarih"], yeni_seans["problem"], yeni_seans["analiz"], len(yeni_seans["konusmalar"])
+    ))
+    # Oturumdaki (başka sekmede eskimiş olabilecek) kopyaya bir eklemek yerine depodan say
+    kullanici_data["profil"]["toplam_seans"] = depo_al().seans_sayisi(st.session_state.kullanici_adi)
     st.session_state.kullanici_data = kullanici_data
 
+# Kontrol noktasına yazılan seans anahtarları (JSON'a doğrudan yazılabilenler)
+SEANS_DURUM_ANAHTARLARI = [
+    "seans_asamasi", "mevcut_problem", "seans_id", "seans_konusmalari", "kullanici_konusma_sirasi",
+    "konusma_sayisi", "mevcut_kullanici_konusma", "ai_cevap_uretti", "seans_analizi"
+]
+
+@st.cache_resource
+def durum_deposu_al():
+    """Süreçler arası paylaşılan seans durumu deposu"""
+    return durum_deposu_olustur()
+
+def seans_durumunu_kaydet():
+    """Aşama geçişinde seans ilerlemesini paylaşılan depoya yaz (başka replikada sürdürülebilsin)"""
+    durum = {k: st.session_state[k] for k in SEANS_DURUM_ANAHTARLARI if k in st.session_state}
+    if "seans_baslangic_zamani" in st.session_state:
+        durum["seans_baslangic_zamani"] = st.session_state.seans_baslangic_zamani.isoformat()
+    for ad in ("artimli_analiz", "kayan_ozet"):
+        if ad in st.session_state:
+            durum[ad] = st.session_state[ad].durum()
+    try:
+        durum_deposu_al().kaydet(st.session_state.kullanici_adi, durum)
+    except Exception as e:
+        print(f"❌ Seans durumu kaydedilemedi: {e}")
+
+def seans_durumunu_yukle():
+    """Kullanıcının son kontrol noktası varsa seansı oradan sürdür"""
+    try:
+        durum = durum_deposu_al().getir(st.session_state.kullanici_adi)
+    except Exception as e:
+        print(f"❌ Seans durumu okunamadı: {e}")
+        return False
+    if not durum:
+        return False
+    
+    for anahtar in SEANS_DURUM_ANAHTARLARI:
+        if anahtar in durum:
+            st.session_state[anahtar] = durum[anahtar]
+    if "seans_baslangic_zamani" in durum:
+        st.session_state.seans_baslangic_zamani = datetime.fromisoformat(durum["seans_baslangic_zamani"])
+        st.session_state.artimli_analiz = ArtimliSeansAnalizi(durum["mevcut_problem"])
+        st.session_state.artimli_analiz.durumu_yukle(durum.get("artimli_analiz", {}))
+        st.session_state.kayan_ozet = KayanOzet()
+        st.session_state.kayan_ozet.durumu_yukle(durum.get("kayan_ozet", {}))
+    st.session_state.sayfa = "yeni_seans"
+    return True
+
 def seans_sifirla():
     """Seans verilerini sıfırla"""
     keys_to_remove = [
         "seans_asamasi", "seans_baslangic_zamani", "seans_konusmalari",
         "kullanici_konusma_sirasi", "konusma_sayisi", "mevcut_kullanici_konusma",
-        "ai_cevap_uretti", "seans_analizi", "mevcut_problem"
+        "ai_cevap_uretti", "seans_analizi", "mevcut_problem", "artimli_analiz",
+        "kayan_ozet", "seans_id"
     ]
     
+    if "seans_id" in st.session_state:
+        olcum.seans_ozetini_birak(st.session_state.seans_id)
+    if "kullanici_adi" in st.session_state:
+        try:
+            durum_deposu_al().sil(st.session_state.kullanici_adi)
+        except Exception as e:
+            print(f"❌ Seans durumu silinemedi: {e}")
+    
     for key in keys_to_remove:
         if key in st.session_state:
             del st.session_state[key]
@@ -507,6 +671,8 @@ def kullanici_profil():
     st.markdown("### 👤 Profiliniz")
     
     kullanici_data = st.session_state.kullanici_data
+    # Başka sekmede/replikada kaydedilen seanslar sayfalamaya dahil olsun
+    kullanici_data["profil"]["toplam_seans"] = depo_al().seans_sayisi(st.session_state.kullanici_adi)
     
     col1, col2, col3 = st.columns(3)
     
@@ -527,28 +693,94 @@ def kullanici_profil():
     else:
         st.success(f"🏆 **{kullanici_data['profil']['toplam_seans']} değerlendirme tamamladınız!**")
     
-    if kullanici_data["seanslar"]:
+    toplam_seans = kullanici_data["profil"]["toplam_seans"]
+    if toplam_seans >= 2:
+        stres_trendi_goster(toplam_seans)
+    
+    if toplam_seans:
         st.markdown("### 📚 Değerlendirme Geçmişi")
         
-        for i, seans in enumerate(reversed(kullanici_data["seanslar"][-5:])):
-            tarih = datetime.fromisoformat(seans["tarih"])
+        sayfa_sayisi = max(1, -(-toplam_seans // RAPOR_SAYFA_BOYUTU))
+        sayfa = 1
+        if sayfa_sayisi > 1:
+            sayfa = st.number_input("Sayfa", min_value=1, max_value=sayfa_sayisi, value=1, step=1)
+        baslangic = (sayfa - 1) * RAPOR_SAYFA_BOYUTU
+        
+        # Sadece bu sayfanın başlıkları okunur; tam rapor istendiğinde yüklenir
+        basliklar = depo_al().seans_basliklari_getir(
+            st.session_state.kullanici_adi, baslangic, RAPOR_SAYFA_BOYUTU
+        )
+        
+        for i, baslik in enumerate(basliklar):
+            tarih = datetime.fromisoformat(baslik["tarih"])
             
-            with st.expander(f"📋 Rapor {len(kullanici_data['seanslar'])-i} - {tarih.strftime('%d.%m.%Y')}", expanded=(i==0)):
-                st.write(f"**🎯 Problem:** {seans['problem']['metin'][:100]}...")
+            with st.expander(f"📋 Rapor {toplam_seans-baslangic-i} - {tarih.strftime('%d.%m.%Y')}", expanded=(baslangic+i==0)):
+                st.write(f"**🎯 Problem:** {baslik['problem']}...")
                 
-                if 'klinik_tani' in seans['analiz']:
-                    st.error(f"**📋 Tanı:** {seans['analiz']['klinik_tani']}")
+                if baslik['klinik_tani']:
+                    st.error(f"**📋 Tanı:** {baslik['klinik_tani']}")
                 
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    st.write(f"**📊 Stres:** {seans['analiz']['stres_seviyesi']}/10")
-                    st.write(f"**🧠 Durum:** {seans['analiz']['ruh_hali'].title()}")
+                    if baslik['stres_seviyesi'] is not None:
+                        st.write(f"**📊 Stres:** {baslik['stres_seviyesi']}/10")
+                    st.write(f"**🧠 Durum:** {baslik['ruh_hali'].title()}")
                 
                 with col_b:
-                    st.write(f"**💬 Etkileşim:** {len(seans['konusmalar'])}")
+                    st.write(f"**💬 Etkileşim:** {baslik['tur_sayisi']}")
+                
+                rapor_detayi(baslik)
     else:
         st.info("🚀 **Henüz değerlendirme yapmadınız. İlk seansınıza başlayın!**")
 
+def stres_trendi_goster(toplam_seans):
+    """Seanslar boyunca stres ve ruh hali grafikleri"""
+    seri = trend_onbellegi.seri_al(depo_al(), st.session_state.kullanici_adi, toplam_seans)
+    tablo = grafik_tablosu(seri.tablo())
+    
+    st.markdown("### 📈 Stres Trendi")
+    st.plotly_chart(stres_grafigi(tablo), use_container_width=True)
+    
+    degisim_sayisi = int(tablo["degisim"].sum())
+    if degisim_sayisi:
+        st.caption(f"◇ {degisim_sayisi} belirgin stres değişimi işaretlendi")
+    
+    with st.expander("🧠 Ruh hali geçmişi"):
+        st.plotly_chart(ruh_hali_grafigi(tablo), use_container_width=True)
+
+def rapor_detayi(baslik):
+    """Tam raporu sadece istendiğinde depodan yükle ve göster"""
+    yuklenenler = st.session_state.setdefault("yuklenen_raporlar", {})
+    anahtar = baslik["seans_no"]
+    
+    if anahtar not in yuklenenler:
+        if st.button("📄 Tam raporu göster", key=f"rapor_{anahtar}"):
+            yuklenenler[anahtar] = depo_al().seans_getir(st.session_state.kullanici_adi, baslik)
+        else:
+            return
+    
+    seans = yuklenenler[anahtar]
+    if not seans:
+        st.warning("Rapor yüklenemedi.")
+        return
+    
+    analiz = seans["analiz"]
+    if analiz.get("tedavi_plani"):
+        st.success(f"**Protokol:** {analiz['tedavi_plani']}")
+    if analiz.get("oneriler"):
+        st.markdown("**💡 Öneriler:**")
+        for oneri in analiz["oneriler"]:
+            st.write(f"• {oneri}")
+    if analiz.get("degerlendirme"):
+        st.write(analiz["degerlendirme"])
+
+GUNUN_SOZLERI = [
+    "Her adım önemli 💪",
+    "Güçlü kalın 🦁",
+    "Umut hep var ✨",
+    "Değişim mümkün 🚀"
+]
+
 def main():
     st.set_page_config(
         page_title="AI-Psycho Professional",
@@ -567,11 +799,12 @@ def main():
     
     st.info("🔒 **Güvenli Platform:** Tüm verileriniz şifrelenir ve gizli tutulur")
     
-    # OpenAI başlat
-    if not openai_baslat():
+    # Anahtar kontrolü openai paketini yüklemez; istemci ilk seans sayfasında oluşturulur
+    if not api_anahtari_bul():
         st.error("❌ Sistem yapılandırması gerekli")
         st.info("API bağlantısı kurulamadı. Lütfen Streamlit Cloud Secrets'da OPENAI_API_KEY ayarlayın.")
         st.stop()
+    olcum.disa_aktarimi_baslat()
     
     # Session state başlangıç
     if "giris_yapildi" not in st.session_state:
@@ -643,14 +876,7 @@ def main():
         
         st.markdown("---")
         st.markdown("### 💡 Bugün")
-        gunun_sozleri = [
-            "Her adım önemli 💪",
-            "Güçlü kalın 🦁", 
-            "Umut hep var ✨",
-            "Değişim mümkün 🚀"
-        ]
-        import random
-        st.info(random.choice(gunun_sozleri))
+        st.info(random.choice(GUNUN_SOZLERI))
         
         st.markdown("---")
         if st.button("🚪 Çıkış", use_container_width=True):
@@ -665,15 +891,20 @@ def main():
     if st.session_state.sayfa == "profil":
         kullanici_profil()
     elif st.session_state.sayfa == "yeni_seans":
+        if not openai_baslat():
+            st.stop()
+        
         if "seans_asamasi" not in st.session_state:
             st.session_state.seans_asamasi = "problem_tanimlama"
         
-        if st.session_state.seans_asamasi == "problem_tanimlama":
-            problem_tanımlama()
-        elif st.session_state.seans_asamasi == "seans_baslangic":
-            seans_yonetim()
-        elif st.session_state.seans_asamasi == "seans_analiz":
-            seans_analiz_goster()
+        # Bu sayfadaki API çağrıları (arka plan görevleri dahil) seansın ölçümüne yazılır
+        with olcum.seans_baglami(st.session_state.get("seans_id"), st.session_state.get("konusma_sayisi")):
+            if st.session_state.seans_asamasi == "problem_tanimlama":
+                problem_tanımlama()
+            elif st.session_state.seans_asamasi == "seans_baslangic":
+                seans_yonetim()
+            elif st.session_state.seans_asamasi == "seans_analiz":
+                seans_analiz_goster()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,260 @@
+"""LLM/ses çağrıları için gecikme ve token ölçümü
+
+Her OpenAI çağrısı cagri_olc() bloğu içinde yapılır; süre, ilk parça süresi,
+token kullanımı, model, aşama (konusma_sirasi) ve sonuç kaydedilir. Ölçümler
+Prometheus metin biçiminde (METRIK_PORTU) veya periyodik JSON dökümüyle
+(METRIK_JSON_DOSYASI) dışa aktarılır, seans toplamları seans kaydına eklenir.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import METRIK_PORTU, METRIK_JSON_DOSYASI, METRIK_JSON_ARALIGI
+
+_kilit = threading.Lock()
+son_cagrilar = deque(maxlen=500)
+
+# Çağrıyı başlatan seans ve aşama; arka plan görevlerine context ile taşınır
+aktif_seans = contextvars.ContextVar("aktif_seans", default=None)
+aktif_asama = contextvars.ContextVar("aktif_asama", default=None)
+
+SURE_KOVALARI = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_ALANLARI = ("prompt_tokens", "cached_tokens", "completion_tokens")
+
+# (etiket, model, sonuç) -> çağrı sayısı; (etiket, model) -> histogram / token toplamı
+_cagri_sayilari = defaultdict(int)
+_sure_histogrami = defaultdict(lambda: [[0] * len(SURE_KOVALARI), 0.0, 0])
+_ilk_parca_histogrami = defaultdict(lambda: [[0] * len(SURE_KOVALARI), 0.0, 0])
+_token_sayilari = defaultdict(lambda: dict.fromkeys(TOKEN_ALANLARI, 0))
+_seans_toplamlari = {}
+
+
+@contextlib.contextmanager
+def seans_baglami(seans_id, asama=None):
+    """Bu blokta (ve buradan başlatılan arka plan görevlerinde) yapılan çağrıları seansa
+    ve aşamaya (konusma_sirasi) yaz; aşamasını kendisi bilmeyen stres, TTS ve Whisper
+    çağrıları aşamayı buradan alır"""
+    seans_jetonu = aktif_seans.set(seans_id)
+    asama_jetonu = aktif_asama.set(asama)
+    try:
+        yield
+    finally:
+        aktif_asama.reset(asama_jetonu)
+        aktif_seans.reset(seans_jetonu)
+
+
+class CagriOlcumu:
+    def __init__(self, etiket, model, asama):
+        self.etiket = etiket
+        self.model = model
+        self.asama = asama
+        self.seans = aktif_seans.get()
+        self.baslangic = time.perf_counter()
+        self.ilk_parca_suresi = None
+        self.tokenler = dict.fromkeys(TOKEN_ALANLARI, 0)
+
+    def ilk_parca(self):
+        """Akışta ilk parça geldiğinde çağrılır (sonraki çağrılar yok sayılır)"""
+        if self.ilk_parca_suresi is None:
+            self.ilk_parca_suresi = time.perf_counter() - self.baslangic
+
+    def kullanim(self, usage):
+        """API yanıtındaki usage bilgisini (önbellekten gelen prompt token'ları dahil) ekle"""
+        if usage is None:
+            return
+        detay = getattr(usage, "prompt_tokens_details", None)
+        self.tokenler["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+        self.tokenler["cached_tokens"] += getattr(detay, "cached_tokens", 0) or 0
+        self.tokenler["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def bitir(self, sonuc):
+        sure = time.perf_counter() - self.baslangic
+        kayit = {
+            "etiket": self.etiket,
+            "model": self.model,
+            "asama": self.asama,
+            "seans": self.seans,
+            "sonuc": sonuc,
+            "sure_ms": round(sure * 1000, 1),
+            "ilk_parca_ms": round(self.ilk_parca_suresi * 1000, 1) if self.ilk_parca_suresi is not None else None,
+            **self.tokenler
+        }
+        anahtar = (self.etiket, self.model)
+        with _kilit:
+            _cagri_sayilari[anahtar + (sonuc,)] += 1
+            _histograma_ekle(_sure_histogrami[anahtar], sure)
+            if self.ilk_parca_suresi is not None:
+                _histograma_ekle(_ilk_parca_histogrami[anahtar], self.ilk_parca_suresi)
+            for alan in TOKEN_ALANLARI:
+                _token_sayilari[anahtar][alan] += self.tokenler[alan]
+            if self.seans is not None:
+                _seansa_ekle(self.seans, kayit)
+            son_cagrilar.append(kayit)
+        return kayit
+
+
+def _histograma_ekle(histogram, deger):
+    kovalar, _, _ = histogram
+    for i, sinir in enumerate(SURE_KOVALARI):
+        if deger <= sinir:
+            kovalar[i] += 1
+    histogram[1] += deger
+    histogram[2] += 1
+
+
+def _seansa_ekle(seans_id, kayit):
+    toplam = _seans_toplamlari.setdefault(seans_id, {
+        "cagri": 0, "hata": 0, "sure_ms": 0.0, **dict.fromkeys(TOKEN_ALANLARI, 0), "etiketler": {}
+    })
+    etiket = toplam["etiketler"].setdefault(kayit["etiket"], {"cagri": 0, "sure_ms": 0.0})
+    toplam["cagri"] += 1
+    toplam["hata"] += kayit["sonuc"] != "basarili"
+    toplam["sure_ms"] = round(toplam["sure_ms"] + kayit["sure_ms"], 1)
+    for alan in TOKEN_ALANLARI:
+        toplam[alan] += kayit[alan]
+    etiket["cagri"] += 1
+    etiket["sure_ms"] = round(etiket["sure_ms"] + kayit["sure_ms"], 1)
+
+
+@contextlib.contextmanager
+def cagri_olc(etiket, model, asama=None):
+    """Bir OpenAI çağrısını ölç: süre, ilk parça, token, model, aşama ve sonuç"""
+    cagri = CagriOlcumu(etiket, model, asama if asama is not None else aktif_asama.get())
+    sonuc = "basarili"
+    try:
+        yield cagri
+    except GeneratorExit:
+        # Akışı tüketen taraf erken bıraktı
+        sonuc = "iptal"
+        raise
+    except BaseException as e:
+        sonuc = f"hata:{type(e).__name__}"
+        raise
+    finally:
+        cagri.bitir(sonuc)
+
+
+def seans_ozeti(seans_id):
+    """Seansın çağrı/süre/token toplamları (seans kaydına eklenir)"""
+    with _kilit:
+        toplam = _seans_toplamlari.get(seans_id)
+        return json.loads(json.dumps(toplam)) if toplam else None
+
+
+def seans_ozetini_birak(seans_id):
+    with _kilit:
+        _seans_toplamlari.pop(seans_id, None)
+
+
+def _etiketler(**degerler):
+    return "{" + ",".join(f'{ad}="{deger}"' for ad, deger in degerler.items()) + "}"
+
+
+def prometheus_metni():
+    """Ölçümleri Prometheus metin biçiminde döndür"""
+    satirlar = []
+    with _kilit:
+        satirlar.append("# TYPE ai_psycho_cagri_toplam counter")
+        for (etiket, model, sonuc), sayi in sorted(_cagri_sayilari.items()):
+            satirlar.append(f"ai_psycho_cagri_toplam{_etiketler(etiket=etiket, model=model, sonuc=sonuc)} {sayi}")
+
+        for ad, histogramlar in (("ai_psycho_cagri_suresi_saniye", _sure_histogrami),
+                                 ("ai_psycho_ilk_parca_suresi_saniye", _ilk_parca_histogrami)):
+            satirlar.append(f"# TYPE {ad} histogram")
+            for (etiket, model), (kovalar, toplam, sayi) in sorted(histogramlar.items()):
+                for sinir, kova in zip(SURE_KOVALARI, kovalar):
+                    satirlar.append(f"{ad}_bucket{_etiketler(etiket=etiket, model=model, le=sinir)} {kova}")
+                satirlar.append(f"{ad}_bucket{_etiketler(etiket=etiket, model=model, le='+Inf')} {sayi}")
+                satirlar.append(f"{ad}_sum{_etiketler(etiket=etiket, model=model)} {toplam:.6f}")
+                satirlar.append(f"{ad}_count{_etiketler(etiket=etiket, model=model)} {sayi}")
+
+        satirlar.append("# TYPE ai_psycho_token_toplam counter")
+        for (etiket, model), tokenler in sorted(_token_sayilari.items()):
+            for alan in TOKEN_ALANLARI:
+                satirlar.append(
+                    f"ai_psycho_token_toplam{_etiketler(etiket=etiket, model=model, tur=alan)} {tokenler[alan]}"
+                )
+    return "\n".join(satirlar) + "\n"
+
+
+def json_ozeti():
+    """Periyodik döküm için ölçümlerin JSON uyumlu özeti"""
+    with _kilit:
+        cagrilar = defaultdict(dict)
+        for (etiket, model, sonuc), sayi in _cagri_sayilari.items():
+            cagrilar[f"{etiket}/{model}"][sonuc] = sayi
+        sureler = {
+            f"{etiket}/{model}": {"ortalama_ms": round(toplam / sayi * 1000, 1) if sayi else 0.0, "sayi": sayi}
+            for (etiket, model), (_, toplam, sayi) in _sure_histogrami.items()
+        }
+        return {
+            "zaman": time.time(),
+            "cagrilar": dict(cagrilar),
+            "sureler": sureler,
+            "tokenler": {f"{etiket}/{model}": dict(t) for (etiket, model), t in _token_sayilari.items()},
+            "son_cagrilar": list(son_cagrilar)[-50:]
+        }
+
+
+class _MetrikIsleyici(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        icerik = prometheus_metni().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(icerik)))
+        self.end_headers()
+        self.wfile.write(icerik)
+
+
+def metrik_sunucusu_baslat(port):
+    """/metrics uç noktasını arka plan thread'inde sun"""
+    sunucu = ThreadingHTTPServer(("0.0.0.0", port), _MetrikIsleyici)
+    sunucu.daemon_threads = True
+    threading.Thread(target=sunucu.serve_forever, name="metrik-sunucusu", daemon=True).start()
+    return sunucu
+
+
+def json_dokumu_baslat(dosya_yolu, aralik):
+    """Ölçüm özetini her aralik saniyede dosyaya yaz"""
+    def dongu():
+        while True:
+            time.sleep(aralik)
+            try:
+                with open(dosya_yolu + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(json_ozeti(), f, ensure_ascii=False)
+                os.replace(dosya_yolu + ".tmp", dosya_yolu)
+            except OSError as e:
+                print(f"❌ Ölçüm dökümü yazılamadı: {e}")
+
+    threading.Thread(target=dongu, name="metrik-dokumu", daemon=True).start()
+
+
+_disa_aktarim_basladi = False
+
+
+def disa_aktarimi_baslat():
+    """Yapılandırılmışsa Prometheus uç noktasını ve JSON dökümünü bir kez başlat"""
+    global _disa_aktarim_basladi
+    with _kilit:
+        if _disa_aktarim_basladi:
+            return
+        _disa_aktarim_basladi = True
+    if METRIK_PORTU:
+        try:
+            metrik_sunucusu_baslat(METRIK_PORTU)
+            print(f"📈 Ölçümler: http://0.0.0.0:{METRIK_PORTU}/metrics")
+        except OSError as e:
+            print(f"❌ Metrik sunucusu başlatılamadı: {e}")
+    if METRIK_JSON_DOSYASI:
+        json_dokumu_baslat(METRIK_JSON_DOSYASI, METRIK_JSON_ARALIGI)
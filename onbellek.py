@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from depolama import atomik_yaz
+
+
+def turkce_normalize(metin):
+    """Metni Türkçe kurallarına göre küçük harfe çevir ve boşlukları sadeleştir"""
+    # str.lower() "I" -> "i" ve "İ" -> "i̇" yapar; Türkçe'de I -> ı, İ -> i olmalı
+    metin = metin.replace("I", "ı").replace("İ", "i").lower()
+    return " ".join(metin.split())
+
+
+class LRUTTLOnbellek:
+    """Boyut ve süre sınırlı, thread-safe LRU önbellek"""
+
+    def __init__(self, max_boyut=1024, ttl=24 * 3600, dosya_yolu=None):
+        self.max_boyut = max_boyut
+        self.ttl = ttl
+        self.dosya_yolu = dosya_yolu
+        self.isabet = 0
+        self.iskalama = 0
+        self._veri = OrderedDict()
+        self._kilit = threading.Lock()
+        if dosya_yolu:
+            self.diskten_yukle()
+
+    def getir(self, anahtar):
+        """Anahtarın değerini döndür, yoksa veya süresi dolmuşsa None"""
+        with self._kilit:
+            kayit = self._veri.get(anahtar)
+            if kayit is None or kayit[0] < time.time():
+                if kayit is not None:
+                    del self._veri[anahtar]
+                self.iskalama += 1
+                return None
+            self._veri.move_to_end(anahtar)
+            self.isabet += 1
+            return kayit[1]
+
+    def koy(self, anahtar, deger):
+        """Değeri önbelleğe ekle, gerekirse en eski kaydı çıkar"""
+        with self._kilit:
+            self._veri[anahtar] = (time.time() + self.ttl, deger)
+            self._veri.move_to_end(anahtar)
+            while len(self._veri) > self.max_boyut:
+                self._veri.popitem(last=False)
+
+    def temizle(self):
+        with self._kilit:
+            self._veri.clear()
+            self.isabet = 0
+            self.iskalama = 0
+
+    def istatistik(self):
+        """İsabet/ıskalama sayaçları"""
+        with self._kilit:
+            toplam = self.isabet + self.iskalama
+            return {
+                "boyut": len(self._veri),
+                "isabet": self.isabet,
+                "iskalama": self.iskalama,
+                "isabet_orani": self.isabet / toplam if toplam else 0.0
+            }
+
+    def diske_kaydet(self):
+        """Süresi dolmamış kayıtları diske yaz"""
+        if not self.dosya_yolu:
+            return False
+        simdi = time.time()
+        with self._kilit:
+            kayitlar = [[a, s, d] for a, (s, d) in self._veri.items() if s >= simdi]
+        klasor = os.path.dirname(os.path.abspath(self.dosya_yolu))
+        os.makedirs(klasor, exist_ok=True)
+        atomik_yaz(os.path.abspath(self.dosya_yolu), json.dumps(kayitlar, ensure_ascii=False))
+        return True
+
+    def diskten_yukle(self):
+        """Diskteki kayıtları yükle (bozuk veya eksik dosya yok sayılır)"""
+        try:
+            with open(self.dosya_yolu, "r", encoding="utf-8") as f:
+                kayitlar = json.load(f)
+        except (OSError, ValueError):
+            return False
+        simdi = time.time()
+        with self._kilit:
+            for anahtar, son_gecerlilik, deger in kayitlar[-self.max_boyut:]:
+                if son_gecerlilik >= simdi:
+                    self._veri[anahtar] = (son_gecerlilik, deger)
+        return True
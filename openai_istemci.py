@@ -0,0 +1,139 @@
+import asyncio
+import contextvars
+import importlib.util
+import os
+import threading
+
+from config import (
+    OPENAI_HAVUZ_BOYUTU, OPENAI_KEEPALIVE_BAGLANTI, OPENAI_KEEPALIVE_SURESI,
+    OPENAI_ZAMAN_ASIMI, OPENAI_BAGLANTI_ZAMAN_ASIMI, OPENAI_HTTP2
+)
+from tembel import tembel_modul
+from zamanlayici import varsayilan_zamanlayici
+
+# İlk istemci oluşturulurken yüklenir (açılışta ~0.8 sn)
+httpx = tembel_modul("httpx")
+openai = tembel_modul("openai")
+
+# Süreç genelinde tek istemci
+_kilit = threading.Lock()
+_istemci = None
+
+# Async istemci tek bir arka plan event loop'una bağlıdır
+_async_istemci = None
+_dongu = None
+
+
+def api_anahtari_bul():
+    """API anahtarını environment veya Streamlit secrets'tan bul"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        return api_key
+    try:
+        import streamlit as st
+        return st.secrets["OPENAI_API_KEY"]
+    except Exception:
+        return None
+
+
+def http2_destekleniyor():
+    """HTTP/2 için h2 paketi yüklü mü"""
+    return OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def havuz_ayarlari():
+    """httpx transport'ları için ortak bağlantı havuzu ayarları"""
+    return {
+        "limits": httpx.Limits(
+            max_connections=OPENAI_HAVUZ_BOYUTU,
+            max_keepalive_connections=OPENAI_KEEPALIVE_BAGLANTI,
+            keepalive_expiry=OPENAI_KEEPALIVE_SURESI
+        ),
+        "http2": http2_destekleniyor()
+    }
+
+
+def zaman_asimi():
+    return httpx.Timeout(OPENAI_ZAMAN_ASIMI, connect=OPENAI_BAGLANTI_ZAMAN_ASIMI)
+
+
+def http_istemcisi_olustur():
+    """Bağlantı havuzlu, istekleri süreç genelindeki zamanlayıcıdan geçiren httpx istemcisi"""
+    from zamanlayici_transport import ZamanlayiciTransport
+    transport = ZamanlayiciTransport(httpx.HTTPTransport(**havuz_ayarlari()), varsayilan_zamanlayici)
+    return httpx.Client(transport=transport, timeout=zaman_asimi())
+
+
+def async_http_istemcisi_olustur():
+    from zamanlayici_transport import AsyncZamanlayiciTransport
+    transport = AsyncZamanlayiciTransport(httpx.AsyncHTTPTransport(**havuz_ayarlari()), varsayilan_zamanlayici)
+    return httpx.AsyncClient(transport=transport, timeout=zaman_asimi())
+
+
+def openai_istemci_al():
+    """Paylaşılan OpenAI istemcisini döndür (yoksa oluştur)"""
+    global _istemci
+    if _istemci is not None:
+        return _istemci
+
+    with _kilit:
+        if _istemci is None:
+            api_key = api_anahtari_bul()
+            if not api_key:
+                return None
+            _istemci = openai.OpenAI(
+                api_key=api_key,
+                http_client=http_istemcisi_olustur(),
+                # Tekrar denemeyi transport yapar; SDK da denerse denemeler katlanır
+                max_retries=0
+            )
+    return _istemci
+
+
+def arka_plan_dongusu():
+    """Async çağrıların çalıştığı süreç genelindeki event loop"""
+    global _dongu
+    if _dongu is not None:
+        return _dongu
+
+    with _kilit:
+        if _dongu is None:
+            dongu = asyncio.new_event_loop()
+            threading.Thread(target=dongu.run_forever, name="openai-async", daemon=True).start()
+            _dongu = dongu
+    return _dongu
+
+
+def arka_planda_calistir(coro):
+    """Coroutine'i arka plan döngüsünde başlat, concurrent.futures.Future döndür
+
+    Çağıranın context değişkenleri (öncelik, seans, aşama) göreve taşınır.
+    """
+    baglam = contextvars.copy_context()
+
+    async def baglamda_calistir():
+        for degisken, deger in baglam.items():
+            degisken.set(deger)
+        return await coro
+
+    return asyncio.run_coroutine_threadsafe(baglamda_calistir(), arka_plan_dongusu())
+
+
+def async_openai_istemci_al():
+    """Paylaşılan AsyncOpenAI istemcisini döndür (sadece arka plan döngüsünde kullanılmalı)"""
+    global _async_istemci
+    if _async_istemci is not None:
+        return _async_istemci
+
+    with _kilit:
+        if _async_istemci is None:
+            api_key = api_anahtari_bul()
+            if not api_key:
+                return None
+            _async_istemci = openai.AsyncOpenAI(
+                api_key=api_key,
+                http_client=async_http_istemcisi_olustur(),
+                # Tekrar denemeyi transport yapar; SDK da denerse denemeler katlanır
+                max_retries=0
+            )
+    return _async_istemci
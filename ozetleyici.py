@@ -0,0 +1,151 @@
+import asyncio
+import threading
+
+from config import SON_TUR_SAYISI, BAGLAM_TOKEN_BUTCESI
+from olcum import cagri_olc
+from openai_istemci import async_openai_istemci_al, arka_planda_calistir
+from zamanlayici import ARKA_PLAN, aktif_oncelik
+
+try:
+    import tiktoken
+    _kodlayici = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _kodlayici = None
+
+
+def token_say(metin):
+    """Metnin token sayısı (tiktoken yoksa karakter tabanlı temkinli tahmin)"""
+    if _kodlayici is not None:
+        return len(_kodlayici.encode(metin))
+    # Türkçe metinlerde ~3 karakter/token, tahmin üstten yapılır
+    return len(metin) // 3 + 1
+
+
+def token_ile_kisalt(metin, token_butcesi):
+    """Metni token bütçesine sığacak şekilde sondan kısalt"""
+    if token_say(metin) <= token_butcesi:
+        return metin
+    kelimeler = metin.split()
+    while kelimeler and token_say(" ".join(kelimeler) + "...") > token_butcesi:
+        kelimeler = kelimeler[:max(0, len(kelimeler) - max(1, len(kelimeler) // 10))]
+    return " ".join(kelimeler) + "..." if kelimeler else ""
+
+
+def tur_metni(konusma, danisan_etiketi="Danışan", psikolog_etiketi="Psikolog"):
+    return f"{danisan_etiketi}: {konusma['kullanici']}\n{psikolog_etiketi}: {konusma['ai']}\n"
+
+
+class KayanOzet:
+    """Eski turların sıkıştırılmış özeti + son N tur birebir, sabit token bütçesiyle
+
+    Pencereden çıkan turlar arka planda LLM ile özete katlanır. Henüz özete
+    katılmamış eski turlar kısaltılarak eklenir, böylece bağlam hiçbir zaman
+    bütçeyi aşmaz ve erken konuşmalar kaybolmaz.
+    """
+
+    def __init__(self, son_tur_sayisi=SON_TUR_SAYISI, token_butcesi=BAGLAM_TOKEN_BUTCESI, ozet_token_butcesi=200):
+        self.son_tur_sayisi = son_tur_sayisi
+        self.token_butcesi = token_butcesi
+        self.ozet_token_butcesi = ozet_token_butcesi
+        self.ozet = ""
+        self.ozetlenen_tur = 0
+        self._gorev = None
+        self._kilit = threading.Lock()
+
+    def baglam(self, konusma_gecmisi, token_butcesi=None, danisan_etiketi="Danışan", psikolog_etiketi="Psikolog"):
+        """Prompt'a eklenecek bağlam metni (özet + son turlar)"""
+        butce = token_butcesi or self.token_butcesi
+        pencere_basi = max(0, len(konusma_gecmisi) - self.son_tur_sayisi)
+        son_turlar = [tur_metni(k, danisan_etiketi, psikolog_etiketi) for k in konusma_gecmisi[pencere_basi:]]
+
+        # Özete henüz girmemiş, pencere dışındaki turlar kısaltılarak eklenir
+        ozetlenen = min(self.ozetlenen_tur, pencere_basi)
+        bekleyen = [
+            token_ile_kisalt(tur_metni(k, danisan_etiketi, psikolog_etiketi), 60)
+            for k in konusma_gecmisi[ozetlenen:pencere_basi]
+        ]
+
+        ozet = token_ile_kisalt(self.ozet, self.ozet_token_butcesi) if ozetlenen else ""
+
+        # Bütçe aşılırsa önce kısaltılmış eski turlar, sonra en eski birebir turlar düşer
+        while True:
+            parcalar = []
+            if ozet:
+                parcalar.append(f"Önceki konuşmaların özeti: {ozet}")
+            if bekleyen:
+                parcalar.append("".join(bekleyen))
+            if son_turlar:
+                parcalar.append("".join(son_turlar))
+            metin = "\n".join(parcalar)
+            if token_say(metin) <= butce:
+                return metin
+            if bekleyen:
+                bekleyen.pop(0)
+            elif len(son_turlar) > 1:
+                son_turlar.pop(0)
+            else:
+                return token_ile_kisalt(metin, butce)
+
+    def durum(self):
+        """Kontrol noktasına yazılacak durum (tamamlanmış son özet)"""
+        return {"ozet": self.ozet, "ozetlenen_tur": self.ozetlenen_tur}
+
+    def durumu_yukle(self, durum):
+        self.ozet = durum.get("ozet", "")
+        self.ozetlenen_tur = durum.get("ozetlenen_tur", 0)
+
+    def sistem_promptu(self):
+        return f"""Bir terapi seansının kısa klinik özetini güncelliyorsun.
+Semptomları, tetikleyicileri, danışanın önemli ifadelerini ve verilen önerileri koruyarak
+en fazla {self.ozet_token_butcesi // 2} kelimelik tek paragraf yaz."""
+
+    def arka_planda_guncelle(self, konusma_gecmisi):
+        """Pencereden çıkan turları arka planda özete kat (hemen döner)"""
+        turlar = list(konusma_gecmisi)
+        with self._kilit:
+            self._gorev = arka_planda_calistir(self.guncelle_async(self._gorev, turlar))
+        return self._gorev
+
+    async def guncelle_async(self, onceki_gorev, turlar):
+        if onceki_gorev is not None:
+            try:
+                await asyncio.wrap_future(onceki_gorev)
+            except Exception:
+                pass
+
+        pencere_basi = max(0, len(turlar) - self.son_tur_sayisi)
+        yeni_turlar = turlar[self.ozetlenen_tur:pencere_basi]
+        if not yeni_turlar:
+            return
+
+        istemci = async_openai_istemci_al()
+        if not istemci:
+            return
+
+        aktif_oncelik.set(ARKA_PLAN)
+        konusmalar = "".join(tur_metni(k) for k in yeni_turlar)
+        prompt = f"""Mevcut özet:
+{self.ozet or "Henüz yok"}
+
+Özete eklenecek konuşmalar:
+{konusmalar}"""
+
+        try:
+            # Aşama: güncellemeyi tetikleyen son tur (konusma_sirasi, 0'dan başlar)
+            with cagri_olc("ozet", "gpt-4o-mini", len(turlar) - 1) as cagri:
+                response = await istemci.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": self.sistem_promptu()},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=self.ozet_token_butcesi,
+                    temperature=0.2
+                )
+                cagri.kullanim(response.usage)
+        except Exception as e:
+            print(f"❌ Özet güncelleme hatası: {e}")
+            return
+
+        self.ozet = response.choices[0].message.content.strip()
+        self.ozetlenen_tur = pencere_basi
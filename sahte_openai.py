@@ -0,0 +1,230 @@
+"""Yerel, OpenAI uyumlu sahte sunucu (API anahtarı olmadan ölçüm için)
+
+Sohbet (akışlı/akışsız), TTS ve Whisper uç noktalarını ayarlanabilir gecikme,
+token hızı ve hata oranıyla taklit eder.
+
+Kullanım:
+    python sahte_openai.py --port 8089 --gecikme-ms 300 --token-hizi 40 --hata-orani 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=sahte streamlit run main.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ORNEK_CEVAP = (
+    "Anlattıklarınız çok değerli. Bu kaygının özellikle akşam saatlerinde arttığını "
+    "fark etmeniz önemli bir adım. Şimdi birlikte nefesinize odaklanalım ve bedeninizde "
+    "gerginliği en çok nerede hissettiğinizi düşünelim. Bu his size ne söylüyor?"
+)
+ORNEK_ANALIZ = json.dumps({
+    "t": "Yaygın Anksiyete Bozukluğu belirtileri",
+    "s": 6,
+    "r": "anksiyeteli",
+    "a": "orta",
+    "p": "Bilişsel davranışçı terapi ve gevşeme egzersizleri",
+    "o": ["Günlük nefes egzersizi yapın", "Uyku düzenine dikkat edin", "Kaygı günlüğü tutun"],
+    "d": "Danışan iş kaynaklı yoğun kaygı ve uyku sorunları tarif ediyor. Belirtiler akşamları artıyor.",
+    "n": ""
+}, ensure_ascii=False)
+ORNEK_STRES = "6 anksiyeteli"
+ORNEK_TRANSKRIPT = "Son zamanlarda işte çok gerginim ve geceleri uyuyamıyorum."
+
+
+class SahteAyarlar:
+    """Sunucu davranışı; çalışırken değiştirilebilir"""
+
+    def __init__(self, gecikme_ms=200, token_hizi=50.0, hata_orani=0.0, tts_bayt_hizi=48000,
+                 whisper_hiz_orani=0.05):
+        self.gecikme_ms = gecikme_ms
+        # Saniyede üretilen çıktı token'ı (akışta token araları bu hıza göre beklenir)
+        self.token_hizi = token_hizi
+        # İsteklerin bu oranı 429 veya 500 ile döner
+        self.hata_orani = hata_orani
+        self.tts_bayt_hizi = tts_bayt_hizi
+        # Ses süresinin bu katı kadar transkripsiyon süresi eklenir
+        self.whisper_hiz_orani = whisper_hiz_orani
+        self.istek_sayisi = 0
+        self.hata_sayisi = 0
+        self._kilit = threading.Lock()
+
+    def say(self, hata=False):
+        with self._kilit:
+            self.istek_sayisi += 1
+            if hata:
+                self.hata_sayisi += 1
+
+
+def cevap_metni(govde):
+    """İsteğin biçimine (JSON şeması) ve sistem promptuna göre örnek cevap seç"""
+    if (govde.get("response_format") or {}).get("type") == "json_schema":
+        return ORNEK_ANALIZ
+    sistem = " ".join(m.get("content", "") for m in govde.get("messages", []) if m.get("role") == "system")
+    if "stres/anksiyete seviyesini" in sistem:
+        return ORNEK_STRES
+    return ORNEK_CEVAP
+
+
+def token_parcala(metin, en_fazla):
+    """Metni kelime + boşluk parçalarına böl (her parça bir token sayılır)"""
+    kelimeler = metin.split(" ")
+    parcalar = [k + " " for k in kelimeler[:-1]] + kelimeler[-1:]
+    return parcalar[:max(1, en_fazla)]
+
+
+def kullanim(govde, tamamlanan):
+    prompt_tokens = len(json.dumps(govde.get("messages", []), ensure_ascii=False)) // 4
+    # Sağlayıcı önek önbelleği 1024 token'dan sonra 128'lik bloklarla devreye girer
+    cached_tokens = (prompt_tokens - 1024) // 128 * 128 + 1024 if prompt_tokens >= 1024 else 0
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": tamamlanan,
+        "total_tokens": prompt_tokens + tamamlanan,
+        "prompt_tokens_details": {"cached_tokens": cached_tokens}
+    }
+
+
+class SahteIstekIsleyici(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ayarlar = SahteAyarlar()
+
+    def log_message(self, *args):
+        pass
+
+    def _govde(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _json_gonder(self, durum, veri, basliklar=None):
+        icerik = json.dumps(veri, ensure_ascii=False).encode("utf-8")
+        self.send_response(durum)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(icerik)))
+        for ad, deger in (basliklar or {}).items():
+            self.send_header(ad, deger)
+        self.end_headers()
+        self.wfile.write(icerik)
+
+    def _parca_gonder(self, veri):
+        self.wfile.write(f"{len(veri):X}\r\n".encode() + veri + b"\r\n")
+        self.wfile.flush()
+
+    def _hata_enjekte_et(self):
+        if random.random() >= self.ayarlar.hata_orani:
+            self.ayarlar.say()
+            return False
+        self.ayarlar.say(hata=True)
+        if random.random() < 0.5:
+            self._json_gonder(429, {"error": {"message": "Rate limit", "type": "rate_limit"}}, {"Retry-After": "0.2"})
+        else:
+            self._json_gonder(500, {"error": {"message": "Sunucu hatası", "type": "server_error"}})
+        return True
+
+    def do_POST(self):
+        govde = self._govde()
+        if self._hata_enjekte_et():
+            return
+        time.sleep(self.ayarlar.gecikme_ms / 1000)
+
+        if self.path.endswith("/chat/completions"):
+            self.sohbet(json.loads(govde))
+        elif self.path.endswith("/audio/speech"):
+            self.konusma_sentezi(json.loads(govde))
+        elif self.path.endswith("/audio/transcriptions"):
+            self.transkripsiyon(govde)
+        else:
+            self._json_gonder(404, {"error": {"message": f"Bilinmeyen uç nokta: {self.path}"}})
+
+    def sohbet(self, govde):
+        parcalar = token_parcala(cevap_metni(govde), govde.get("max_tokens") or 1000)
+        kimlik = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        ortak = {"id": kimlik, "created": int(time.time()), "model": govde.get("model", "gpt-4o-mini")}
+
+        if not govde.get("stream"):
+            time.sleep(len(parcalar) / self.ayarlar.token_hizi)
+            self._json_gonder(200, {
+                **ortak,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(parcalar)},
+                    "finish_reason": "stop"
+                }],
+                "usage": kullanim(govde, len(parcalar))
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def olay(veri):
+            self._parca_gonder(f"data: {json.dumps(veri, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        for parca in parcalar:
+            olay({**ortak, "object": "chat.completion.chunk", "choices": [
+                {"index": 0, "delta": {"content": parca}, "finish_reason": None}
+            ]})
+            time.sleep(1 / self.ayarlar.token_hizi)
+        olay({**ortak, "object": "chat.completion.chunk", "choices": [
+            {"index": 0, "delta": {}, "finish_reason": "stop"}
+        ]})
+        if (govde.get("stream_options") or {}).get("include_usage"):
+            olay({**ortak, "object": "chat.completion.chunk", "choices": [], "usage": kullanim(govde, len(parcalar))})
+        self._parca_gonder(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def konusma_sentezi(self, govde):
+        # ~1 saniyelik konuşma / 15 karakter, 48 kbps MP3 varsayımıyla boyut
+        boyut = max(1024, len(govde.get("input", "")) * 400)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        parca_boyutu = 4096
+        for bas in range(0, boyut, parca_boyutu):
+            veri = bytes(min(parca_boyutu, boyut - bas))
+            self._parca_gonder(veri)
+            time.sleep(len(veri) / self.ayarlar.tts_bayt_hizi)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def transkripsiyon(self, govde):
+        # 16 kHz 16-bit mono varsayımıyla ses süresi
+        ses_suresi = len(govde) / 32000
+        time.sleep(ses_suresi * self.ayarlar.whisper_hiz_orani)
+        self._json_gonder(200, {"text": ORNEK_TRANSKRIPT})
+
+
+def sunucu_baslat(ayarlar=None, port=0):
+    """Sunucuyu arka plan thread'inde başlat, (sunucu, base_url) döndür"""
+    isleyici = type("Isleyici", (SahteIstekIsleyici,), {"ayarlar": ayarlar or SahteAyarlar()})
+    sunucu = ThreadingHTTPServer(("127.0.0.1", port), isleyici)
+    sunucu.daemon_threads = True
+    threading.Thread(target=sunucu.serve_forever, name="sahte-openai", daemon=True).start()
+    return sunucu, f"http://127.0.0.1:{sunucu.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI uyumlu sahte sunucu")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--gecikme-ms", type=float, default=200)
+    parser.add_argument("--token-hizi", type=float, default=50.0)
+    parser.add_argument("--hata-orani", type=float, default=0.0)
+    args = parser.parse_args()
+
+    ayarlar = SahteAyarlar(args.gecikme_ms, args.token_hizi, args.hata_orani)
+    sunucu, adres = sunucu_baslat(ayarlar, args.port)
+    print(f"✅ Sahte OpenAI sunucusu: {adres}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sunucu.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,140 @@
+"""Süreçler arası paylaşılan seans durumu (kontrol noktaları)
+
+st.session_state süreç içidir: birden fazla replika çalıştığında ya da süreç
+yeniden başladığında devam eden seans kaybolur. Seans ilerlemesi her aşama
+geçişinde kullanıcı adıyla bu depoya yazılır ve kullanıcının giriş yaptığı
+herhangi bir replikada buradan geri yüklenir.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from config import SEANS_DURUMU_TURU, SEANS_DURUMU_KLASORU, SEANS_DURUMU_TTL, VERITABANI_YOLU
+from depolama import atomik_yaz
+
+
+class SeansDurumDeposu(ABC):
+    """Seans durumu depolama arayüzü"""
+
+    @abstractmethod
+    def kaydet(self, anahtar, durum):
+        """Durumu (JSON'a yazılabilir sözlük) anahtarın son kontrol noktası olarak yaz"""
+
+    @abstractmethod
+    def getir(self, anahtar):
+        """Son kontrol noktasını getir (yoksa veya süresi dolmuşsa None)"""
+
+    @abstractmethod
+    def sil(self, anahtar):
+        """Anahtarın kontrol noktasını sil (seans bitti veya sıfırlandı)"""
+
+
+class SQLiteDurumDeposu(SeansDurumDeposu):
+    """SQLite (WAL) tabanlı; aynı makinedeki tüm süreçler aynı dosyayı paylaşır"""
+
+    SEMA = """
+    CREATE TABLE IF NOT EXISTS seans_durumlari (
+        anahtar TEXT PRIMARY KEY,
+        durum TEXT NOT NULL,
+        guncelleme REAL NOT NULL
+    );
+    """
+
+    def __init__(self, yol=VERITABANI_YOLU, ttl=SEANS_DURUMU_TTL):
+        self.yol = yol
+        self.ttl = ttl
+        self._yerel = threading.local()
+        baglanti = self._baglanti()
+        baglanti.execute("PRAGMA journal_mode=WAL")
+        baglanti.executescript(self.SEMA)
+
+    def _baglanti(self):
+        baglanti = getattr(self._yerel, "baglanti", None)
+        if baglanti is None:
+            baglanti = sqlite3.connect(self.yol, timeout=30)
+            baglanti.execute("PRAGMA synchronous=NORMAL")
+            self._yerel.baglanti = baglanti
+        return baglanti
+
+    def kaydet(self, anahtar, durum):
+        with self._baglanti() as baglanti:
+            baglanti.execute(
+                """INSERT INTO seans_durumlari (anahtar, durum, guncelleme) VALUES (?, ?, ?)
+                   ON CONFLICT(anahtar) DO UPDATE SET durum = excluded.durum, guncelleme = excluded.guncelleme""",
+                (anahtar, json.dumps(durum, ensure_ascii=False), time.time())
+            )
+
+    def getir(self, anahtar):
+        satir = self._baglanti().execute(
+            "SELECT durum FROM seans_durumlari WHERE anahtar = ? AND guncelleme >= ?",
+            (anahtar, time.time() - self.ttl)
+        ).fetchone()
+        return json.loads(satir[0]) if satir else None
+
+    def sil(self, anahtar):
+        with self._baglanti() as baglanti:
+            baglanti.execute("DELETE FROM seans_durumlari WHERE anahtar = ?", (anahtar,))
+
+
+class DosyaDurumDeposu(SeansDurumDeposu):
+    """Anahtar başına bir JSON dosyası (paylaşılan disk/NFS üzerinde de çalışır)"""
+
+    def __init__(self, klasor=SEANS_DURUMU_KLASORU, ttl=SEANS_DURUMU_TTL):
+        self.klasor = klasor
+        self.ttl = ttl
+        os.makedirs(klasor, exist_ok=True)
+
+    def _dosya_yolu(self, anahtar):
+        return os.path.join(self.klasor, hashlib.sha256(anahtar.encode("utf-8")).hexdigest() + ".json")
+
+    def kaydet(self, anahtar, durum):
+        atomik_yaz(self._dosya_yolu(anahtar), json.dumps(durum, ensure_ascii=False))
+
+    def getir(self, anahtar):
+        dosya_yolu = self._dosya_yolu(anahtar)
+        try:
+            if os.path.getmtime(dosya_yolu) < time.time() - self.ttl:
+                return None
+            with open(dosya_yolu, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def sil(self, anahtar):
+        try:
+            os.remove(self._dosya_yolu(anahtar))
+        except FileNotFoundError:
+            pass
+
+
+class KapaliDurumDeposu(SeansDurumDeposu):
+    """Kontrol noktası tutulmaz (tek süreçli kurulumlar için)"""
+
+    def kaydet(self, anahtar, durum):
+        pass
+
+    def getir(self, anahtar):
+        return None
+
+    def sil(self, anahtar):
+        pass
+
+
+# Kullanılabilir seans durumu depoları
+DURUM_DEPOSU_TURLERI = {
+    "sqlite": SQLiteDurumDeposu,
+    "dosya": DosyaDurumDeposu,
+    "kapali": KapaliDurumDeposu,
+}
+
+
+def durum_deposu_olustur(tur=None, **ayarlar):
+    """Yapılandırılmış türden seans durumu deposu oluştur"""
+    tur = tur or SEANS_DURUMU_TURU
+    if tur not in DURUM_DEPOSU_TURLERI:
+        raise ValueError(f"Bilinmeyen seans durumu deposu: {tur}")
+    return DURUM_DEPOSU_TURLERI[tur](**ayarlar)
@@ -0,0 +1,114 @@
+import io
+import queue
+import threading
+
+
+class SesCalar:
+    """Arka plan thread'inde çalışan, kuyruklu ses çalıcı
+
+    pygame mixer bir kez başlatılır ve ses bellekteki tampondan çalınır.
+    kuyruga_ekle/iptal/bosalt hemen döner; çağıran thread çalma sürerken
+    bir sonraki transkripsiyona veya cevap üretimine geçebilir.
+    """
+
+    def __init__(self, frekans=22050, tampon=1024):
+        self.frekans = frekans
+        self.tampon = tampon
+        self._kuyruk = queue.Queue()
+        self._durdur = threading.Event()
+        self._bitti = threading.Event()
+        self._bitti.set()
+        # iptal() öncesinde kuyruğa girmiş sesler nesil numarasından tanınıp atlanır
+        self._nesil = 0
+        self._kilit = threading.Lock()
+        self._thread = None
+
+    def _baslat(self):
+        with self._kilit:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._calisma_dongusu, name="ses-calar", daemon=True)
+                self._thread.start()
+
+    def kuyruga_ekle(self, ses_baytlari):
+        """Sesi çalma kuyruğunun sonuna ekle (hemen döner)"""
+        if not ses_baytlari:
+            return
+        self._baslat()
+        with self._kilit:
+            self._bitti.clear()
+            self._kuyruk.put((self._nesil, ses_baytlari))
+
+    def bosalt(self):
+        """Bekleyen sesleri at, çalmakta olanı bitirmesine izin ver"""
+        with self._kilit:
+            self._nesil += 1
+        self._kuyruk.put(None)
+
+    def iptal(self):
+        """Çalmakta olan sesi durdur ve bekleyenleri at"""
+        # Nesil artışı ve durdurma işareti çalma döngüsündeki kontrolle aynı kilit altında
+        with self._kilit:
+            self._nesil += 1
+            self._durdur.set()
+        self._kuyruk.put(None)
+
+    def bekle(self, zaman_asimi=None):
+        """Kuyruk boşalıp çalma bitene kadar bekle"""
+        return self._bitti.wait(zaman_asimi)
+
+    def _calisma_dongusu(self):
+        try:
+            import pygame
+            pygame.mixer.pre_init(frequency=self.frekans, size=-16, channels=2, buffer=self.tampon)
+            pygame.mixer.init()
+        except Exception as e:
+            print(f"❌ Ses çalıcı başlatılamadı: {e}")
+            pygame = None
+
+        while True:
+            try:
+                oge = self._kuyruk.get(timeout=0.5)
+            except queue.Empty:
+                oge = None
+            if oge is None:
+                with self._kilit:
+                    if self._kuyruk.empty():
+                        self._bitti.set()
+                continue
+
+            nesil, ses_baytlari = oge
+            if pygame is None:
+                continue
+            # Kontrol ve temizleme birlikte: arada gelen iptal() işareti silinmez,
+            # sonrasında gelen iptal() ise aşağıdaki döngüde çalmayı durdurur
+            with self._kilit:
+                if nesil != self._nesil:
+                    continue
+                self._durdur.clear()
+            try:
+                pygame.mixer.music.load(io.BytesIO(ses_baytlari), "mp3")
+                pygame.mixer.music.set_volume(1.0)
+                if self._durdur.is_set():
+                    pygame.mixer.music.unload()
+                    continue
+                pygame.mixer.music.play()
+                while pygame.mixer.music.get_busy():
+                    if self._durdur.wait(0.05):
+                        pygame.mixer.music.stop()
+                        break
+                pygame.mixer.music.unload()
+            except Exception as e:
+                print(f"❌ Ses çalma hatası: {e}")
+
+
+_varsayilan_calar = None
+_varsayilan_kilit = threading.Lock()
+
+
+def varsayilan_calar():
+    """Süreç genelinde paylaşılan ses çalıcı"""
+    global _varsayilan_calar
+    with _varsayilan_kilit:
+        if _varsayilan_calar is None:
+            _varsayilan_calar = SesCalar()
+        return _varsayilan_calar
@@ -0,0 +1,147 @@
+"""İçerik adresli TTS ses önbelleği
+
+Ön ısıtma (deploy sırasında hazır ifadeleri seslendirir):
+    python ses_onbellek.py --on-isit
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from config import TTS_ONBELLEK_KLASORU, TTS_ONBELLEK_MAX_MB, TTS_SICAK_MAX_MB
+
+
+def ses_anahtari(metin, ses, hiz, model):
+    """(metin, ses, hız, model) için içerik özeti"""
+    icerik = f"{model}\x00{ses}\x00{hiz}\x00{metin}"
+    return hashlib.sha256(icerik.encode("utf-8")).hexdigest()
+
+
+class SesOnbellegi:
+    """Bellekte sıcak katman + diskte boyut sınırlı LRU ses önbelleği"""
+
+    def __init__(self, klasor=TTS_ONBELLEK_KLASORU, max_bayt=TTS_ONBELLEK_MAX_MB * 1024 * 1024,
+                 sicak_max_bayt=TTS_SICAK_MAX_MB * 1024 * 1024):
+        self.klasor = klasor
+        self.max_bayt = max_bayt
+        self.sicak_max_bayt = sicak_max_bayt
+        self.isabet = 0
+        self.iskalama = 0
+        self._sicak = OrderedDict()
+        self._sicak_bayt = 0
+        self._kilit = threading.Lock()
+        os.makedirs(klasor, exist_ok=True)
+        self._disk_bayt = sum(os.path.getsize(yol) for yol in self._disk_dosyalari())
+
+    def _dosya_yolu(self, anahtar):
+        return os.path.join(self.klasor, anahtar[:2], f"{anahtar}.mp3")
+
+    def _disk_dosyalari(self):
+        for kok, _, dosyalar in os.walk(self.klasor):
+            for dosya in dosyalar:
+                if dosya.endswith(".mp3"):
+                    yield os.path.join(kok, dosya)
+
+    def _sicaga_koy(self, anahtar, veri):
+        if len(veri) > self.sicak_max_bayt:
+            return
+        eski = self._sicak.pop(anahtar, None)
+        if eski is not None:
+            self._sicak_bayt -= len(eski)
+        self._sicak[anahtar] = veri
+        self._sicak_bayt += len(veri)
+        while self._sicak_bayt > self.sicak_max_bayt:
+            _, cikan = self._sicak.popitem(last=False)
+            self._sicak_bayt -= len(cikan)
+
+    def getir(self, anahtar):
+        """Ses baytlarını döndür, yoksa None"""
+        with self._kilit:
+            veri = self._sicak.get(anahtar)
+            if veri is not None:
+                self._sicak.move_to_end(anahtar)
+                self.isabet += 1
+                return veri
+
+        dosya_yolu = self._dosya_yolu(anahtar)
+        try:
+            with open(dosya_yolu, "rb") as f:
+                veri = f.read()
+            # Erişim zamanı LRU sırası olarak kullanılır
+            os.utime(dosya_yolu)
+        except OSError:
+            with self._kilit:
+                self.iskalama += 1
+            return None
+
+        with self._kilit:
+            self.isabet += 1
+            self._sicaga_koy(anahtar, veri)
+        return veri
+
+    def koy(self, anahtar, veri):
+        """Ses baytlarını sıcak katmana ve diske yaz"""
+        dosya_yolu = self._dosya_yolu(anahtar)
+        os.makedirs(os.path.dirname(dosya_yolu), exist_ok=True)
+        onceki_boyut = os.path.getsize(dosya_yolu) if os.path.exists(dosya_yolu) else 0
+        gecici_yol = f"{dosya_yolu}.{threading.get_ident()}.tmp"
+        with open(gecici_yol, "wb") as f:
+            f.write(veri)
+        os.replace(gecici_yol, dosya_yolu)
+
+        with self._kilit:
+            self._sicaga_koy(anahtar, veri)
+            self._disk_bayt += len(veri) - onceki_boyut
+            if self._disk_bayt > self.max_bayt:
+                self._diski_temizle()
+
+    def _diski_temizle(self):
+        # En uzun süredir erişilmeyen dosyalar sınırın %90'ına inene kadar silinir
+        dosyalar = sorted(self._disk_dosyalari(), key=os.path.getmtime)
+        hedef = self.max_bayt * 0.9
+        for dosya_yolu in dosyalar:
+            if self._disk_bayt <= hedef:
+                break
+            try:
+                boyut = os.path.getsize(dosya_yolu)
+                os.remove(dosya_yolu)
+            except OSError:
+                continue
+            self._disk_bayt -= boyut
+            anahtar = os.path.basename(dosya_yolu)[:-4]
+            veri = self._sicak.pop(anahtar, None)
+            if veri is not None:
+                self._sicak_bayt -= len(veri)
+
+    def istatistik(self):
+        with self._kilit:
+            return {
+                "isabet": self.isabet,
+                "iskalama": self.iskalama,
+                "sicak_bayt": self._sicak_bayt,
+                "disk_bayt": self._disk_bayt
+            }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="TTS ses önbelleği")
+    parser.add_argument("--on-isit", action="store_true", help="Hazır ifadeleri önceden seslendir")
+    args = parser.parse_args()
+
+    if not args.on_isit:
+        parser.print_help()
+        return 0
+
+    import utils_anxiety
+    if not utils_anxiety.openai_baslat():
+        print("❌ OpenAI API anahtarı bulunamadı")
+        return 1
+    sayi = utils_anxiety.hazir_ifadeleri_on_isit()
+    print(f"✅ {sayi} hazır ifade önbellekte")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
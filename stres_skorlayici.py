@@ -0,0 +1,169 @@
+import functools
+import re
+
+from onbellek import LRUTTLOnbellek, turkce_normalize
+from tembel import tembel_modul
+
+np = tembel_modul("numpy")
+
+# Türkçe stres/anksiyete sözlüğü: kök (veya iki köklü ifade) -> ağırlık
+# Kökler önek olarak eşleşir ("endişe" -> "endişeliyim", "endişelerim")
+STRES_SOZLUGU = {
+    # Hafif kaygı
+    ("endişe",): 1.0,
+    ("kaygı",): 1.0,
+    ("tedirgin",): 1.0,
+    ("huzursuz",): 1.2,
+    ("gergin",): 1.2,
+    ("merak", "ediyorum"): 0.4,
+    ("uyku", "sorun"): 1.2,
+    ("yorgun",): 0.8,
+    ("bıkkın",): 0.9,
+    ("yalnız",): 0.9,
+    ("üzgün",): 1.0,
+    ("mutsuz",): 1.1,
+    # Orta düzey stres/anksiyete
+    ("stres",): 1.5,
+    ("anksiyete",): 1.8,
+    ("kork",): 1.5,
+    ("bunal",): 1.8,
+    ("uyuyamıyor",): 1.8,
+    ("odaklanamıyor",): 1.4,
+    ("ağlı",): 1.5,
+    ("sinir",): 1.3,
+    ("öfke",): 1.3,
+    ("baskı",): 1.2,
+    ("tükenmiş",): 2.0,
+    ("depres",): 2.0,
+    ("çaresiz",): 2.2,
+    ("umutsuz",): 2.3,
+    ("dayanamıyor",): 2.4,
+    ("baş", "edemiyor"): 2.0,
+    ("kalbim", "çarp"): 2.2,
+    ("kalp", "çarpıntı"): 2.2,
+    ("elim", "titri"): 1.8,
+    ("nefes", "alamıyor"): 2.8,
+    ("kontrol", "kaybed"): 2.6,
+    # Panik/kriz
+    ("panik",): 3.0,
+    ("kriz",): 2.6,
+    ("dehşet",): 2.8,
+    ("ölecek", "gibi"): 3.2,
+    ("deliri",): 2.8,
+    ("acil",): 2.0,
+    ("kendime", "zarar"): 4.0,
+    ("intihar",): 4.5,
+    ("yaşamak", "istemiyor"): 4.5,
+    # Sakinleştirici ifadeler
+    ("sakin",): -1.2,
+    ("huzur",): -1.5,
+    ("rahat",): -1.2,
+    ("mutlu",): -1.4,
+    ("iyiyim",): -1.2,
+    ("iyi", "hissediyor"): -1.4,
+    ("keyif",): -1.0,
+    ("dinlen",): -0.8,
+}
+
+# Skor aralığı -> LLM promptundaki ruh hali kelimeleri
+RUH_HALI_ESIKLERI = [
+    (0, "sakin"),
+    (3, "endişeli"),
+    (6, "anksiyeteli"),
+    (9, "stresli"),
+    (10, "panik"),
+]
+
+KELIME_AYIRICI = re.compile(r"[^\w]+", re.UNICODE)
+
+
+class StresSkorlayici:
+    """Sözlük tabanlı, NumPy ile vektörize yerel stres skorlayıcı"""
+
+    def __init__(self, sozluk=None, taban=0.6, olcek=4.0, kelime_onbellek_boyutu=8192):
+        self.sozluk = sozluk or STRES_SOZLUGU
+        self.ifadeler = list(self.sozluk)
+        self.taban = taban
+        self.olcek = olcek
+        self.koklar = sorted({kok for ifade in self.ifadeler for kok in ifade})
+        self.tekli_indeks = {ifade[0]: i for i, ifade in enumerate(self.ifadeler) if len(ifade) == 1}
+        self.ikili_indeks = {ifade: i for i, ifade in enumerate(self.ifadeler) if len(ifade) == 2}
+        # Uzun çalışan süreçte görülen her kelime tutulmasın
+        self._kelime_onbellegi = LRUTTLOnbellek(max_boyut=kelime_onbellek_boyutu, ttl=float("inf"))
+
+    @functools.cached_property
+    def agirliklar(self):
+        # Modül düzeyindeki varsayılan skorlayıcı numpy'ı import anında yüklemesin
+        return np.array([self.sozluk[i] for i in self.ifadeler], dtype=np.float32)
+
+    def kelime_koklari(self, kelime):
+        """Kelimenin önek olarak eşleştiği sözlük kökleri"""
+        koklar = self._kelime_onbellegi.getir(kelime)
+        if koklar is None:
+            koklar = tuple(kok for kok in self.koklar if kelime.startswith(kok))
+            self._kelime_onbellegi.koy(kelime, koklar)
+        return koklar
+
+    def ozellik_indeksleri(self, metin):
+        """Metindeki eşleşen sözlük ifadelerinin indeksleri"""
+        kelimeler = [k for k in KELIME_AYIRICI.split(turkce_normalize(metin)) if k]
+        kok_listesi = [self.kelime_koklari(k) for k in kelimeler]
+        indeksler = []
+        for i, koklar in enumerate(kok_listesi):
+            for kok in koklar:
+                if kok in self.tekli_indeks:
+                    indeksler.append(self.tekli_indeks[kok])
+            if i + 1 < len(kok_listesi):
+                for kok1 in koklar:
+                    for kok2 in kok_listesi[i + 1]:
+                        indeks = self.ikili_indeks.get((kok1, kok2))
+                        if indeks is not None:
+                            indeksler.append(indeks)
+        return indeksler
+
+    def ozellik_matrisi(self, metinler):
+        """Metin x ifade sayım matrisi"""
+        matris = np.zeros((len(metinler), len(self.ifadeler)), dtype=np.float32)
+        for satir, metin in enumerate(metinler):
+            indeksler = self.ozellik_indeksleri(metin)
+            if indeksler:
+                np.add.at(matris[satir], indeksler, 1.0)
+        return matris
+
+    def toplu_skorla(self, metinler):
+        """Metin listesini skorla: (0-10 skorlar, güven değerleri)"""
+        matris = self.ozellik_matrisi(metinler)
+        ham = matris @ self.agirliklar + self.taban
+        skorlar = np.rint(10.0 * (1.0 - np.exp(-np.clip(ham, 0.0, None) / self.olcek)))
+        # Güven: eşleşen ifadelerin toplam mutlak ağırlığı
+        guvenler = matris @ np.abs(self.agirliklar)
+        # Hiç ifade eşleşmeyen (nötr) metin taban skoru almaz: 0 / "sakin"
+        skorlar = np.where(guvenler > 0, np.clip(skorlar, 0, 10), 0).astype(int)
+        return skorlar, guvenler
+
+    def ruh_hali(self, skor):
+        for ust_sinir, ruh_hali in RUH_HALI_ESIKLERI:
+            if skor <= ust_sinir:
+                return ruh_hali
+        return RUH_HALI_ESIKLERI[-1][1]
+
+    def skorla(self, metin):
+        """Tek metin için (stres_seviyesi, ruh_hali, güven)"""
+        skorlar, guvenler = self.toplu_skorla([metin])
+        skor = int(skorlar[0])
+        return skor, self.ruh_hali(skor), float(guvenler[0])
+
+
+varsayilan_skorlayici = StresSkorlayici()
+
+
+def yerel_stres_analizi(metin):
+    """LLM çağrısı olmadan (stres_seviyesi, ruh_hali) döndür"""
+    skor, ruh_hali, _ = varsayilan_skorlayici.skorla(metin)
+    return skor, ruh_hali
+
+
+def yerel_stres_analizi_toplu(metinler):
+    """Birden çok metni tek seferde skorla"""
+    skorlar, _ = varsayilan_skorlayici.toplu_skorla(list(metinler))
+    return [(int(s), varsayilan_skorlayici.ruh_hali(int(s))) for s in skorlar]
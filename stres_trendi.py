@@ -0,0 +1,202 @@
+"""Kullanıcı başına stres / ruh hali zaman serisi ve trend grafikleri
+
+Seri, seans başlıklarından (depolama.seans_basligi) kullanıcı başına bir kez
+kurulur, süreç içinde önbellekte tutulur ve her seans kaydında tek satır
+eklenerek güncellenir. Kayan ortalama ve değişim noktaları NumPy ile vektörel
+hesaplanır; grafikler plotly ile çizilir.
+"""
+import threading
+
+from analiz_sonucu import RUH_HALLERI
+from config import (
+    TREND_KAYAN_PENCERE, TREND_DEGISIM_PENCERESI, TREND_DEGISIM_ESIGI,
+    TREND_MAX_NOKTA, TREND_ONBELLEK_BOYUTU
+)
+from onbellek import LRUTTLOnbellek
+from tembel import tembel_modul
+
+np = tembel_modul("numpy")
+pd = tembel_modul("pandas")
+
+# Problem formundaki aciliyet seçenekleri (hafiften acile; seride sıra numarası tutulur)
+ACILIYET_SECENEKLERI = [
+    "Hafif rahatsızlık", "Orta düzey etki", "Ciddi şekilde etkiliyor", "Dayanılmaz, acil yardım lazım"
+]
+# Eski analizlerdeki İngilizce ruh hali değerleri
+ESKI_RUH_HALLERI = {"stable": "sakin", "anxious": "anksiyeteli", "depressed": "depresif"}
+
+
+def ruh_hali_kodu(ruh_hali):
+    ruh_hali = ESKI_RUH_HALLERI.get(ruh_hali, ruh_hali)
+    return RUH_HALLERI.index(ruh_hali) if ruh_hali in RUH_HALLERI else -1
+
+
+def aciliyet_kodu(aciliyet):
+    return ACILIYET_SECENEKLERI.index(aciliyet) if aciliyet in ACILIYET_SECENEKLERI else -1
+
+
+def _birikimli(x):
+    """NaN'sız toplam ve geçerli eleman sayısı için başında 0 olan birikimli diziler"""
+    gecerli = ~np.isnan(x)
+    toplam = np.concatenate(([0.0], np.cumsum(np.where(gecerli, x, 0.0))))
+    sayi = np.concatenate(([0], np.cumsum(gecerli)))
+    return toplam, sayi
+
+
+def kayan_ortalama(x, pencere):
+    """Son `pencere` seansın ortalaması (ilk seanslarda mevcut olanlar, NaN'lar atlanır)"""
+    toplam, sayi = _birikimli(x)
+    son = np.arange(1, len(x) + 1)
+    bas = np.maximum(0, son - pencere)
+    adet = sayi[son] - sayi[bas]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(adet > 0, (toplam[son] - toplam[bas]) / adet, np.nan)
+
+
+def degisim_noktalari(x, pencere, esik):
+    """Önceki ve sonraki `pencere` seansın ortalaması arasındaki farkın `esik`i aştığı
+    ve yerel en büyük olduğu seanslar (yeni dönemin ilk seansı işaretlenir)"""
+    n = len(x)
+    bayraklar = np.zeros(n, dtype=bool)
+    if n < 2 * pencere:
+        return bayraklar
+    toplam, sayi = _birikimli(x)
+    i = np.arange(pencere, n - pencere + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        onceki = (toplam[i] - toplam[i - pencere]) / (sayi[i] - sayi[i - pencere])
+        sonraki = (toplam[i + pencere] - toplam[i]) / (sayi[i + pencere] - sayi[i])
+    fark = np.nan_to_num(np.abs(sonraki - onceki), nan=0.0)
+    sol = np.concatenate(([-np.inf], fark[:-1]))
+    sag = np.concatenate((fark[1:], [-np.inf]))
+    bayraklar[i[(fark >= esik) & (fark >= sol) & (fark > sag)]] = True
+    return bayraklar
+
+
+class StresSerisi:
+    """Tek kullanıcının sütunlu seans serisi (ikiye katlanarak büyüyen NumPy dizileri)"""
+
+    SUTUNLAR = {
+        "zaman": "datetime64[s]",
+        "stres": "float64",
+        "ruh_hali": "int8",
+        "aciliyet": "int8",
+        "tur_sayisi": "int32"
+    }
+
+    def __init__(self, kapasite=64):
+        self._diziler = {ad: np.empty(kapasite, dtype=tur) for ad, tur in self.SUTUNLAR.items()}
+        self.uzunluk = 0
+        self._tablo = None
+        self._kilit = threading.Lock()
+
+    def ekle(self, baslik):
+        """Seans başlığını serinin sonuna ekle (türetilmiş sütunlar yeniden hesaplanır)"""
+        with self._kilit:
+            if self.uzunluk == len(self._diziler["zaman"]):
+                for ad, dizi in self._diziler.items():
+                    yeni = np.empty(len(dizi) * 2, dtype=dizi.dtype)
+                    yeni[:self.uzunluk] = dizi[:self.uzunluk]
+                    self._diziler[ad] = yeni
+            i = self.uzunluk
+            stres = baslik.get("stres_seviyesi")
+            self._diziler["zaman"][i] = np.datetime64(baslik["tarih"][:19], "s")
+            self._diziler["stres"][i] = np.nan if stres is None else float(stres)
+            self._diziler["ruh_hali"][i] = ruh_hali_kodu(baslik.get("ruh_hali", ""))
+            self._diziler["aciliyet"][i] = aciliyet_kodu(baslik.get("aciliyet", ""))
+            self._diziler["tur_sayisi"][i] = baslik.get("tur_sayisi", 0)
+            self.uzunluk += 1
+            self._tablo = None
+
+    def tablo(self):
+        """Zaman indeksli DataFrame: ham sütunlar + kayan ortalama ve değişim bayrakları (önbellekli)"""
+        with self._kilit:
+            if self._tablo is None:
+                sutunlar = {ad: dizi[:self.uzunluk].copy() for ad, dizi in self._diziler.items()}
+                stres = sutunlar["stres"]
+                sutunlar["kayan_ortalama"] = kayan_ortalama(stres, TREND_KAYAN_PENCERE)
+                sutunlar["degisim"] = degisim_noktalari(stres, TREND_DEGISIM_PENCERESI, TREND_DEGISIM_ESIGI)
+                self._tablo = pd.DataFrame(sutunlar).set_index("zaman")
+            return self._tablo
+
+
+class TrendOnbellegi:
+    """Kullanıcı adı -> StresSerisi; seans sayısı depodakiyle uyuşmazsa seri yeniden kurulur"""
+
+    def __init__(self, max_boyut=TREND_ONBELLEK_BOYUTU):
+        self._seriler = LRUTTLOnbellek(max_boyut=max_boyut)
+
+    def seri_al(self, depo, kullanici_adi, seans_sayisi):
+        seri = self._seriler.getir(kullanici_adi)
+        if seri is not None and seri.uzunluk == seans_sayisi:
+            return seri
+        # Başka bir süreç seans eklemiş olabilir: başlıklardan baştan kur
+        seri = StresSerisi(kapasite=max(64, seans_sayisi))
+        for baslik in reversed(depo.seans_basliklari_getir(kullanici_adi, 0, seans_sayisi)):
+            seri.ekle(baslik)
+        self._seriler.koy(kullanici_adi, seri)
+        return seri
+
+    def seans_eklendi(self, kullanici_adi, baslik):
+        """seans_kaydet sonrası: önbellekteki seriye tek satır ekle"""
+        seri = self._seriler.getir(kullanici_adi)
+        if seri is not None:
+            seri.ekle(baslik)
+
+
+def grafik_tablosu(tablo, max_nokta=TREND_MAX_NOKTA):
+    """Çok uzun serileri haftalık ortalamaya indirge (grafik çizim süresi sınırlı kalsın)"""
+    if len(tablo) <= max_nokta:
+        return tablo
+    haftalik = tablo.resample("W").agg({
+        "stres": "mean",
+        "kayan_ortalama": "mean",
+        "degisim": "max",
+        "ruh_hali": "last",
+        "aciliyet": "max",
+        "tur_sayisi": "mean"
+    })
+    return haftalik.dropna(subset=["stres"])
+
+
+def stres_grafigi(tablo):
+    import plotly.graph_objects as go
+
+    aciliyet_adlari = np.array(ACILIYET_SECENEKLERI + ["-"])[tablo["aciliyet"].astype(int).to_numpy()]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=tablo.index, y=tablo["stres"], mode="markers", name="Stres",
+        marker=dict(color=tablo["aciliyet"], colorscale="YlOrRd", cmin=0, cmax=len(ACILIYET_SECENEKLERI) - 1, size=8),
+        customdata=np.column_stack([aciliyet_adlari, tablo["tur_sayisi"].round().astype(int)]),
+        hovertemplate="%{x|%d.%m.%Y}<br>Stres: %{y:.1f}/10<br>Aciliyet: %{customdata[0]}"
+                      "<br>Etkileşim: %{customdata[1]}<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=tablo.index, y=tablo["kayan_ortalama"], mode="lines",
+        name=f"Son {TREND_KAYAN_PENCERE} seans ortalaması"
+    ))
+    degisimler = tablo[tablo["degisim"].astype(bool)]
+    if len(degisimler):
+        fig.add_trace(go.Scatter(
+            x=degisimler.index, y=degisimler["kayan_ortalama"], mode="markers", name="Belirgin değişim",
+            marker=dict(symbol="diamond-open", size=16, line=dict(width=2))
+        ))
+    fig.update_layout(yaxis=dict(range=[-0.5, 10.5], title="Stres"), height=350, margin=dict(t=30, b=30))
+    return fig
+
+
+def ruh_hali_grafigi(tablo):
+    import plotly.graph_objects as go
+
+    tablo = tablo[tablo["ruh_hali"] >= 0]
+    fig = go.Figure(go.Scatter(
+        x=tablo.index, y=np.array(RUH_HALLERI)[tablo["ruh_hali"].astype(int).to_numpy()],
+        mode="markers+lines", line=dict(width=1), name="Ruh hali"
+    ))
+    fig.update_layout(
+        yaxis=dict(categoryorder="array", categoryarray=RUH_HALLERI, title="Ruh hali"),
+        height=280, margin=dict(t=30, b=30)
+    )
+    return fig
+
+
+trend_onbellegi = TrendOnbellegi()
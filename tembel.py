@@ -0,0 +1,40 @@
+"""Ağır bağımlılıklar için tembel import
+
+    np = tembel_modul("numpy")
+
+np ilk öznitelik erişiminde (np.array gibi) gerçekten import edilir. Böylece
+openai, numpy, pandas gibi paketler süreç açılışında değil ilk kullanıldıkları
+anda yüklenir; giriş/profil sayfası bunları hiç yüklemeden açılabilir.
+"""
+import importlib
+import threading
+
+
+class TembelModul:
+    """İlk öznitelik erişiminde modülü yükleyen vekil (thread-safe)"""
+
+    def __init__(self, ad):
+        self._ad = ad
+        self._modul = None
+        self._kilit = threading.Lock()
+
+    def _yukle(self):
+        if self._modul is None:
+            with self._kilit:
+                if self._modul is None:
+                    self._modul = importlib.import_module(self._ad)
+        return self._modul
+
+    def __getattr__(self, oznitelik):
+        deger = getattr(self._yukle(), oznitelik)
+        # Sonraki erişimler __getattr__'a hiç düşmez
+        setattr(self, oznitelik, deger)
+        return deger
+
+    def __repr__(self):
+        durum = "yüklendi" if self._modul is not None else "yüklenmedi"
+        return f"<tembel modül {self._ad} ({durum})>"
+
+
+def tembel_modul(ad):
+    return TembelModul(ad)
@@ -0,0 +1,24 @@
+from stres_skorlayici import StresSkorlayici, yerel_stres_analizi, yerel_stres_analizi_toplu
+
+
+def test_notr_cumle_sakin():
+    assert yerel_stres_analizi("Bugün markete gidip ekmek aldım, sonra eve döndüm.") == (0, "sakin")
+
+
+def test_notr_cumle_toplu_skorda_da_sakin():
+    sonuclar = yerel_stres_analizi_toplu(["Hava bugün bulutlu.", "Panik atak geçiriyorum, nefes alamıyorum"])
+    assert sonuclar[0] == (0, "sakin")
+    assert sonuclar[1][0] >= 6
+
+
+def test_stresli_cumle_yuksek_guven():
+    skor, ruh_hali, guven = StresSkorlayici().skorla("Çok gerginim, uyuyamıyorum ve sürekli endişeliyim")
+    assert skor > 0
+    assert ruh_hali != "sakin"
+    assert guven > 0
+
+
+def test_kelime_onbellegi_sinirli():
+    skorlayici = StresSkorlayici(kelime_onbellek_boyutu=10)
+    skorlayici.skorla(" ".join(f"kelime{i}" for i in range(100)))
+    assert skorlayici._kelime_onbellegi.istatistik()["boyut"] <= 10
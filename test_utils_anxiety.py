@@ -0,0 +1,42 @@
+import threading
+import time
+
+import numpy as np
+
+import utils_anxiety
+from utils_anxiety import KARSILAMA_CUMLELERI, cumlelere_ayir, parcali_transkripsiyon_akisi
+
+
+def test_karsilama_kisaltmada_bolunmez():
+    cumleler, kalan = cumlelere_ayir(KARSILAMA_CUMLELERI[0] + " ")
+    assert cumleler == ["Merhaba, ben Dr. Marcus Reed.", "Bugün sizi dinlemek için buradayım."]
+    assert kalan == ""
+
+
+def test_kisaltma_cumle_basinda_ve_ortasinda():
+    cumleler, kalan = cumlelere_ayir("Uyku, iştah vb. konularda sorun var. Prof. Dr. Ayşe Kaya da öyle dedi. Tam")
+    assert cumleler == ["Uyku, iştah vb. konularda sorun var.", "Prof. Dr. Ayşe Kaya da öyle dedi."]
+    assert kalan == "Tam"
+
+
+def test_ara_metin_sadece_bastan_biten_parcalari_icerir(monkeypatch):
+    # 3 parça, bitiş sırası 1, 0, 2: parça 1 tek başına hiç gösterilmemeli
+    # Parçalar uzunluklarından tanınır: 10, 20, 30 örnek
+    araliklar = [(0, 10), (10, 30), (30, 60)]
+    ornekler = np.zeros(60, dtype=np.float32)
+    bitti = [threading.Event() for _ in araliklar]
+    bekledigi = {0: 1, 2: 0}
+
+    def whisper_cagir(ses_verisi):
+        parca_ornekleri, _ = utils_anxiety.wav_oku(ses_verisi)
+        sira = len(parca_ornekleri) // 10 - 1
+        if sira in bekledigi:
+            bitti[bekledigi[sira]].wait(5)
+            time.sleep(0.05)
+        bitti[sira].set()
+        return f"p{sira}"
+
+    monkeypatch.setattr(utils_anxiety, "sessizlikten_bol", lambda ornekler, hiz: araliklar)
+    monkeypatch.setattr(utils_anxiety, "whisper_cagir", whisper_cagir)
+    ara_metinler = list(parcali_transkripsiyon_akisi(ornekler, utils_anxiety.SES_HEDEF_HIZ, isci_sayisi=3))
+    assert ara_metinler == ["p0 p1", "p0 p1 p2"]
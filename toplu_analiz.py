@@ -0,0 +1,266 @@
+"""Kayıtlı seansların toplu stres yeniden analizi
+
+Kullanım:
+    python toplu_analiz.py --kok kullanici_verileri --geri-yaz
+    python toplu_analiz.py --metin-dosyasi metinler.txt --cikti sonuclar.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import utils_anxiety
+from depolama import DosyaDepo
+from stres_skorlayici import yerel_stres_analizi
+from tembel import tembel_modul
+
+openai = tembel_modul("openai")
+
+
+class HizSinirlayici:
+    """Dakikadaki istek sayısını sınırlayan thread-safe sınırlayıcı"""
+
+    def __init__(self, dakikada_istek):
+        self.aralik = 60.0 / dakikada_istek if dakikada_istek else 0.0
+        self._sonraki = time.monotonic()
+        self._kilit = threading.Lock()
+
+    def bekle(self):
+        with self._kilit:
+            simdi = time.monotonic()
+            bekleme = max(0.0, self._sonraki - simdi)
+            self._sonraki = max(simdi, self._sonraki) + self.aralik
+        if bekleme:
+            time.sleep(bekleme)
+
+
+def tekrar_deneyerek(fonk, metin, sinirlayici, deneme=3, bekleme=1.0):
+    """Geçici hatalarda üstel bekleme + jitter ile tekrar dene
+
+    API hataları (429, 5xx, bağlantı) paylaşılan istemcinin transport'unda zaten
+    tekrar denendiği için burada yeniden denenmez; sadece çözümlenemeyen
+    cevap gibi hatalar tekrarlanır.
+    """
+    for sira in range(deneme):
+        sinirlayici.bekle()
+        try:
+            return fonk(metin)
+        except Exception as e:
+            if sira == deneme - 1 or isinstance(e, openai.APIError):
+                raise
+            gecikme = bekleme * (2 ** sira) * (0.5 + random.random())
+            print(f"⚠️ Tekrar deneniyor ({sira + 1}/{deneme}): {e}")
+            time.sleep(gecikme)
+
+
+def kontrol_noktasi_yukle(dosya_yolu, surum):
+    """Daha önce tamamlanmış anahtarları yükle (farklı prompt sürümü yok sayılır)"""
+    tamamlanan = {}
+    if not dosya_yolu or not os.path.exists(dosya_yolu):
+        return tamamlanan
+    with open(dosya_yolu, "r", encoding="utf-8") as f:
+        for satir in f:
+            try:
+                kayit = json.loads(satir)
+            except json.JSONDecodeError:
+                continue
+            if kayit.get("surum") == surum:
+                tamamlanan[kayit["anahtar"]] = (kayit["stres_seviyesi"], kayit["ruh_hali"])
+    return tamamlanan
+
+
+def toplu_stres_analizi(isler, mod="llm", isci_sayisi=8, dakikada_istek=300, deneme=3, kontrol_noktasi=None,
+                        hata_bildir=None):
+    """(anahtar, metin) çiftlerini paralel analiz et, bitenleri (anahtar, sonuç) olarak üret
+
+    Sonuçlar tamamlanma sırasıyla üretilir ve kontrol noktası dosyasına anında
+    eklenir; aynı dosyayla tekrar çalıştırıldığında bitmiş anahtarlar atlanır.
+    Analiz edilemeyen anahtarlar üretilmez, verilmişse hata_bildir(anahtar, hata) çağrılır.
+    """
+    surum = utils_anxiety.STRES_PROMPT_SURUMU if mod != "yerel" else "yerel"
+    fonk = yerel_stres_analizi if mod == "yerel" else utils_anxiety.stres_analizi_llm
+    tamamlanan = kontrol_noktasi_yukle(kontrol_noktasi, surum)
+    sinirlayici = HizSinirlayici(dakikada_istek if mod != "yerel" else 0)
+    kayit_dosyasi = open(kontrol_noktasi, "a", encoding="utf-8") if kontrol_noktasi else None
+
+    def kaydet(anahtar, sonuc):
+        if kayit_dosyasi:
+            kayit_dosyasi.write(json.dumps({
+                "anahtar": anahtar,
+                "stres_seviyesi": sonuc[0],
+                "ruh_hali": sonuc[1],
+                "surum": surum
+            }, ensure_ascii=False) + "\n")
+            kayit_dosyasi.flush()
+
+    try:
+        with ThreadPoolExecutor(max_workers=isci_sayisi) as havuz:
+            bekleyenler = {}
+            for anahtar, metin in isler:
+                if anahtar in tamamlanan:
+                    yield anahtar, tamamlanan[anahtar]
+                    continue
+
+                gorev = havuz.submit(tekrar_deneyerek, fonk, metin, sinirlayici, deneme)
+                bekleyenler[gorev] = anahtar
+
+                # Bellekte sınırlı sayıda iş tut
+                if len(bekleyenler) >= isci_sayisi * 2:
+                    biten, _ = wait(bekleyenler, return_when=FIRST_COMPLETED)
+                    for biten_gorev in biten:
+                        yield from gorev_sonucu(biten_gorev, bekleyenler.pop(biten_gorev), kaydet, hata_bildir)
+
+            for gorev in list(bekleyenler):
+                yield from gorev_sonucu(gorev, bekleyenler.pop(gorev), kaydet, hata_bildir)
+    finally:
+        if kayit_dosyasi:
+            kayit_dosyasi.close()
+
+
+def gorev_sonucu(gorev, anahtar, kaydet, hata_bildir=None):
+    try:
+        sonuc = tuple(gorev.result())
+    except Exception as e:
+        # Kontrol noktasına yazılmaz, sonraki çalıştırmada tekrar denenir
+        print(f"❌ {anahtar} analiz edilemedi: {e}")
+        if hata_bildir:
+            hata_bildir(anahtar, e)
+        return
+    kaydet(anahtar, sonuc)
+    yield anahtar, sonuc
+
+
+def kullanici_isleri(depo):
+    """Depodaki tüm danışan konuşmalarını (anahtar, metin) olarak üret"""
+    for kullanici_adi in depo.kullanicilari_listele():
+        for seans_no, seans in enumerate(depo.seanslari_getir(kullanici_adi)):
+            for tur_no, konusma in enumerate(seans.get("konusmalar", [])):
+                yield f"{kullanici_adi}/{seans_no}/{tur_no}", konusma["kullanici"]
+
+
+def kullanici_dosyalarini_skorla(depo, geri_yaz=False, **ayarlar):
+    """Depodaki tüm seansları yeniden skorla; kullanıcının işleri bitince dosyasına geri yaz
+
+    (analiz edilen metin sayısı, analiz edilemeyen konuşması olan kullanıcılar) döndürür.
+    Hatalı kullanıcıların başarılı skorları yine yazılır; kalanlar kontrol noktası
+    sayesinde sonraki çalıştırmada tekrar denenir.
+    """
+    # İşler tek geçişte üretilir: kullanıcının tüm işleri kuyruğa alındıktan ve
+    # hepsi (başarılı ya da hatalı) bittikten sonra dosyası yeniden yazılır
+    kalan = defaultdict(int)
+    kuyruga_alinan = set()
+    sonuclar = defaultdict(dict)
+    hatali_kullanicilar = set()
+
+    def bittiyse_yaz(kullanici_adi):
+        if kullanici_adi not in kuyruga_alinan or kalan[kullanici_adi]:
+            return
+        kuyruga_alinan.discard(kullanici_adi)
+        kalan.pop(kullanici_adi, None)
+        basarili = sonuclar.pop(kullanici_adi, None)
+        if geri_yaz and basarili:
+            stresleri_geri_yaz(depo, kullanici_adi, basarili)
+
+    def isler():
+        onceki = None
+        for anahtar, metin in kullanici_isleri(depo):
+            kullanici_adi = anahtar.rsplit("/", 2)[0]
+            if kullanici_adi != onceki:
+                if onceki is not None:
+                    kuyruga_alinan.add(onceki)
+                    bittiyse_yaz(onceki)
+                onceki = kullanici_adi
+            kalan[kullanici_adi] += 1
+            yield anahtar, metin
+        if onceki is not None:
+            kuyruga_alinan.add(onceki)
+            bittiyse_yaz(onceki)
+
+    def hata_bildir(anahtar, _):
+        kullanici_adi = anahtar.rsplit("/", 2)[0]
+        hatali_kullanicilar.add(kullanici_adi)
+        kalan[kullanici_adi] -= 1
+        bittiyse_yaz(kullanici_adi)
+
+    toplam = 0
+    for anahtar, sonuc in toplu_stres_analizi(isler(), hata_bildir=hata_bildir, **ayarlar):
+        kullanici_adi, seans_no, tur_no = anahtar.rsplit("/", 2)
+        sonuclar[kullanici_adi][(int(seans_no), int(tur_no))] = sonuc
+        kalan[kullanici_adi] -= 1
+        toplam += 1
+        bittiyse_yaz(kullanici_adi)
+    return toplam, sorted(hatali_kullanicilar)
+
+
+def stresleri_geri_yaz(depo, kullanici_adi, sonuclar):
+    """Skorları konuşma kayıtlarına ekle; okuma ve yazma depo kilidi altında yapılır"""
+    def guncelle(seanslar):
+        guncellenen = 0
+        for (seans_no, tur_no), (stres_seviyesi, ruh_hali) in sonuclar.items():
+            try:
+                konusma = seanslar[seans_no]["konusmalar"][tur_no]
+            except (IndexError, KeyError):
+                # Analizden sonra seans dosyası başka bir işlemle değişmiş
+                continue
+            konusma["stres"] = {
+                "stres_seviyesi": stres_seviyesi,
+                "ruh_hali": ruh_hali
+            }
+            guncellenen += 1
+        return guncellenen
+
+    guncellenen = depo.seanslari_guncelle(kullanici_adi, guncelle)
+    print(f"💾 {kullanici_adi}: {guncellenen} konuşma güncellendi")
+
+
+def metin_dosyasi_isleri(dosya_yolu):
+    with open(dosya_yolu, "r", encoding="utf-8") as f:
+        for satir_no, satir in enumerate(f):
+            if satir.strip():
+                yield str(satir_no), satir.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toplu stres yeniden analizi")
+    parser.add_argument("--kok", default=None, help="Dosya deposu kök klasörü")
+    parser.add_argument("--metin-dosyasi", default=None, help="Satır başına bir metin içeren dosya")
+    parser.add_argument("--cikti", default="toplu_stres_kontrol.jsonl", help="Kontrol noktası / sonuç dosyası")
+    parser.add_argument("--mod", default="llm", choices=["llm", "yerel"])
+    parser.add_argument("--isci", type=int, default=8)
+    parser.add_argument("--dakikada", type=int, default=300, help="Dakikadaki en fazla istek")
+    parser.add_argument("--deneme", type=int, default=3)
+    parser.add_argument("--geri-yaz", action="store_true", help="Skorları seans kayıtlarına yaz")
+    args = parser.parse_args()
+
+    if args.mod == "llm" and not utils_anxiety.openai_baslat():
+        print("❌ OpenAI API anahtarı bulunamadı")
+        return 1
+
+    ayarlar = {
+        "mod": args.mod,
+        "isci_sayisi": args.isci,
+        "dakikada_istek": args.dakikada,
+        "deneme": args.deneme,
+        "kontrol_noktasi": args.cikti
+    }
+
+    baslangic = time.time()
+    if args.metin_dosyasi:
+        toplam = sum(1 for _ in toplu_stres_analizi(metin_dosyasi_isleri(args.metin_dosyasi), **ayarlar))
+    else:
+        depo = DosyaDepo(args.kok) if args.kok else utils_anxiety.kullanici_deposu
+        toplam, hatali_kullanicilar = kullanici_dosyalarini_skorla(depo, geri_yaz=args.geri_yaz, **ayarlar)
+        if hatali_kullanicilar:
+            print(f"⚠️ {len(hatali_kullanicilar)} kullanıcının bazı konuşmaları analiz edilemedi "
+                  f"(tekrar çalıştırınca denenir): {', '.join(hatali_kullanicilar)}")
+
+    print(f"✅ {toplam} metin analiz edildi ({time.time() - baslangic:.1f} sn)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,13 @@
-import os
-import json
-import time
+import asyncio
+import contextvars
 import threading
+import atexit
+import hashlib
+import functools
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-import numpy as np
 import io
 import wave
 from dotenv import load_dotenv
@@ -11,85 +15,315 @@ from dotenv import load_dotenv
 # .env dosyasını yükle
 load_dotenv()
 
-# OpenAI v1.0+ import
-from openai import OpenAI
-import streamlit as st
+from config import (
+    STRES_ONBELLEK_BOYUTU, STRES_ONBELLEK_TTL, STRES_ONBELLEK_DOSYASI,
+    STRES_ANALIZ_MODU, YEREL_GUVEN_ESIGI, ANALIZ_TOKEN_BUTCESI,
+    TTS_PARALEL_ISTEK, TTS_PARCA_BAYT, TTS_EN_KISA_CUMLE,
+    SES_ON_ISLEME, SES_HEDEF_HIZ, SESSIZLIK_ESIGI, SESSIZLIK_PAYI_MS,
+    SES_PARCALAMA_ESIGI_SN, SES_PARCA_MAX_SN, SES_PARCA_SESSIZLIK_MS, SES_TRANSKRIPSIYON_ISCI
+)
+from analiz_sonucu import ANALIZ_SISTEM_PROMPTU, ANALIZ_YANIT_BICIMI, analiz_coz, analiz_sonucu, yanit_icerigi
+from depolama import DosyaDepo
+from olcum import aktif_asama, cagri_olc
+from onbellek import LRUTTLOnbellek, turkce_normalize
+from ses_calar import varsayilan_calar
+from ses_onbellek import SesOnbellegi, ses_anahtari
+from openai_istemci import api_anahtari_bul, openai_istemci_al, async_openai_istemci_al, arka_planda_calistir
+from ozetleyici import KayanOzet
+from stres_skorlayici import varsayilan_skorlayici, yerel_stres_analizi
+from tembel import tembel_modul
+from zamanlayici import aciliyet_onceligi, aktif_oncelik, oncelik, oncelikle_calistir
+
+np = tembel_modul("numpy")
 
 # Konfigürasyon
 class Config:
-    def __init__(self):
-        self.OPENAI_API_KEY = (
-            os.getenv("OPENAI_API_KEY") or 
-            st.secrets.get("OPENAI_API_KEY", None) if hasattr(st, 'secrets') else None
-        )
+    @property
+    def OPENAI_API_KEY(self):
+        # st.secrets import anında değil ilk erişimde okunur (secrets.toml yoksa None)
+        return api_anahtari_bul()
 
 config = Config()
 
 # Global değişkenler
 openai_client = None
+kullanici_deposu = DosyaDepo()
+
+# TTS önbelleği ilk seslendirmede açılır (kurulumu klasörü oluşturup diski tarar)
+_ses_onbellegi_kilidi = threading.Lock()
+_ses_onbellegi = None
+
+def ses_onbellegi_al():
+    """Paylaşılan TTS ses önbelleğini döndür (yoksa oluştur)"""
+    global _ses_onbellegi
+    if _ses_onbellegi is not None:
+        return _ses_onbellegi
+    with _ses_onbellegi_kilidi:
+        if _ses_onbellegi is None:
+            _ses_onbellegi = SesOnbellegi()
+    return _ses_onbellegi
+
+def ses_onbellege_yaz(anahtar, veri):
+    """Sesi önbelleğe yaz; yazılamazsa (disk dolu vb.) sadece logla, ses yine kullanılır"""
+    try:
+        ses_onbellegi_al().koy(anahtar, veri)
+    except Exception as e:
+        print(f"⚠️ TTS önbelleğine yazılamadı: {e}")
+
+# Hazır ifadeler (TTS önbelleği bunları deploy sırasında önceden seslendirir)
+KARSILAMA_CUMLELERI = [
+    "Merhaba, ben Dr. Marcus Reed. Bugün sizi dinlemek için buradayım.",
+    "Hoş geldiniz. Kendinizi rahat hissettiğiniz bir şekilde anlatmaya başlayabilirsiniz."
+]
+VARSAYILAN_CEVAP = "Size destek olmak için buradayım. Nasıl yardımcı olabilirim?"
+YEDEK_CEVAP = "Anlıyorum... Bu durum sizi nasıl etkiliyor? Biraz daha açabilir misiniz?"
+HATA_DEGERLENDIRMESI = "Bu seansda belirlediğimiz temel problemleri ele almaya başladık. Devam etmeniz önerilir."
+HATA_ONERILERI = [
+    "Günlük stresi azaltma tekniklerini uygulayın",
+    "Profesyonel destek almayı düşünün",
+    "Kendinize zaman ayırın"
+]
+HAZIR_IFADELER = (
+    KARSILAMA_CUMLELERI + [VARSAYILAN_CEVAP, YEDEK_CEVAP, HATA_DEGERLENDIRMESI]
+    + HATA_ONERILERI
+)
+
+# Stres promptu değişince eski önbellek kayıtları geçersiz olsun diye sürüm anahtara eklenir
+STRES_PROMPT_SURUMU = "v2"
+stres_onbellegi = LRUTTLOnbellek(
+    max_boyut=STRES_ONBELLEK_BOYUTU,
+    ttl=STRES_ONBELLEK_TTL,
+    dosya_yolu=STRES_ONBELLEK_DOSYASI
+)
+if STRES_ONBELLEK_DOSYASI:
+    atexit.register(stres_onbellegi.diske_kaydet)
 
 def openai_baslat():
-    """OpenAI client'ı başlat"""
+    """Paylaşılan OpenAI client'ı al"""
     global openai_client
-    if config.OPENAI_API_KEY:
-        try:
-            openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
-            print("✅ OpenAI client başlatıldı")
-            return True
-        except Exception as e:
-            print(f"❌ OpenAI client hatası: {e}")
-            return False
+    try:
+        openai_client = openai_istemci_al()
+    except Exception as e:
+        print(f"❌ OpenAI client hatası: {e}")
+        return False
+    if openai_client:
+        print("✅ OpenAI client hazır")
+        return True
     return False
 
 def kullanici_veri_yukle(kullanici_adi):
-    """Kullanıcı verisini JSON'dan yükle"""
+    """Kullanıcı verisini dosya deposundan yükle"""
     try:
-        dosya_yolu = f"kullanici_verileri/{kullanici_adi}.json"
-        if os.path.exists(dosya_yolu):
-            with open(dosya_yolu, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return None
+        veri = kullanici_deposu.kullanici_getir(kullanici_adi)
+        if veri is None:
+            return None
+        veri["seanslar"] = kullanici_deposu.seanslari_getir(kullanici_adi)
+        return veri
     except Exception as e:
         print(f"❌ Kullanıcı veri yükleme hatası: {e}")
         return None
 
 def kullanici_veri_kaydet(kullanici_adi, veri):
-    """Kullanıcı verisini JSON'a kaydet"""
+    """Kullanıcı verisini dosya deposuna kaydet (sadece yeni seanslar eklenir)"""
     try:
-        dosya_yolu = f"kullanici_verileri/{kullanici_adi}.json"
-        with open(dosya_yolu, 'w', encoding='utf-8') as f:
-            json.dump(veri, f, ensure_ascii=False, indent=2)
+        kayitli = kullanici_deposu.seans_sayisi(kullanici_adi)
+        for seans in veri.get("seanslar", [])[kayitli:]:
+            kullanici_deposu.seans_ekle(kullanici_adi, seans)
+        kullanici_deposu.kullanici_kaydet(kullanici_adi, veri)
         return True
     except Exception as e:
         print(f"❌ Kullanıcı veri kaydetme hatası: {e}")
         return False
 
-def sesi_metne_cevir_openai(ses_verisi):
-    """OpenAI Whisper ile ses-metin çevirisi"""
+def wav_oku(ses_verisi):
+    """WAV baytlarını mono float32 örneklere çevir, (örnekler, örnekleme hızı) döndür
+
+    Sadece 16-bit PCM desteklenir; başka biçimlerde ValueError fırlatılır.
+    """
+    with wave.open(io.BytesIO(ses_verisi), "rb") as w:
+        kanal = w.getnchannels()
+        genislik = w.getsampwidth()
+        hiz = w.getframerate()
+        ham = w.readframes(w.getnframes())
+    if genislik != 2:
+        raise ValueError(f"Desteklenmeyen örnek genişliği: {genislik * 8} bit")
+    ornekler = np.frombuffer(ham, dtype="<i2").astype(np.float32)
+    if kanal > 1:
+        ornekler = ornekler[:len(ornekler) // kanal * kanal].reshape(-1, kanal).mean(axis=1)
+    return ornekler, hiz
+
+def wav_yaz(ornekler, hiz):
+    """Mono float32 örnekleri 16-bit PCM WAV baytlarına çevir"""
+    tampon = io.BytesIO()
+    with wave.open(tampon, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(hiz)
+        w.writeframes(np.clip(ornekler, -32768, 32767).astype("<i2").tobytes())
+    return tampon.getvalue()
+
+def yeniden_ornekle(ornekler, hiz, hedef_hiz=SES_HEDEF_HIZ):
+    """Doğrusal aradeğerleme ile örnekleme hızını değiştir"""
+    if hiz == hedef_hiz or len(ornekler) == 0:
+        return ornekler
+    if hiz % hedef_hiz == 0:
+        # Tam katlarda (48k/32k -> 16k) blok ortalaması hem hızlı hem örtüşmeye karşı daha iyi
+        oran = hiz // hedef_hiz
+        return ornekler[:len(ornekler) // oran * oran].reshape(-1, oran).mean(axis=1)
+    hedef_uzunluk = int(len(ornekler) * hedef_hiz / hiz)
+    zamanlar = np.linspace(0, len(ornekler) - 1, hedef_uzunluk)
+    return np.interp(zamanlar, np.arange(len(ornekler)), ornekler).astype(np.float32)
+
+def cerceve_enerjileri(ornekler, hiz, cerceve_ms=20):
+    """20 ms'lik çerçevelerin RMS enerjisi"""
+    cerceve = max(1, hiz * cerceve_ms // 1000)
+    adet = len(ornekler) // cerceve
+    if adet == 0:
+        return np.zeros(0, dtype=np.float32), cerceve
+    bloklar = ornekler[:adet * cerceve].reshape(adet, cerceve)
+    return np.sqrt((bloklar ** 2).mean(axis=1)), cerceve
+
+def sessizlik_kirp(ornekler, hiz, esik=SESSIZLIK_ESIGI, pay_ms=SESSIZLIK_PAYI_MS):
+    """Baştaki ve sondaki sessizliği (küçük bir pay bırakarak) kırp"""
+    enerjiler, cerceve = cerceve_enerjileri(ornekler, hiz)
+    konusma = np.flatnonzero(enerjiler > esik)
+    if len(konusma) == 0:
+        return ornekler
+    pay = hiz * pay_ms // 1000
+    bas = max(0, konusma[0] * cerceve - pay)
+    son = min(len(ornekler), (konusma[-1] + 1) * cerceve + pay)
+    return ornekler[bas:son]
+
+def ses_on_isle(ses_verisi):
+    """Whisper öncesi: mono, 16 kHz, baş/son sessizlik kırpılmış WAV (çözülemezse olduğu gibi)"""
+    try:
+        ornekler, hiz = wav_oku(ses_verisi)
+    except (wave.Error, EOFError, ValueError) as e:
+        print(f"⚠️ Ses ön işleme atlandı: {e or 'WAV okunamadı'}")
+        return ses_verisi
+    ornekler = sessizlik_kirp(yeniden_ornekle(ornekler, hiz), SES_HEDEF_HIZ)
+    return wav_yaz(ornekler, SES_HEDEF_HIZ)
+
+def sessizlikten_bol(ornekler, hiz, esik=SESSIZLIK_ESIGI, sessizlik_ms=SES_PARCA_SESSIZLIK_MS,
+                     max_sn=SES_PARCA_MAX_SN):
+    """Enerji tabanlı ses etkinliği tespitiyle sesi duraklardan parçalara böl
+
+    Parçalar en fazla max_sn saniyedir ve mümkün olduğunca en az sessizlik_ms
+    süren duraklamaların ortasından kesilir; tamamen sessiz parçalar atılır.
+    (başlangıç, bitiş) örnek aralıklarının listesini döndürür.
+    """
+    enerjiler, cerceve = cerceve_enerjileri(ornekler, hiz)
+    konusma = enerjiler > esik
+    if not konusma.any():
+        return []
+
+    # En az sessizlik_ms süren sessiz bölgelerin ortaları kesme noktası adayıdır
+    en_az_cerceve = max(1, sessizlik_ms // 20)
+    kesme_noktalari = []
+    sessiz_bas = None
+    for i, konusuyor in enumerate(konusma):
+        if not konusuyor and sessiz_bas is None:
+            sessiz_bas = i
+        elif konusuyor and sessiz_bas is not None:
+            if i - sessiz_bas >= en_az_cerceve:
+                kesme_noktalari.append((sessiz_bas + i) // 2 * cerceve)
+            sessiz_bas = None
+
+    max_ornek = int(max_sn * hiz)
+    araliklar = []
+    bas = 0
+    while len(ornekler) - bas > max_ornek:
+        uygun = [k for k in kesme_noktalari if bas < k <= bas + max_ornek]
+        # Uygun durak yoksa en uzun parça sınırından sert kesilir
+        son = uygun[-1] if uygun else bas + max_ornek
+        araliklar.append((bas, son))
+        bas = son
+    araliklar.append((bas, len(ornekler)))
+
+    return [
+        (bas, son) for bas, son in araliklar
+        if konusma[bas // cerceve:(son + cerceve - 1) // cerceve].any()
+    ]
+
+def whisper_cagir(ses_verisi):
+    """Tek WAV parçasını Whisper'a gönder, metni döndür"""
+    with cagri_olc("transkripsiyon", "whisper-1"):
+        transcript = openai_client.audio.transcriptions.create(
+            model="whisper-1",
+            file=("ses.wav", ses_verisi, "audio/wav"),
+            language="tr"
+        )
+    return transcript.text.strip()
+
+def parcali_transkripsiyon_akisi(ornekler, hiz, isci_sayisi=SES_TRANSKRIPSIYON_ISCI):
+    """Uzun kaydı (wav_oku örnekleri) duraklardan bölüp parçaları paralel çevir, ara metni parçalar bittikçe üret
+
+    Her adımda baştan itibaren kesintisiz biten parçaların birleştirilmiş metni
+    üretilir (ortadaki bir parça önce biterse, öncekiler bitene kadar gösterilmez);
+    son üretilen değer tam metindir. Bir parça çevrilemezse (istek transport'ta
+    zaten tekrar denenmiştir) kalan parçalar iptal edilir ve hata yukarı iletilir:
+    eksik parçalı bir metin tam metin gibi döndürülmez.
+    """
+    ornekler = yeniden_ornekle(ornekler, hiz)
+    araliklar = sessizlikten_bol(ornekler, SES_HEDEF_HIZ)
+    if not araliklar:
+        return
+    print(f"✂️ Kayıt {len(araliklar)} parçaya bölündü")
+
+    metinler = [None] * len(araliklar)
+    hazir = 0
+    with ThreadPoolExecutor(max_workers=isci_sayisi, thread_name_prefix="whisper") as havuz:
+        gorevler = {
+            havuz.submit(contextvars.copy_context().run, whisper_cagir, wav_yaz(ornekler[bas:son], SES_HEDEF_HIZ)): sira
+            for sira, (bas, son) in enumerate(araliklar)
+        }
+        for gorev in as_completed(gorevler):
+            sira = gorevler[gorev]
+            try:
+                metinler[sira] = gorev.result()
+            except Exception as e:
+                print(f"❌ Parça {sira + 1}/{len(araliklar)} transkripsiyon hatası: {e}")
+                for bekleyen in gorevler:
+                    bekleyen.cancel()
+                raise
+            if sira != hazir:
+                continue
+            while hazir < len(metinler) and metinler[hazir] is not None:
+                hazir += 1
+            yield " ".join(m for m in metinler[:hazir] if m)
+
+def sesi_metne_cevir_openai(ses_verisi, on_isle=SES_ON_ISLEME, parcali_esik_sn=SES_PARCALAMA_ESIGI_SN):
+    """OpenAI Whisper ile ses-metin çevirisi (geçici dosya olmadan, bellekten)
+
+    parcali_esik_sn saniyeden uzun WAV kayıtları duraklardan bölünüp paralel çevrilir.
+    """
     try:
         if not openai_client:
             print("❌ OpenAI client yok")
             return "API istemcisi yapılandırılmamış"
         
-        gecici_dosya = "temp_audio.wav"
-        with open(gecici_dosya, 'wb') as f:
-            f.write(ses_verisi)
-        
-        print(f"📁 Whisper için dosya hazır: {len(ses_verisi)} byte")
+        if parcali_esik_sn and ses_suresi(ses_verisi) > parcali_esik_sn:
+            try:
+                ornekler, hiz = wav_oku(ses_verisi)
+            except (wave.Error, EOFError, ValueError) as e:
+                # Çözülemeyen WAV (ör. 8-bit) bölünmeden tek parça gönderilir
+                print(f"⚠️ Parçalı transkripsiyon atlandı: {e or 'WAV okunamadı'}")
+            else:
+                result = ""
+                for result in parcali_transkripsiyon_akisi(ornekler, hiz):
+                    pass
+                print(f"🎯 Whisper sonucu (parçalı): '{result}'")
+                return result
         
-        with open(gecici_dosya, 'rb') as audio_file:
-            transcript = openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="tr"
-            )
+        if on_isle:
+            onceki_boyut = len(ses_verisi)
+            ses_verisi = ses_on_isle(ses_verisi)
+            print(f"📁 Whisper için ses hazır: {onceki_boyut} -> {len(ses_verisi)} byte")
+        else:
+            print(f"📁 Whisper için ses hazır: {len(ses_verisi)} byte")
         
-        try:
-            os.remove(gecici_dosya)
-        except:
-            pass
-            
-        result = transcript.text.strip()
+        # Paylaşılan temp_audio.wav yok; eşzamanlı kullanıcılar birbirinin dosyasını ezmez
+        result = whisper_cagir(ses_verisi)
         print(f"🎯 Whisper sonucu: '{result}'")
         return result
         
@@ -97,145 +331,358 @@ def sesi_metne_cevir_openai(ses_verisi):
         print(f"❌ OpenAI transkripsiyon hatası: {e}")
         return None
 
-def metinden_sese_openai(metin):
-    """OpenAI TTS ile metin-ses çevirisi"""
+def ses_suresi(ses_verisi):
+    """WAV kaydının süresi (saniye); WAV değilse 0"""
+    try:
+        with wave.open(io.BytesIO(ses_verisi), "rb") as w:
+            return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0
+
+def metinden_sese_openai(metin, ses="nova", hiz=0.85, model="tts-1"):
+    """OpenAI TTS ile metin-ses çevirisi (önbellekli)"""
     try:
+        anahtar = ses_anahtari(metin, ses, hiz, model)
+        onbellekte = ses_onbellegi_al().getir(anahtar)
+        if onbellekte is not None:
+            return onbellekte
+        
         if not openai_client:
             print("❌ OpenAI client yok - TTS yapılamaz")
             return None
             
         print(f"🎵 TTS için metin: '{metin[:50]}...'")
-        response = openai_client.audio.speech.create(
-            model="tts-1",
-            voice="nova",
-            input=metin,
-            speed=0.85
-        )
+        with cagri_olc("tts", model):
+            response = openai_client.audio.speech.create(
+                model=model,
+                voice=ses,
+                input=metin,
+                speed=hiz
+            )
         
         print("✅ TTS başarılı")
-        return response.content
         
     except Exception as e:
         print(f"❌ OpenAI TTS hatası: {e}")
         return None
+    
+    ses_onbellege_yaz(anahtar, response.content)
+    return response.content
+
+def hazir_ifadeleri_on_isit(ses="nova", hiz=0.85, model="tts-1"):
+    """Hazır ifadeleri önceden seslendirip önbelleğe al, önbellekteki ifade sayısını döndür"""
+    hazir = 0
+    for metin in HAZIR_IFADELER:
+        if metinden_sese_openai(metin, ses, hiz, model) is not None:
+            hazir += 1
+    return hazir
+
+# Cümle sonu: noktalama (+ kapanış tırnağı/parantez) ve ardından boşluk
+CUMLE_SONU = re.compile(r'[.!?…]+["\'”’)»]*\s+')
+# Noktası cümle bitirmeyen kısaltmalar ("Dr. Marcus Reed" tek cümle kalır)
+KISALTMA_SONU = re.compile(r'(?<!\w)(?:dr|prof|doç|yrd|uzm|av|sn|st|vb|vs|vd|bkz|örn)$', re.IGNORECASE)
+
+def cumlelere_ayir(metin, en_kisa=TTS_EN_KISA_CUMLE):
+    """Tamamlanmış cümleleri ve henüz bitmemiş kalan metni döndür
+
+    Kısaltma noktaları ("Dr.", "vb.") cümle bitirmez; çok kısa parçalar bir
+    sonraki cümleyle birleştirilir.
+    """
+    cumleler = []
+    bas = 0
+    for eslesme in CUMLE_SONU.finditer(metin):
+        if eslesme.group().startswith(". ") and KISALTMA_SONU.search(metin, bas, eslesme.start()):
+            continue
+        cumle = metin[bas:eslesme.end()].strip()
+        if len(cumle) >= en_kisa:
+            cumleler.append(cumle)
+            bas = eslesme.end()
+    return cumleler, metin[bas:]
 
-def ses_baytlarini_cal(ses_baytlari):
-    """Ses dosyasını çal"""
+def cumle_sesini_akit(cumle, kuyruk, ses="nova", hiz=0.85, model="tts-1"):
+    """Tek cümleyi akışlı TTS ile seslendir, gelen baytları kuyruğa yaz (bitince None)"""
     try:
-        gecici_dosya = "gecici_ai_psycho_ses.mp3"
-        with open(gecici_dosya, "wb") as f:
-            f.write(ses_baytlari)
+        anahtar = ses_anahtari(cumle, ses, hiz, model)
+        onbellekte = ses_onbellegi_al().getir(anahtar)
+        if onbellekte is not None:
+            kuyruk.put(onbellekte)
+            return
         
-        print("🔊 Ses dosyası hazırlandı, çalınıyor...")
-        
-        import pygame
-        pygame.mixer.quit()
-        pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=1024)
-        pygame.mixer.init()
-        
-        pygame.mixer.music.load(gecici_dosya)
-        pygame.mixer.music.set_volume(1.0)
-        pygame.mixer.music.play()
-        
-        while pygame.mixer.music.get_busy():
-            pygame.time.wait(100)
-        
-        pygame.mixer.quit()
+        if not openai_client:
+            print("❌ OpenAI client yok - TTS yapılamaz")
+            return
+        
+        parcalar = []
+        with cagri_olc("tts", model) as cagri, openai_client.audio.speech.with_streaming_response.create(
+            model=model,
+            voice=ses,
+            input=cumle,
+            speed=hiz,
+            response_format="mp3"
+        ) as response:
+            for parca in response.iter_bytes(TTS_PARCA_BAYT):
+                cagri.ilk_parca()
+                parcalar.append(parca)
+                kuyruk.put(parca)
         
+    except Exception as e:
+        print(f"❌ Cümle TTS hatası: {e}")
+        return
+    finally:
+        kuyruk.put(None)
+    
+    # Yarım kalan ses önbelleğe yazılmaz; buraya sadece tamamlanınca gelinir
+    ses_onbellege_yaz(anahtar, b"".join(parcalar))
+
+class CumleSeslendirici:
+    """Metni geldikçe cümlelere bölüp paralel seslendiren boru hattı
+
+    ekle() ile gelen metin parçaları verilir, bitir() ile akış kapatılır.
+    ses_parcalari() MP3 baytlarını cümle sırasıyla üretir; ilk cümlenin sesi,
+    cevabın geri kalanı üretilirken çalmaya başlayabilir.
+    """
+
+    def __init__(self, ses="nova", hiz=0.85, model="tts-1", paralel=TTS_PARALEL_ISTEK):
+        self.ses = ses
+        self.hiz = hiz
+        self.model = model
+        self._havuz = ThreadPoolExecutor(max_workers=paralel, thread_name_prefix="tts")
+        # Her cümle için bir parça kuyruğu, cümle sırasıyla; None akışın sonu
+        self._sira = queue.Queue()
+        self._tampon = ""
+
+    def ekle(self, metin_parcasi):
+        self._tampon += metin_parcasi
+        cumleler, self._tampon = cumlelere_ayir(self._tampon)
+        for cumle in cumleler:
+            self._cumle_gonder(cumle)
+
+    def bitir(self):
+        kalan = self._tampon.strip()
+        self._tampon = ""
+        if kalan:
+            self._cumle_gonder(kalan)
+        self._sira.put(None)
+        # Bekleyen cümleler çalışmaya devam eder, sadece yeni iş alınmaz
+        self._havuz.shutdown(wait=False)
+
+    def _cumle_gonder(self, cumle):
+        kuyruk = queue.Queue()
+        self._sira.put(kuyruk)
+        # Seans/öncelik context'i işçi thread'ine taşınır
+        self._havuz.submit(contextvars.copy_context().run, cumle_sesini_akit, cumle, kuyruk, self.ses, self.hiz, self.model)
+
+    def ses_parcalari(self):
+        """Ses baytlarını cümle sırasıyla üret (generator)"""
+        while True:
+            kuyruk = self._sira.get()
+            if kuyruk is None:
+                return
+            while True:
+                parca = kuyruk.get()
+                if parca is None:
+                    break
+                yield parca
+
+    def cumle_sesleri(self):
+        """Her cümlenin tam ses baytlarını sırayla üret (çalıcı kuyruğu için)"""
+        while True:
+            kuyruk = self._sira.get()
+            if kuyruk is None:
+                return
+            parcalar = []
+            while True:
+                parca = kuyruk.get()
+                if parca is None:
+                    break
+                parcalar.append(parca)
+            if parcalar:
+                yield b"".join(parcalar)
+
+def cumle_cumle_seslendir(metin_parcalari, ses="nova", hiz=0.85, model="tts-1"):
+    """Metin akışını (ör. ai_psikolog_cevap_akisi) cümle cümle seslendirip ses baytlarını sırayla üret"""
+    seslendirici = CumleSeslendirici(ses, hiz, model)
+
+    def besle():
         try:
-            os.remove(gecici_dosya)
-        except:
-            pass
-        
-        print("🔊 Ses başarıyla çalındı")
+            for parca in metin_parcalari:
+                seslendirici.ekle(parca)
+        except Exception as e:
+            print(f"❌ Metin akışı hatası: {e}")
+        finally:
+            seslendirici.bitir()
+
+    threading.Thread(target=contextvars.copy_context().run, args=(besle,), name="tts-besleyici", daemon=True).start()
+    yield from seslendirici.ses_parcalari()
+
+def ses_baytlarini_cal(ses_baytlari, bekle=False):
+    """Sesi arka plandaki çalıcının kuyruğuna ekle (bekle=True ise çalma bitene kadar bekler)"""
+    try:
+        calar = varsayilan_calar()
+        calar.kuyruga_ekle(ses_baytlari)
+        print("🔊 Ses çalma kuyruğuna eklendi")
+        if bekle:
+            calar.bekle()
         return True
             
     except Exception as e:
         print(f"❌ Ses çalma hatası: {e}")
         return False
 
-def metinden_stres_analizi(metin):
-    """Metinden stres ve ruh hali analizi"""
+def cevabi_seslendir_ve_cal(metin_parcalari, ses="nova", hiz=0.85, model="tts-1"):
+    """Metin parçalarını aynen geri üret (ekranda göstermek için), cümleleri arka planda seslendirip çal
+
+    Her cümlenin sesi hazır olur olmaz çalma kuyruğuna eklenir; çağıran beklemez.
+    """
+    seslendirici = CumleSeslendirici(ses, hiz, model)
+    calar = varsayilan_calar()
+
+    def kuyruga_aktar():
+        for cumle_sesi in seslendirici.cumle_sesleri():
+            calar.kuyruga_ekle(cumle_sesi)
+
+    threading.Thread(target=kuyruga_aktar, name="tts-calar", daemon=True).start()
     try:
-        if not openai_client:
-            return 5, "normal"
-            
-        stres_promptu = f"""Bu metindeki stres/anksiyete seviyesini analiz et. 0-10 arası puanla:
+        for parca in metin_parcalari:
+            seslendirici.ekle(parca)
+            yield parca
+    finally:
+        seslendirici.bitir()
+
+def stres_onbellek_anahtari(metin):
+    """Normalize metin + prompt sürümünden önbellek anahtarı üret"""
+    ozet = hashlib.sha256(turkce_normalize(metin).encode("utf-8")).hexdigest()
+    return f"{STRES_PROMPT_SURUMU}:{ozet}"
+
+def stres_onbellek_istatistigi():
+    """Stres analizi önbelleği isabet/ıskalama sayaçları"""
+    return stres_onbellegi.istatistik()
+
+# Sabit talimatlar sistem mesajında, değişken metin kullanıcı mesajında tutulur;
+# böylece aynı önek sağlayıcı tarafında önbelleğe alınabilir
+STRES_SISTEM_PROMPTU = '''Verilen metindeki stres/anksiyete seviyesini analiz et. 0-10 arası puanla:
 0 = Çok sakin, huzurlu
-1-3 = Hafif endişeli/kaygılı  
+1-3 = Hafif endişeli/kaygılı
 4-6 = Orta düzey anksiyete/stres
 7-9 = Yüksek anksiyete/stres
 10 = Şiddetli panik/kriz
 
-Metin: "{metin}"
-
 Sadece bir sayı (0-10) ve bir kelime ruh hali (sakin/endişeli/anksiyeteli/stresli/panik) ile cevap ver.
-Format: "7 anksiyeteli"
-"""
-        
+Format: "7 anksiyeteli"'''
+
+def stres_mesajlari_hazirla(metin):
+    """Stres analizi mesajları"""
+    return [
+        {"role": "system", "content": STRES_SISTEM_PROMPTU},
+        {"role": "user", "content": f'Metin: "{metin}"'}
+    ]
+
+def stres_cevabini_coz(icerik):
+    """'7 anksiyeteli' biçimindeki cevabı (stres_seviyesi, ruh_hali) olarak çöz"""
+    sonuc = icerik.strip().split()
+    stres_seviyesi = int(sonuc[0])
+    ruh_hali = sonuc[1] if len(sonuc) > 1 else "normal"
+    return stres_seviyesi, ruh_hali
+
+def stres_analizi_llm(metin):
+    """LLM ile stres analizi (hatalar yukarı iletilir, toplu analizde tekrar denemek için)"""
+    anahtar = stres_onbellek_anahtari(metin)
+    onbellekte = stres_onbellegi.getir(anahtar)
+    if onbellekte is not None:
+        return tuple(onbellekte)
+    
+    with cagri_olc("stres_analizi", "gpt-4o-mini") as cagri:
         response = openai_client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": stres_promptu}],
+            messages=stres_mesajlari_hazirla(metin),
             max_tokens=10,
             temperature=0.1
         )
-        
-        sonuc = response.choices[0].message.content.strip().split()
-        stres_seviyesi = int(sonuc[0])
-        ruh_hali = sonuc[1] if len(sonuc) > 1 else "normal"
-        
-        return stres_seviyesi, ruh_hali
-        
-    except Exception as e:
-        print(f"❌ Stres analizi hatası: {e}")
-        return 5, "normal"
+        cagri.kullanim(response.usage)
+    
+    stres_seviyesi, ruh_hali = stres_cevabini_coz(response.choices[0].message.content)
+    stres_onbellegi.koy(anahtar, (stres_seviyesi, ruh_hali))
+    return stres_seviyesi, ruh_hali
 
-def ai_psikolog_cevap_uret(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi):
-    """AI psikolog cevabı üret"""
+def metinden_stres_analizi(metin, mod=None):
+    """Metinden stres ve ruh hali analizi
+    
+    mod: "llm" (sadece LLM), "yerel" (sadece sözlük skorlayıcı) veya
+    "yerel_oncelikli" (yerel skor yeterince güvenliyse LLM çağrılmaz)
+    """
+    mod = mod or STRES_ANALIZ_MODU
+    if mod == "yerel":
+        return yerel_stres_analizi(metin)
+    if mod == "yerel_oncelikli":
+        stres_seviyesi, ruh_hali, guven = varsayilan_skorlayici.skorla(metin)
+        if guven >= YEREL_GUVEN_ESIGI:
+            return stres_seviyesi, ruh_hali
+    
     try:
         if not openai_client:
-            return "Size destek olmak için buradayım. Nasıl yardımcı olabilirim?"
+            return yerel_stres_analizi(metin)
         
-        # Konuşma geçmişi
-        baglam = ""
-        if konusma_gecmisi:
-            for konusma in konusma_gecmisi[-3:]:
-                baglam += f"Danışan: {konusma['kullanici']}\nPsikolog: {konusma['ai']}\n"
+        return stres_analizi_llm(metin)
         
-        # Seans aşamasına göre yaklaşım
-        if konusma_sirasi == 0:
-            asama_talimat = """İLK KONUŞMA - Karşılama ve bağ kurma:
+    except Exception as e:
+        print(f"❌ Stres analizi hatası: {e}")
+        return yerel_stres_analizi(metin)
+
+PSIKOLOG_SISTEM_ONEKI = """Sen deneyimli bir klinik psikolog olarak 5 dakikalık kısa seans yapıyorsun.
+
+KURALLAR:
+- Türkçe konuş
+- 40-60 kelime arası cevap ver
+- Klinik psikolog gibi davran
+- Empati kur ama profesyonel kal
+- Somut öneriler ver
+- Hastanın duygularını doğrula"""
+
+ASAMA_TALIMATLARI = [
+    """İLK KONUŞMA - Karşılama ve bağ kurma:
 - Hastanın problemini anlayın
 - Empati kurun, güven verin
 - Açık uçlu sorular sorun
-- Yargılamadan dinleyin"""
-        elif konusma_sirasi <= 2:
-            asama_talimat = """ORTA AŞAMA - Keşif ve değerlendirme:
+- Yargılamadan dinleyin""",
+    """ORTA AŞAMA - Keşif ve değerlendirme:
 - Daha derin sorular sorun
 - Tetikleyici faktörleri araştırın
 - Geçmiş deneyimleri inceleyin
-- Başa çıkma mekanizmalarını keşfedin"""
-        else:
-            asama_talimat = """SON AŞAMA - Müdahale ve öneriler:
+- Başa çıkma mekanizmalarını keşfedin""",
+    """SON AŞAMA - Müdahale ve öneriler:
 - Pratik çözümler sunun
 - Başa çıkma stratejileri öğretin
 - Ev ödevleri verin
 - Umudu artırın"""
-        
-        # Problem aciliyet seviyesi
-        aciliyet_yaklaşımı = ""
-        if problem_bilgisi["aciliyet"] == "Acil yardım gerekli":
-            aciliyet_yaklaşımı = "ÖNEMLİ: Hasta acil durum bildirdi. Derhal sakinleştirici teknikler uygulayın."
-        elif problem_bilgisi["aciliyet"] == "Ciddi sorun":
-            aciliyet_yaklaşımı = "DİKKAT: Ciddi problem var. Profesyonel yaklaşımla destekleyin."
-        
-        prompt = f"""Sen deneyimli bir klinik psikolog olarak 5 dakikalık kısa seans yapıyorsun.
+]
+
+ACILIYET_YAKLASIMLARI = {
+    "Acil yardım gerekli": "ÖNEMLİ: Hasta acil durum bildirdi. Derhal sakinleştirici teknikler uygulayın.",
+    "Ciddi sorun": "DİKKAT: Ciddi problem var. Profesyonel yaklaşımla destekleyin."
+}
 
-{asama_talimat}
+def asama_no(konusma_sirasi):
+    """Konuşma sırasından seans aşaması (0: ilk, 1: orta, 2: son)"""
+    if konusma_sirasi == 0:
+        return 0
+    elif konusma_sirasi <= 2:
+        return 1
+    return 2
 
-{aciliyet_yaklaşımı}
+@functools.lru_cache(maxsize=None)
+def psikolog_sistem_promptu(asama, aciliyet):
+    """Aşama ve aciliyet başına bir kez oluşturulan sabit sistem mesajı"""
+    parcalar = [PSIKOLOG_SISTEM_ONEKI, ASAMA_TALIMATLARI[asama]]
+    if aciliyet in ACILIYET_YAKLASIMLARI:
+        parcalar.append(ACILIYET_YAKLASIMLARI[aciliyet])
+    return "\n\n".join(parcalar)
 
-BAĞLAM:
+def psikolog_mesajlari_hazirla(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet=None):
+    """Psikolog cevabı için mesajları hazırla (sabit sistem öneki + değişken içerik)"""
+    # Konuşma geçmişi: eski turların özeti + son turlar, sabit token bütçesiyle
+    baglam = (ozet or KayanOzet()).baglam(konusma_gecmisi or [])
+    
+    icerik = f"""BAĞLAM:
 Problem: {problem_bilgisi['metin']}
 Terapi geçmişi: {problem_bilgisi['terapi_gecmisi']}
 Aciliyet: {problem_bilgisi['aciliyet']}
@@ -245,132 +692,217 @@ Aciliyet: {problem_bilgisi['aciliyet']}
 
 Hasta şimdi şunu söyledi: "{kullanici_metni}"
 
-KURALLAR:
-- Türkçe konuş
-- 40-60 kelime arası cevap ver
-- Klinik psikolog gibi davran
-- Empati kur ama profesyonel kal
-- Somut öneriler ver
-- Hastanın duygularını doğrula
-
 Profesyonel psikolog cevabı ver:"""
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150,
-            temperature=0.7
-        )
+    
+    return [
+        {"role": "system", "content": psikolog_sistem_promptu(asama_no(konusma_sirasi), problem_bilgisi["aciliyet"])},
+        {"role": "user", "content": icerik}
+    ]
+
+def ai_psikolog_cevap_uret(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet=None):
+    """AI psikolog cevabı üret"""
+    try:
+        if not openai_client:
+            return VARSAYILAN_CEVAP
+        
+        with cagri_olc("cevap", "gpt-4o-mini", konusma_sirasi) as cagri:
+            with oncelik(aciliyet_onceligi(problem_bilgisi['aciliyet'])):
+                response = openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=psikolog_mesajlari_hazirla(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet),
+                    max_tokens=150,
+                    temperature=0.7
+                )
+            cagri.kullanim(response.usage)
         
         return response.choices[0].message.content.strip()
         
     except Exception as e:
         print(f"❌ AI psikolog cevap hatası: {e}")
-        return "Anlıyorum... Bu durum sizi nasıl etkiliyor? Biraz daha açabilir misiniz?"
+        return YEDEK_CEVAP
 
-def seans_analizi_yap(problem_bilgisi, konusma_gecmisi):
+def ai_psikolog_cevap_akisi(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet=None):
+    """AI psikolog cevabını token token üret (generator)"""
+    uretildi = False
+    try:
+        if not openai_client:
+            yield VARSAYILAN_CEVAP
+            return
+        
+        with cagri_olc("cevap", "gpt-4o-mini", konusma_sirasi) as cagri:
+            with oncelik(aciliyet_onceligi(problem_bilgisi['aciliyet'])):
+                stream = openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=psikolog_mesajlari_hazirla(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet),
+                    max_tokens=150,
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+            
+            for chunk in stream:
+                # Kullanım bilgisi son, boş choices'lu parçada gelir
+                if chunk.usage:
+                    cagri.kullanim(chunk.usage)
+                if not chunk.choices:
+                    continue
+                parca = chunk.choices[0].delta.content
+                if parca:
+                    cagri.ilk_parca()
+                    uretildi = True
+                    yield parca
+        
+    except Exception as e:
+        print(f"❌ AI psikolog cevap hatası: {e}")
+        if not uretildi:
+            yield YEDEK_CEVAP
+
+def seans_analizi_yap(problem_bilgisi, konusma_gecmisi, ozet=None):
     """Seans sonunda kapsamlı analiz yap"""
     try:
         if not openai_client:
-            return {
-                "degerlendirme": "Analiz yapılamadı",
-                "oneriler": ["Teknik sorun nedeniyle analiz yapılamadı"],
-                "stres_seviyesi": 5,
-                "ruh_hali": "belirsiz",
-                "aciliyet": "orta"
-            }
+            return analiz_sonucu(
+                degerlendirme="Analiz yapılamadı",
+                oneriler=["Teknik sorun nedeniyle analiz yapılamadı"]
+            )
         
-        # Tüm konuşmaları birleştir
-        tum_konusmalar = ""
-        for konusma in konusma_gecmisi:
-            tum_konusmalar += f"Danışan: {konusma['kullanici']}\nPsikolog: {konusma['ai']}\n\n"
+        # Konuşmalar: eski turların özeti + son turlar, sabit token bütçesiyle
+        tum_konusmalar = (ozet or KayanOzet(son_tur_sayisi=5)).baglam(
+            konusma_gecmisi, token_butcesi=ANALIZ_TOKEN_BUTCESI
+        )
         
-        analiz_prompt = f"""Sen deneyimli bir klinik psikolog olarak 5 dakikalık bu seansı analiz et.
-
-BAŞLANGIÇ PROBLEMİ:
+        analiz_prompt = f"""BAŞLANGIÇ PROBLEMİ:
 {problem_bilgisi['metin']}
 Aciliyet: {problem_bilgisi['aciliyet']}
 Terapi geçmişi: {problem_bilgisi['terapi_gecmisi']}
 
 SEANS TRANSKRİPTİ:
-{tum_konusmalar}
-
-Lütfen şu formatta bir analiz yap:
+{tum_konusmalar}"""
+        
+        with cagri_olc("seans_analizi", "gpt-4o-mini", len(konusma_gecmisi)) as cagri:
+            with oncelik(aciliyet_onceligi(problem_bilgisi['aciliyet'])):
+                response = openai_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=[
+                        {"role": "system", "content": ANALIZ_SISTEM_PROMPTU},
+                        {"role": "user", "content": analiz_prompt}
+                    ],
+                    max_tokens=400,
+                    temperature=0.3,
+                    response_format=ANALIZ_YANIT_BICIMI
+                )
+            cagri.kullanim(response.usage)
+        
+        return analiz_coz(yanit_icerigi(response))
+        
+    except Exception as e:
+        print(f"❌ Seans analizi hatası: {e}")
+        return analiz_sonucu(degerlendirme=HATA_DEGERLENDIRMESI, oneriler=HATA_ONERILERI)
 
-DEĞERLENDIRME: (100-150 kelime profesyonel değerlendirme)
-STRES_SEVİYESİ: (0-10 arası sayı)
-RUH_HALİ: (sakin/endişeli/anksiyeteli/stresli/depresif/panik kelimelerinden biri)
-ACİLİYET: (dusuk/orta/yuksek)
-ÖNERİLER: (3-5 madde halinde pratik öneriler)
-TEŞHİS_ÖNERİLERİ: (eğer varsa dikkat edilmesi gerekenler)
+# Async varyantlar (arka plan döngüsünde çalışır, bkz. openai_istemci.arka_planda_calistir)
+bekleyen_stres_gorevleri = set()
 
-Analiz yap:"""
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": analiz_prompt}],
-            max_tokens=400,
-            temperature=0.3
-        )
-        
-        analiz_metni = response.choices[0].message.content.strip()
-        
-        # Analizi parse et
-        analiz_sonucu = {
-            "degerlendirme": "",
-            "oneriler": [],
-            "stres_seviyesi": 5,
-            "ruh_hali": "normal",
-            "aciliyet": "orta",
-            "teşhis_onerileri": ""
-        }
-        
-        # Basit parsing
-        for satir in analiz_metni.split('\n'):
-            if 'DEĞERLENDIRME:' in satir:
-                analiz_sonucu["degerlendirme"] = satir.replace('DEĞERLENDIRME:', '').strip()
-            elif 'STRES_SEVİYESİ:' in satir:
-                try:
-                    analiz_sonucu["stres_seviyesi"] = int(satir.replace('STRES_SEVİYESİ:', '').strip())
-                except:
-                    pass
-            elif 'RUH_HALİ:' in satir:
-                analiz_sonucu["ruh_hali"] = satir.replace('RUH_HALİ:', '').strip().lower()
-            elif 'ACİLİYET:' in satir:
-                analiz_sonucu["aciliyet"] = satir.replace('ACİLİYET:', '').strip().lower()
-            elif 'ÖNERİLER:' in satir:
-                continue
-            elif satir.strip().startswith('-') or satir.strip().startswith('•'):
-                analiz_sonucu["oneriler"].append(satir.strip()[1:].strip())
-            elif 'TEŞHİS_ÖNERİLERİ:' in satir:
-                analiz_sonucu["teşhis_onerileri"] = satir.replace('TEŞHİS_ÖNERİLERİ:', '').strip()
+async def metinden_stres_analizi_async(metin, mod=None):
+    """metinden_stres_analizi'nin AsyncOpenAI ile çalışan sürümü"""
+    mod = mod or STRES_ANALIZ_MODU
+    if mod == "yerel":
+        return yerel_stres_analizi(metin)
+    if mod == "yerel_oncelikli":
+        stres_seviyesi, ruh_hali, guven = varsayilan_skorlayici.skorla(metin)
+        if guven >= YEREL_GUVEN_ESIGI:
+            return stres_seviyesi, ruh_hali
+    
+    try:
+        istemci = async_openai_istemci_al()
+        if not istemci:
+            return yerel_stres_analizi(metin)
+        
+        anahtar = stres_onbellek_anahtari(metin)
+        onbellekte = stres_onbellegi.getir(anahtar)
+        if onbellekte is not None:
+            return tuple(onbellekte)
+        
+        with cagri_olc("stres_analizi", "gpt-4o-mini") as cagri:
+            response = await istemci.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=stres_mesajlari_hazirla(metin),
+                max_tokens=10,
+                temperature=0.1
+            )
+            cagri.kullanim(response.usage)
         
-        # Eğer parsing başarısızsa, tüm metni değerlendirme olarak al
-        if not analiz_sonucu["degerlendirme"]:
-            analiz_sonucu["degerlendirme"] = analiz_metni
+        stres_seviyesi, ruh_hali = stres_cevabini_coz(response.choices[0].message.content)
+        stres_onbellegi.koy(anahtar, (stres_seviyesi, ruh_hali))
+        return stres_seviyesi, ruh_hali
         
-        # Varsayılan öneriler
-        if not analiz_sonucu["oneriler"]:
-            analiz_sonucu["oneriler"] = [
-                "Günlük nefes egzersizleri yapın",
-                "Düzenli uyku düzenine dikkat edin",
-                "Stresi tetikleyen faktörleri belirleyin",
-                "Sosyal destek alın",
-                "Gerekirse profesyonel yardım arayın"
-            ]
+    except Exception as e:
+        print(f"❌ Stres analizi hatası: {e}")
+        return yerel_stres_analizi(metin)
+
+async def ai_psikolog_cevap_uret_async(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet=None):
+    """ai_psikolog_cevap_uret'in AsyncOpenAI ile çalışan sürümü"""
+    # Görev kendi context kopyasında çalışır, öncelik sadece bu görevi etkiler
+    aktif_oncelik.set(aciliyet_onceligi(problem_bilgisi['aciliyet']))
+    try:
+        istemci = async_openai_istemci_al()
+        if not istemci:
+            return VARSAYILAN_CEVAP
+        
+        with cagri_olc("cevap", "gpt-4o-mini", konusma_sirasi) as cagri:
+            response = await istemci.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=psikolog_mesajlari_hazirla(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi, ozet),
+                max_tokens=150,
+                temperature=0.7
+            )
+            cagri.kullanim(response.usage)
         
-        return analiz_sonucu
+        return response.choices[0].message.content.strip()
         
     except Exception as e:
-        print(f"❌ Seans analizi hatası: {e}")
-        return {
-            "degerlendirme": "Bu seansda belirlediğimiz temel problemleri ele almaya başladık. Devam etmeniz önerilir.",
-            "oneriler": [
-                "Günlük stresi azaltma tekniklerini uygulayın",
-                "Profesyonel destek almayı düşünün",
-                "Kendinize zaman ayırın"
-            ],
-            "stres_seviyesi": 5,
-            "ruh_hali": "normal",
-            "aciliyet": "orta"
-        }
\ No newline at end of file
+        print(f"❌ AI psikolog cevap hatası: {e}")
+        return YEDEK_CEVAP
+
+def stres_analizini_baslat(metin, mod=None, aciliyet=None):
+    """Stres analizini arka planda başlat (concurrent.futures.Future döner)"""
+    return arka_planda_calistir(
+        oncelikle_calistir(metinden_stres_analizi_async(metin, mod), aciliyet_onceligi(aciliyet))
+    )
+
+def tur_kaydina_stres_ekle(stres_gorevi, tur_kaydi):
+    """Stres sonucu geldiğinde tur kaydına 'stres' alanını ekle"""
+    def ekle(gorev):
+        try:
+            stres_seviyesi, ruh_hali = gorev.result()
+        except Exception as e:
+            print(f"❌ Stres analizi hatası: {e}")
+            return
+        tur_kaydi["stres"] = {"stres_seviyesi": stres_seviyesi, "ruh_hali": ruh_hali}
+    stres_gorevi.add_done_callback(ekle)
+
+async def tur_isle_async(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi):
+    """Cevap ve stres analizini eşzamanlı çalıştır; cevap hazır olunca tur kaydını döndür
+    
+    Stres sonucu daha sonra gelirse tur kaydına sonradan eklenir.
+    """
+    # Stres görevi bu context'in kopyasını alır, öncelik ve aşama önce ayarlanmalı
+    aktif_oncelik.set(aciliyet_onceligi(problem_bilgisi['aciliyet']))
+    aktif_asama.set(konusma_sirasi)
+    stres_gorevi = asyncio.ensure_future(metinden_stres_analizi_async(kullanici_metni))
+    # Event loop görevlere zayıf referans tutar; sonuç gelene kadar canlı tut
+    bekleyen_stres_gorevleri.add(stres_gorevi)
+    stres_gorevi.add_done_callback(bekleyen_stres_gorevleri.discard)
+    cevap = await ai_psikolog_cevap_uret_async(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi)
+    tur_kaydi = {
+        "kullanici": kullanici_metni,
+        "ai": cevap,
+        "zaman": datetime.now().isoformat()
+    }
+    tur_kaydina_stres_ekle(stres_gorevi, tur_kaydi)
+    return tur_kaydi
+
+def tur_isle(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi):
+    """tur_isle_async'in senkron sarmalayıcısı (Streamlit gibi senkron kod için)"""
+    return arka_planda_calistir(
+        tur_isle_async(kullanici_metni, problem_bilgisi, konusma_gecmisi, konusma_sirasi)
+    ).result()
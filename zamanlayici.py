@@ -0,0 +1,227 @@
+"""Süreç genelinde OpenAI istek zamanlayıcısı
+
+Tüm istekler (sohbet, TTS, Whisper) paylaşılan istemcilerin httpx transport'u
+(zamanlayici_transport.py) üzerinden geçer. Her model için dakikadaki istek ve
+token kovaları tutulur, bekleyen istekler önceliğe göre sıralanır: aciliyeti "Dayanılmaz, acil yardım
+lazım" olan seansların istekleri rutin ve arka plan isteklerinin önüne geçer.
+"""
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+
+from config import (
+    OPENAI_MODEL_LIMITLERI, ZAMANLAYICI_MAX_KUYRUK, ZAMANLAYICI_MAX_BEKLEME
+)
+
+ACIL_ACILIYET = "Dayanılmaz, acil yardım lazım"
+
+# Küçük sayı = yüksek öncelik
+ACIL = 0
+NORMAL = 1
+ARKA_PLAN = 2
+
+aktif_oncelik = contextvars.ContextVar("aktif_oncelik", default=NORMAL)
+
+
+class ZamanlayiciHatasi(Exception):
+    """Kuyruk dolu veya bekleme süresi aşıldı"""
+
+
+def aciliyet_onceligi(aciliyet):
+    return ACIL if aciliyet == ACIL_ACILIYET else NORMAL
+
+
+@contextlib.contextmanager
+def oncelik(deger):
+    """Bu blokta yapılan OpenAI isteklerinin önceliğini ayarla"""
+    jeton = aktif_oncelik.set(deger)
+    try:
+        yield
+    finally:
+        aktif_oncelik.reset(jeton)
+
+
+async def oncelikle_calistir(coro, deger):
+    """Coroutine'i verilen öncelikle çalıştır (arka plan döngüsündeki görevler için)"""
+    aktif_oncelik.set(deger)
+    return await coro
+
+
+class TokenKovasi:
+    """Dakikalık limitli token kovası (limit 0 ise sınırsız)"""
+
+    def __init__(self, dakikalik_limit):
+        self.kapasite = float(dakikalik_limit)
+        self.miktar = self.kapasite
+        self.hiz = self.kapasite / 60.0
+        self._son = time.monotonic()
+
+    def _doldur(self):
+        simdi = time.monotonic()
+        self.miktar = min(self.kapasite, self.miktar + (simdi - self._son) * self.hiz)
+        self._son = simdi
+
+    def bekleme_suresi(self, miktar):
+        """miktar kadar harcamak için beklenmesi gereken süre (saniye)"""
+        if not self.kapasite:
+            return 0.0
+        self._doldur()
+        # Kapasiteden büyük istekler kova dolunca geçer
+        miktar = min(miktar, self.kapasite)
+        return max(0.0, (miktar - self.miktar) / self.hiz)
+
+    def harca(self, miktar):
+        if self.kapasite:
+            self.miktar -= min(miktar, self.kapasite)
+
+    def bosalt(self):
+        if self.kapasite:
+            self._doldur()
+            self.miktar = min(self.miktar, 0.0)
+
+
+class ModelLimiti:
+    def __init__(self, dakikada_istek, dakikada_token):
+        self.istek_kovasi = TokenKovasi(dakikada_istek)
+        self.token_kovasi = TokenKovasi(dakikada_token)
+        self.bekleyenler = []
+
+    def bekleme_suresi(self, token):
+        return max(self.istek_kovasi.bekleme_suresi(1), self.token_kovasi.bekleme_suresi(token))
+
+    def harca(self, token):
+        self.istek_kovasi.harca(1)
+        self.token_kovasi.harca(token)
+
+
+def _uyandir(gelecek):
+    if not gelecek.done():
+        gelecek.set_result(None)
+
+
+class IstekZamanlayici:
+    """Model başına token kovalı, öncelik sıralı, sınırlı kuyruklu istek zamanlayıcısı"""
+
+    def __init__(self, limitler=None, max_kuyruk=ZAMANLAYICI_MAX_KUYRUK, max_bekleme=ZAMANLAYICI_MAX_BEKLEME):
+        self.limitler = limitler if limitler is not None else OPENAI_MODEL_LIMITLERI
+        self.max_kuyruk = max_kuyruk
+        self.max_bekleme = max_bekleme
+        self._modeller = {}
+        self._bekleyen_sayisi = 0
+        self._sayac = itertools.count()
+        self._kosul = threading.Condition()
+        # izin_al_async ile bekleyen coroutine'lerin (döngü, future) çiftleri
+        self._async_bekleyenler = []
+
+    def _model_limiti(self, model):
+        limit = self._modeller.get(model)
+        if limit is None:
+            dakikada_istek, dakikada_token = self.limitler.get(model) or self.limitler.get("*", (0, 0))
+            limit = self._modeller[model] = ModelLimiti(dakikada_istek, dakikada_token)
+        return limit
+
+    def _siraya_gir(self, model, oncelik_degeri):
+        """Bekleyenler yığınına bilet ekle (self._kosul tutulurken çağrılır)"""
+        if self._bekleyen_sayisi >= self.max_kuyruk:
+            raise ZamanlayiciHatasi(f"İstek kuyruğu dolu ({self.max_kuyruk})")
+        limit = self._model_limiti(model)
+        bilet = (oncelik_degeri, next(self._sayac))
+        heapq.heappush(limit.bekleyenler, bilet)
+        self._bekleyen_sayisi += 1
+        return limit, bilet
+
+    def _dene(self, model, limit, bilet, token, bitis):
+        """Sıra bu biletteyse ve kova izin veriyorsa harca ve None döndür, yoksa
+        beklenecek süreyi döndür (self._kosul tutulurken çağrılır)"""
+        kalan = bitis - time.monotonic()
+        if limit.bekleyenler[0] == bilet:
+            bekleme = limit.bekleme_suresi(token)
+            if bekleme <= 0:
+                limit.harca(token)
+                return None
+        else:
+            # Öndeki istekler geçince uyandırılır
+            bekleme = kalan
+        if kalan <= 0:
+            raise ZamanlayiciHatasi(f"{model} için {self.max_bekleme:.0f} sn içinde sıra gelmedi")
+        return min(bekleme, kalan)
+
+    def _siradan_cik(self, limit, bilet):
+        """Bileti kaldır ve tüm bekleyenleri (thread ve coroutine) uyandır"""
+        with self._kosul:
+            limit.bekleyenler.remove(bilet)
+            heapq.heapify(limit.bekleyenler)
+            self._bekleyen_sayisi -= 1
+            self._kosul.notify_all()
+            for dongu, gelecek in self._async_bekleyenler:
+                try:
+                    dongu.call_soon_threadsafe(_uyandir, gelecek)
+                except RuntimeError:
+                    # Döngü kapanmış; bekleyen de iptal edilmiştir
+                    pass
+            self._async_bekleyenler.clear()
+
+    def izin_al(self, model, token=0, oncelik_degeri=NORMAL):
+        """Sıra gelip kovalar izin verene kadar bekle (çağıran thread bloklanır)"""
+        bitis = time.monotonic() + self.max_bekleme
+        with self._kosul:
+            limit, bilet = self._siraya_gir(model, oncelik_degeri)
+        try:
+            with self._kosul:
+                while True:
+                    bekleme = self._dene(model, limit, bilet, token, bitis)
+                    if bekleme is None:
+                        return
+                    self._kosul.wait(bekleme)
+        finally:
+            self._siradan_cik(limit, bilet)
+
+    async def izin_al_async(self, model, token=0, oncelik_degeri=NORMAL):
+        """izin_al'ın async sürümü: thread tutmadan event loop'ta bekler
+
+        Sıra yine aynı öncelik yığınıyla belirlenir; öndeki istek geçince
+        uyandırma call_soon_threadsafe ile bu coroutine'in future'ına iletilir.
+        """
+        dongu = asyncio.get_running_loop()
+        bitis = time.monotonic() + self.max_bekleme
+        with self._kosul:
+            limit, bilet = self._siraya_gir(model, oncelik_degeri)
+        try:
+            while True:
+                with self._kosul:
+                    bekleme = self._dene(model, limit, bilet, token, bitis)
+                    if bekleme is None:
+                        return
+                    gelecek = dongu.create_future()
+                    self._async_bekleyenler.append((dongu, gelecek))
+                await asyncio.wait([gelecek], timeout=bekleme)
+        finally:
+            self._siradan_cik(limit, bilet)
+
+    def limit_asildi(self, model):
+        """Sunucu 429 döndürdü: modelin kovalarını boşalt, herkes yeniden dolmasını beklesin"""
+        with self._kosul:
+            limit = self._model_limiti(model)
+            limit.istek_kovasi.bosalt()
+            limit.token_kovasi.bosalt()
+
+    def durum(self):
+        with self._kosul:
+            return {
+                "bekleyen": self._bekleyen_sayisi,
+                "modeller": {
+                    model: {
+                        "bekleyen": len(limit.bekleyenler),
+                        "istek_kovasi": round(limit.istek_kovasi.miktar, 1),
+                        "token_kovasi": round(limit.token_kovasi.miktar, 1)
+                    }
+                    for model, limit in self._modeller.items()
+                }
+            }
+
+
+varsayilan_zamanlayici = IstekZamanlayici()
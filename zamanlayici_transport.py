@@ -0,0 +1,116 @@
+"""Paylaşılan OpenAI istemcilerinin istekleri zamanlayıcıdan geçiren httpx transport'ları
+
+httpx'e bağlı olduğu için ayrı modüldedir; openai_istemci ilk istemciyi
+oluştururken yükler.
+
+Tekrar deneme yalnızca burada yapılır: istemciler max_retries=0 ile kurulur,
+böylece 429 alan bir çağrı en fazla ZAMANLAYICI_DENEME kez gönderilir ve her
+deneme zamanlayıcıdan yeniden izin alır.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+
+import httpx
+
+from config import ZAMANLAYICI_DENEME
+from zamanlayici import aktif_oncelik
+
+
+# OpenAI SDK'nın da tekrar denediği durum kodları
+TEKRAR_DURUMLARI = {408, 409, 429, 500, 502, 503, 504}
+# İstek sunucuya hiç ulaşmadıysa tekrar göndermek güvenli
+TEKRAR_HATALARI = (httpx.ConnectError, httpx.ConnectTimeout)
+
+_MULTIPART_MODEL = re.compile(rb'name="model"\r\n\r\n([^\r]+)')
+
+
+def istek_bilgisi(request):
+    """İstek gövdesinden (model, tahmini token) çıkar"""
+    icerik = request.content
+    eslesme = _MULTIPART_MODEL.search(icerik)
+    if eslesme:
+        return eslesme.group(1).decode(), 0
+    try:
+        govde = json.loads(icerik or b"{}")
+    except ValueError:
+        return "*", 0
+    model = govde.get("model", "*")
+    if "messages" not in govde:
+        return model, 0
+    # Token sayımı yerine kaba ve temkinli tahmin: ~3 karakter/token + en fazla çıktı
+    tahmin = len(json.dumps(govde["messages"], ensure_ascii=False)) // 3
+    return model, tahmin + (govde.get("max_tokens") or govde.get("max_completion_tokens") or 0)
+
+
+def geri_cekilme_suresi(response, deneme):
+    """Retry-After varsa ona, yoksa üstel bekleme + jitter'a göre bekleme süresi"""
+    try:
+        return float(response.headers["retry-after"]) * (1 + random.random() * 0.2)
+    except (AttributeError, KeyError, ValueError):
+        return 0.5 * (2 ** deneme) * (0.5 + random.random())
+
+
+class ZamanlayiciTransport(httpx.BaseTransport):
+    """İstekleri zamanlayıcıdan geçiren, 429 / 5xx / bağlantı hatasında jitter'lı tekrar deneyen httpx transport"""
+
+    def __init__(self, ic_transport, zamanlayici, deneme=ZAMANLAYICI_DENEME):
+        self.ic_transport = ic_transport
+        self.zamanlayici = zamanlayici
+        self.deneme = deneme
+
+    def handle_request(self, request):
+        request.read()
+        model, token = istek_bilgisi(request)
+        for sira in range(self.deneme):
+            self.zamanlayici.izin_al(model, token, aktif_oncelik.get())
+            try:
+                response = self.ic_transport.handle_request(request)
+            except TEKRAR_HATALARI:
+                if sira == self.deneme - 1:
+                    raise
+                time.sleep(geri_cekilme_suresi(None, sira))
+                continue
+            if response.status_code == 429:
+                self.zamanlayici.limit_asildi(model)
+            if response.status_code not in TEKRAR_DURUMLARI or sira == self.deneme - 1:
+                return response
+            response.close()
+            time.sleep(geri_cekilme_suresi(response, sira))
+
+    def close(self):
+        self.ic_transport.close()
+
+
+class AsyncZamanlayiciTransport(httpx.AsyncBaseTransport):
+    """ZamanlayiciTransport'un async sürümü; bekleme event loop'u bloklamaz"""
+
+    def __init__(self, ic_transport, zamanlayici, deneme=ZAMANLAYICI_DENEME):
+        self.ic_transport = ic_transport
+        self.zamanlayici = zamanlayici
+        self.deneme = deneme
+
+    async def handle_async_request(self, request):
+        await request.aread()
+        model, token = istek_bilgisi(request)
+        oncelik_degeri = aktif_oncelik.get()
+        for sira in range(self.deneme):
+            await self.zamanlayici.izin_al_async(model, token, oncelik_degeri)
+            try:
+                response = await self.ic_transport.handle_async_request(request)
+            except TEKRAR_HATALARI:
+                if sira == self.deneme - 1:
+                    raise
+                await asyncio.sleep(geri_cekilme_suresi(None, sira))
+                continue
+            if response.status_code == 429:
+                self.zamanlayici.limit_asildi(model)
+            if response.status_code not in TEKRAR_DURUMLARI or sira == self.deneme - 1:
+                return response
+            await response.aclose()
+            await asyncio.sleep(geri_cekilme_suresi(response, sira))
+
+    async def aclose(self):
+        await self.ic_transport.aclose()